@@ -50,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "screening.middleware.RequestTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -122,7 +123,15 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "screening.authentication.EdgeNodeAPIKeyAuthentication",
          "rest_framework.authentication.SessionAuthentication",
-    ]
+    ],
+    "DEFAULT_PAGINATION_CLASS": "screening.pagination.KeysetPagination",
+}
+
+# Keyset pagination of API lists (see screening/pagination.py): clients pick
+# ?page_size= up to MAX_PAGE_SIZE.
+PAGINATION = {
+    "PAGE_SIZE": 50,
+    "MAX_PAGE_SIZE": 500,
 }
 
 # Internationalization
@@ -150,6 +159,15 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # Celery Configuration
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
+
+# Shared cache: web workers and Celery must see the same response cache
+# versions, edge routing index versions and task flags.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": env("CACHE_URL", default="redis://localhost:6379/1"),
+    }
+}
 from celery.schedules import crontab
 
 CELERY_BEAT_SCHEDULE = {
@@ -157,4 +175,184 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'screening.tasks.deploy_to_flyio',
         'schedule': crontab(hour=0, minute=0),
     },
-}
\ No newline at end of file
+    'rollup-api-request-logs': {
+        'task': 'screening.tasks.rollup_api_request_logs',
+        'schedule': 60.0,
+    },
+    'probe-edge-nodes': {
+        'task': 'screening.tasks.probe_edge_nodes',
+        'schedule': 30.0,
+    },
+    'manage-api-request-log-partitions': {
+        'task': 'screening.tasks.manage_api_request_log_partitions',
+        'schedule': crontab(minute=15),
+    },
+    # Backstop for re-scoring runs lost or not coalesced (see screening/rescoring.py).
+    'rescore-matches': {
+        'task': 'screening.tasks.rescore_matches',
+        'schedule': 300.0,
+    },
+    # Full run: re-scores everything with the current idf weights.
+    'score-resumes': {
+        'task': 'screening.tasks.score_resumes',
+        'schedule': crontab(hour=3, minute=30),
+    },
+}
+
+# Edge routing
+# Seconds before the in-process nearest-node index is reloaded from the database,
+# and between checks of the shared version other processes bump on node changes.
+EDGE_ROUTING_INDEX_TTL = 30
+EDGE_ROUTING_VERSION_CHECK_INTERVAL = 1.0
+
+# Buffered APIRequestLog writes (see screening/logsink.py).
+API_REQUEST_LOG_BUFFER = {
+    "ENABLED": True,
+    "BATCH_SIZE": 500,
+    "MAX_SIZE": 10000,
+    "FLUSH_INTERVAL": 1.0,
+}
+
+# GraphQL pagination limits (see screening/query_cost.py).
+GRAPHQL_DEFAULT_PAGE_SIZE = 100
+GRAPHQL_MAX_PAGE_SIZE = 1000
+GRAPHQL_MAX_QUERY_COST = 20000
+
+# Edge node API key lookups (see screening/authentication.py). Set SHARED_CACHE
+# to a CACHES alias to share entries between processes.
+EDGE_NODE_AUTH_CACHE = {
+    "ENABLED": True,
+    "MAX_ENTRIES": 10000,
+    "TTL": 10,
+    "NEGATIVE_TTL": 30,
+    "SHARED_CACHE": None,
+    "SHARED_TTL": 300,
+}
+
+# Routing model (see screening/model_registry.py): seconds between checks of
+# model.pkl for changes, and how long predictions wait to be batched together.
+ROUTING_MODEL_CHECK_INTERVAL = 5
+ROUTING_MODEL_BATCH_WAIT_MS = 2.0
+# Where screening/training.py publishes the model trained from request logs;
+# it defaults to current.pkl in ROUTING_MODEL_DIR.
+# ROUTING_MODEL_PATH = "/var/lib/screening/routing/current.pkl"
+
+# Active edge node health checks (see screening/health.py): every node is sent
+# GET http://<ip_address>:PORT PATH; a node changes status only after
+# FAIL_THRESHOLD failed or RECOVER_THRESHOLD successful probes in a row.
+EDGE_HEALTH_CHECK = {
+    "PORT": 80,
+    "PATH": "/health/",
+    "TIMEOUT": 2.0,
+    "CONCURRENCY": 500,
+    "BUDGET": 20.0,
+    "FAIL_THRESHOLD": 3,
+    "RECOVER_THRESHOLD": 2,
+}
+
+# Resume parsing (see screening/parsing.py). WORKERS=None uses one process per
+# CPU; TIMEOUT is the time allowed per file in seconds; SKILLS extends the
+# built-in skill vocabulary. DOC files need the antiword program.
+RESUME_PARSING = {
+    "WORKERS": None,
+    "BATCH_SIZE": 100,
+    "CHUNK_SIZE": 64 * 1024,
+    "MAX_CHARS": 200_000,
+    "TIMEOUT": 60,
+    "SKILLS": [],
+}
+
+# Hash resume uploads while they stream in so identical files are stored and
+# parsed once (see screening/dedup.py).
+FILE_UPLOAD_HANDLERS = [
+    "screening.dedup.HashingUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
+# Resume/job matching (see screening/matching.py). MAX_BLOCK_CELLS bounds the
+# dense resume x job score block held in memory at once; TOP_K candidates are
+# kept per job.
+RESUME_MATCHING = {
+    "N_FEATURES": 2 ** 20,
+    "SKILL_WEIGHT": 3,
+    "TOP_K": 50,
+    "MAX_BLOCK_CELLS": 20_000_000,
+    "MIN_SCORE": 0.0,
+    "MAX_DF": 0.5,
+    "DENSE_DF": 0.01,
+    "MAX_DENSE_FEATURES": 1024,
+    "BATCH_SIZE": 1000,
+    # Job/resume edits within RESCORE_DELAY seconds are re-scored together.
+    "RESCORE_DELAY": 5,
+    "RESCORE_BATCH": 10000,
+    # Resume term vectors kept per process, so job edits skip re-tokenizing resumes:
+    # set it to at least the number of scorable resumes (about 4 KB each).
+    "VECTOR_CACHE_SIZE": 20_000,
+}
+
+# Applicant/resume/job search (see screening/search.py). Pages beyond
+# MAX_OFFSET results are refused, which bounds the top-N sort of the matches.
+SEARCH = {
+    "PAGE_SIZE": 20,
+    "MAX_PAGE_SIZE": 100,
+    "MAX_OFFSET": 1000,
+}
+
+# Streaming CSV/NDJSON exports (see screening/export.py): rows fetched per
+# database round trip and bytes per streamed block.
+EXPORT = {
+    "CHUNK_SIZE": 5000,
+    "BLOCK_BYTES": 64 * 1024,
+    "GZIP_LEVEL": 6,
+}
+
+# Bulk applicant/job imports (see screening/bulk_import.py): rows validated
+# and written per batch, and row errors kept in the report.
+IMPORT = {
+    "BATCH_SIZE": 1000,
+    "MAX_ERRORS": 1000,
+}
+
+# Cached JSON responses of the job and resume list/detail endpoints (see
+# screening/response_cache.py), invalidated through version counters.
+RESPONSE_CACHE = {
+    "ENABLED": True,
+    "CACHE": "default",
+    "TTL": 300,
+    "LOCK_TTL": 10,
+    "LOCK_WAIT": 2.0,
+}
+
+# Applicant and job lists serialized from .values() rows instead of model
+# instances (see screening/fast_serializers.py); same output.
+FAST_SERIALIZATION = {
+    "ENABLED": True,
+}
+
+# APIRequestLog partitions and retention (see screening/partitions.py): on
+# PostgreSQL one partition per INTERVAL ("day", "week" or "month"), PREMAKE
+# intervals created ahead; logs older than RETENTION_DAYS are dropped once
+# folded into the node performance rollups.
+API_REQUEST_LOG_PARTITIONS = {
+    "ENABLED": True,
+    "INTERVAL": "day",
+    "PREMAKE": 3,
+    "RETENTION_DAYS": 30,
+    "DELETE_BATCH": 10000,
+}
+
+# Bulk log uploads of edge nodes to /ingest/logs/ (see screening/ingest.py):
+# size limits per upload (MAX_BYTES once uncompressed), rows per bulk_create
+# outside PostgreSQL, and days an Idempotency-Key is remembered.  Request
+# times may be MAX_AGE_DAYS old at most (capped by the log RETENTION_DAYS).
+LOG_INGEST = {
+    "MAX_BYTES": 32 * 1024 * 1024,
+    "MAX_RECORDS": 100_000,
+    "BATCH_SIZE": 5000,
+    "MAX_ERRORS": 100,
+    "KEY_TTL_DAYS": 7,
+    "MAX_CLOCK_SKEW_SECONDS": 300,
+    "MAX_AGE_DAYS": 7,
+    "MAX_EXTRA_DATA_BYTES": 16 * 1024,
+}
@@ -0,0 +1,64 @@
+"""
+Shared helpers for the benchmark scripts in this package.
+
+Each benchmark is a standalone module run from the project root, e.g.
+
+    python -m benchmarks.routing
+
+They use the configured DJANGO_SETTINGS_MODULE and build their fixtures in a
+throwaway test database, so they never touch real data.
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup():
+    """Configure Django for a standalone benchmark run."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ai_based_resume_screening_recruitment.settings")
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Create a throwaway test database for the duration of the block."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    old_name = connection.settings_dict["NAME"]
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, iterations, warmup=100):
+    """Call ``func`` repeatedly and return the per-call durations in microseconds."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def percentile(samples, q):
+    """Return the ``q``-th percentile (0-100) of ``samples``."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def report(label, samples):
+    """Print a one-line latency summary for ``samples`` (microseconds)."""
+    print(
+        f"{label:<40} p50={percentile(samples, 50):10.1f}us  "
+        f"p99={percentile(samples, 99):10.1f}us  mean={statistics.fmean(samples):10.1f}us  n={len(samples)}"
+    )
@@ -0,0 +1,59 @@
+"""
+Per-request cost of EdgeNodeAPIKeyAuthentication with and without the API
+key cache, for valid and invalid keys.
+
+    python -m benchmarks.api_key_auth [--nodes 10000] [--iterations 5000]
+"""
+import argparse
+import random
+
+from benchmarks import measure, report, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    setup()
+    from django.test import RequestFactory, override_settings
+    from rest_framework.exceptions import AuthenticationFailed
+    from rest_framework.request import Request
+    from screening.authentication import EdgeNodeAPIKeyAuthentication, api_key_cache
+    from screening.models import EdgeNode
+
+    with test_database():
+        EdgeNode.objects.bulk_create(
+            [
+                EdgeNode(name=f"node-{i}", ip_address="10.0.0.1", latitude=0, longitude=0, api_key=f"key-{i:06d}")
+                for i in range(args.nodes)
+            ],
+            batch_size=1000,
+        )
+        factory = RequestFactory()
+        rng = random.Random(1)
+        valid = [Request(factory.get("/", HTTP_X_API_KEY=f"key-{rng.randrange(args.nodes):06d}")) for _ in range(256)]
+        invalid = [Request(factory.get("/", HTTP_X_API_KEY=f"bad-{i}")) for i in range(256)]
+        auth = EdgeNodeAPIKeyAuthentication()
+
+        def run(requests):
+            position = iter(range(1 << 62))
+
+            def call():
+                try:
+                    auth.authenticate(requests[next(position) % len(requests)])
+                except AuthenticationFailed:
+                    pass
+            return call
+
+        with override_settings(EDGE_NODE_AUTH_CACHE={"ENABLED": False}):
+            report("valid key, no cache", measure(run(valid), args.iterations))
+            report("invalid key, no cache", measure(run(invalid), args.iterations))
+        api_key_cache.clear()
+        report("valid key, cached", measure(run(valid), args.iterations, warmup=1000))
+        report("invalid key, negative cache", measure(run(invalid), args.iterations, warmup=1000))
+
+
+if __name__ == "__main__":
+    main()
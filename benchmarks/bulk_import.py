@@ -0,0 +1,49 @@
+"""
+Throughput of the bulk applicant import, in rows per second: a first load
+of a CSV file into an empty table, then the same file again, which updates
+every applicant through the email upsert.
+
+    python -m benchmarks.bulk_import [--rows 100000] [--batch-size 1000]
+"""
+import argparse
+import csv
+import io
+import random
+import time
+
+from benchmarks import setup, test_database
+
+SKILLS = ["python", "django", "sql", "react", "docker", "machine learning", "java", "go", "aws", "linux"]
+
+
+def applicants_csv(rows, rng):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["full_name", "email", "birthdate", "phone_number", "skills", "linkedin_profile"])
+    for i in range(rows):
+        writer.writerow([f"Applicant {i:07d}", f"a{i}@example.com", "1990-01-01", "+33123456789",
+                         ", ".join(rng.sample(SKILLS, 3)), ""])
+    return buffer.getvalue().encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup()
+    from screening.bulk_import import import_stream
+
+    data = applicants_csv(args.rows, random.Random(4))
+    with test_database():
+        for label in ("insert", "upsert"):
+            start = time.perf_counter()
+            result = import_stream("applicants", io.BytesIO(data), "csv", args.batch_size)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<8} {args.rows} rows in {elapsed:6.1f}s  {args.rows / elapsed:9,.0f} rows/s  "
+                  f"created {result['created']}  updated {result['updated']}  failed {result['failed']}")
+
+
+if __name__ == "__main__":
+    main()
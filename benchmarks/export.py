@@ -0,0 +1,51 @@
+"""
+Throughput and peak Python memory of the streaming request-log export, at
+two table sizes.  Peak memory should not grow with the number of rows.
+
+    python -m benchmarks.export [--rows 100000 400000]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from benchmarks import setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 400_000])
+    args = parser.parse_args()
+
+    setup()
+    from django.utils import timezone
+    from screening.export import export_stream
+    from screening.models import APIRequestLog, EdgeNode
+
+    rng = random.Random(2)
+    with test_database():
+        node = EdgeNode.objects.create(name="bench", ip_address="10.0.0.1", latitude=0, longitude=0)
+        now = timezone.now()
+        for count in sorted(args.rows):
+            existing = APIRequestLog.objects.count()
+            for offset in range(existing, count, 20000):
+                APIRequestLog.objects.bulk_create([
+                    APIRequestLog(edge_node=node, request_time=now, response_time_ms=rng.uniform(1, 500),
+                                  latitude=rng.uniform(-90, 90), longitude=rng.uniform(-180, 180),
+                                  status_code=200, client_ip="10.1.2.3", extra_data={"path": "/route-request/"})
+                    for _ in range(offset, min(count, offset + 20000))
+                ], batch_size=5000)
+            for fmt, compress in (("csv", False), ("ndjson", False), ("csv", True)):
+                tracemalloc.start()
+                start = time.perf_counter()
+                size = sum(len(block) for block in export_stream("request-logs", fmt, compress=compress))
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                label = f"{count} rows {fmt}{' gzip' if compress else ''}"
+                print(f"{label:<28} {count / elapsed:10,.0f} rows/s  {size / 1e6:7.1f} MB out  "
+                      f"peak {peak / 1e6:5.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
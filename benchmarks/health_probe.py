@@ -0,0 +1,80 @@
+"""
+Wall-clock time of one health-check cycle over a large fleet, against a local
+stand-in server.  A fraction of the nodes point at a port that never answers
+within the probe timeout.
+
+    python -m benchmarks.health_probe [--nodes 5000] [--dead 0.1] [--timeout 1.0]
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+from benchmarks import setup, test_database
+
+
+def start_server():
+    """Run a minimal HTTP server in a background event loop; return (alive_port, hanging_port)."""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    ports = []
+
+    async def healthy(reader, writer):
+        await reader.readline()
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n")
+        await writer.drain()
+        writer.close()
+
+    async def hanging(reader, writer):
+        await asyncio.sleep(3600)
+
+    async def serve():
+        for handler in (healthy, hanging):
+            server = await asyncio.start_server(handler, "127.0.0.1", 0, backlog=4096)
+            ports.append(server.sockets[0].getsockname()[1])
+        ready.set()
+
+    def run():
+        loop.run_until_complete(serve())
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return ports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--dead", type=float, default=0.1)
+    parser.add_argument("--timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    setup()
+    from screening.health import ProbeTarget, check_edge_nodes
+    from screening.models import EdgeNode
+
+    alive_port, hanging_port = start_server()
+    dead_every = int(1 / args.dead) if args.dead else 0
+
+    def target(node, config):
+        dead = dead_every and node.pk % dead_every == 0
+        return ProbeTarget(node.pk, "127.0.0.1", hanging_port if dead else alive_port, "/health/")
+
+    with test_database():
+        EdgeNode.objects.bulk_create(
+            [
+                EdgeNode(name=f"node-{i}", ip_address="127.0.0.1", latitude=0, longitude=0, api_key=f"key-{i}")
+                for i in range(args.nodes)
+            ],
+            batch_size=1000,
+        )
+        for cycle in range(3):
+            start = time.perf_counter()
+            summary = check_edge_nodes(target, timeout=args.timeout)
+            elapsed = time.perf_counter() - start
+            print(f"cycle {cycle + 1}: {elapsed:6.2f}s  {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Routing model throughput: one scikit-learn predict() per sample versus the
+compiled forest scoring batches, and the micro-batching predictor under
+concurrent callers.
+
+    python -m benchmarks.inference [--samples 20000] [--threads 32]
+"""
+import argparse
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks import setup
+
+
+def throughput(label, count, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<45} {count / elapsed:12.0f} predictions/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    setup()
+    from screening.inference import BatchPredictor, CompiledForest
+    from screening.tasks import MODEL_PATH
+
+    with open(MODEL_PATH, "rb") as file:
+        model = pickle.load(file)
+    compiled = CompiledForest(model)
+    samples = np.random.RandomState(0).uniform(0, 10, (args.samples, model.n_features_in_))
+    single = samples[: max(1, args.samples // 20)]
+
+    throughput("sklearn predict(), one sample per call", len(single),
+               lambda: [model.predict(row[np.newaxis]) for row in single])
+    throughput("compiled predict(), one sample per call", len(single),
+               lambda: [compiled.predict(row[np.newaxis]) for row in single])
+    throughput("sklearn predict(), one batch", len(samples), lambda: model.predict(samples))
+    for size in (64, 256, 1024):
+        throughput(f"compiled predict(), batches of {size}", len(samples),
+                   lambda: [compiled.predict(samples[i:i + size]) for i in range(0, len(samples), size)])
+
+    predictor = BatchPredictor(compiled.predict, max_batch_size=256, max_wait_ms=2.0)
+    with ThreadPoolExecutor(args.threads) as pool:
+        throughput(f"BatchPredictor, {args.threads} concurrent callers", len(samples),
+                   lambda: list(pool.map(predictor.predict, samples)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Rows per second through the bulk log ingestion endpoint: gzip-compressed
+NDJSON uploads of --batch records posted to /ingest/logs/, and the share of
+the time spent decoding and validating versus writing.  The SQLite test
+database writes with executemany; on PostgreSQL rows go through COPY, whose
+client-side cost (formatting the COPY data) is measured separately.
+
+    python -m benchmarks.log_ingest [--rows 200000] [--batch 10000]
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks import setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    args = parser.parse_args()
+
+    setup()
+    from django.test import Client
+    from screening.ingest import copy_buffer, decode_body, parse_records, validate_records
+    from screening.models import APIRequestLog, EdgeNode
+
+    rng = random.Random(3)
+    # Recent enough to be within the accepted request_time age.
+    day = (datetime.now(timezone.utc) - timedelta(days=1)).date().isoformat()
+    bodies = []
+    for offset in range(0, args.rows, args.batch):
+        lines = [
+            json.dumps({
+                "request_time": f"{day}T10:{i % 60:02d}:{i % 59:02d}.{i % 1000:03d}Z",
+                "response_time_ms": rng.uniform(1, 500), "db_time_ms": rng.uniform(0, 50),
+                "latitude": rng.uniform(-90, 90), "longitude": rng.uniform(-180, 180), "status_code": 200,
+                "client_ip": f"10.0.{rng.randrange(256)}.{rng.randrange(256)}", "extra_data": {"path": "/route-request/"},
+            })
+            for i in range(offset, min(args.rows, offset + args.batch))
+        ]
+        bodies.append(gzip.compress("\n".join(lines).encode()))
+
+    with test_database():
+        node = EdgeNode.objects.create(name="bench", ip_address="10.0.0.1", latitude=0, longitude=0)
+        client = Client()
+
+        start = time.perf_counter()
+        batches = [validate_records(*parse_records(decode_body(body, "gzip")))[0] for body in bodies]
+        validation = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for columns in batches:
+            copy_buffer({**columns, "edge_node_id": [node.pk] * len(columns["request_time"])})
+        formatting = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for number, body in enumerate(bodies):
+            response = client.post("/ingest/logs/", body, content_type="application/x-ndjson",
+                                   HTTP_CONTENT_ENCODING="gzip", HTTP_X_API_KEY=node.api_key,
+                                   HTTP_IDEMPOTENCY_KEY=f"batch-{number}")
+            assert response.status_code == 201, response.content
+        total = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for number, body in enumerate(bodies):
+            client.post("/ingest/logs/", body, content_type="application/x-ndjson", HTTP_CONTENT_ENCODING="gzip",
+                        HTTP_X_API_KEY=node.api_key, HTTP_IDEMPOTENCY_KEY=f"batch-{number}")
+        retries = time.perf_counter() - start
+        assert APIRequestLog.objects.count() == args.rows
+
+    print(f"{'decode + validate':<24} {args.rows / validation:10,.0f} rows/s")
+    print(f"{'COPY formatting':<24} {args.rows / formatting:10,.0f} rows/s")
+    print(f"{'both (PostgreSQL client)':<24} {args.rows / (validation + formatting):10,.0f} rows/s")
+    print(f"{'POST /ingest/logs/':<24} {args.rows / total:10,.0f} rows/s  ({validation / total:.0%} validating)")
+    print(f"{'retried uploads':<24} {args.rows / retries:10,.0f} rows/s  (nothing written)")
+
+
+if __name__ == "__main__":
+    main()
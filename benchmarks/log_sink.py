@@ -0,0 +1,52 @@
+"""
+Requests per second through RequestRoutingView with synchronous log inserts
+versus the buffered APIRequestLog writer.
+
+    python -m benchmarks.log_sink [--requests 5000]
+"""
+import argparse
+import time
+
+from benchmarks import setup, test_database
+
+
+def run(client, api_key, count):
+    start = time.perf_counter()
+    for i in range(count):
+        client.post(
+            "/route-request/",
+            data={"latitude": (i % 180) - 90, "longitude": (i % 360) - 180},
+            content_type="application/json",
+            HTTP_X_API_KEY=api_key,
+        )
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    setup()
+    from django.test import Client, override_settings
+    from screening.logsink import api_log_buffer
+    from screening.models import APIRequestLog, EdgeNode
+
+    with test_database():
+        caller = EdgeNode.objects.create(name="caller", ip_address="10.0.0.1", latitude=0, longitude=0)
+        for i in range(50):
+            EdgeNode.objects.create(name=f"node-{i}", ip_address="10.0.1.1", latitude=i - 25, longitude=i * 7 - 175)
+        client = Client()
+
+        with override_settings(API_REQUEST_LOG_BUFFER={"ENABLED": False}):
+            sync_rps = run(client, caller.api_key, args.requests)
+        buffered_rps = run(client, caller.api_key, args.requests)
+        api_log_buffer.flush()
+
+        print(f"synchronous create(): {sync_rps:10.0f} req/s")
+        print(f"buffered bulk_create: {buffered_rps:10.0f} req/s")
+        print(f"rows written: {APIRequestLog.objects.count()} (expected {2 * args.requests})")
+
+
+if __name__ == "__main__":
+    main()
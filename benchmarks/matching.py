@@ -0,0 +1,71 @@
+"""
+Throughput and peak memory of the resume x job scoring core (vectorising,
+sparse block product and running top-k) on synthetic documents.  Database
+reads and writes are left out so the numbers show the compute cost only;
+the result extrapolates linearly to larger resume counts because memory is
+bounded by one block.
+
+    python -m benchmarks.matching [--resumes 50000] [--jobs 10000]
+"""
+import argparse
+import random
+import resource
+import time
+
+from benchmarks import setup
+
+# A Zipf-distributed vocabulary, so term overlap between documents looks like real text.
+VOCABULARY = [f"term{i}" for i in range(20000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+SKILLS = ["python", "django", "postgresql", "docker", "kubernetes", "react", "machine learning", "aws", "kafka",
+          "terraform", "graphql", "pandas", "scrum", "java", "typescript", "c++", "golang", "spark", "css", "sql"]
+
+
+def words(rng, count):
+    return rng.choices(VOCABULARY, weights=WEIGHTS, k=count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=50000)
+    parser.add_argument("--jobs", type=int, default=10000)
+    args = parser.parse_args()
+
+    setup()
+    import numpy as np
+    from screening.matching import JobSpace, TopK, block_rows, matching_settings, resume_document
+
+    config = matching_settings()
+    rng = random.Random(3)
+    jobs = [
+        (i, " ".join(words(rng, 2)), " ".join(words(rng, 60)), ", ".join(rng.sample(SKILLS, 5)))
+        for i in range(args.jobs)
+    ]
+    start = time.perf_counter()
+    space = JobSpace(jobs, config)
+    print(f"job matrix: {args.jobs} jobs in {time.perf_counter() - start:.2f}s "
+          f"({space.n_dense} dense features)")
+
+    chunk_size = block_rows(args.jobs, config)
+    # Generating text is slower than scoring it, so one block of documents is reused.
+    documents = [
+        resume_document(" ".join(words(rng, 300)), ", ".join(rng.sample(SKILLS, 6)), config)
+        for _ in range(chunk_size)
+    ]
+    top = TopK(args.jobs, config["TOP_K"])
+    start = time.perf_counter()
+    for offset in range(0, args.resumes, chunk_size):
+        count = min(chunk_size, args.resumes - offset)
+        block = space.scores(documents[:count])
+        block.max(axis=1)
+        top.add(block, np.arange(offset, offset + count))
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    rate = args.resumes / elapsed
+    print(f"scored {args.resumes} resumes x {args.jobs} jobs in {elapsed:.1f}s "
+          f"({rate:,.0f} resumes/s, blocks of {chunk_size})")
+    print(f"peak RSS {peak_mb:,.0f} MB; 1M resumes would take ~{1_000_000 / rate / 60:.1f} min at this rate")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Query latency of one /applicants/ page at increasing depth with keyset
+pagination, against OFFSET pagination at the same depth.  Keyset pages cost
+the same wherever they are; OFFSET pages get slower the deeper they are.
+
+    python -m benchmarks.pagination [--applicants 200000] [--iterations 50]
+"""
+import argparse
+
+from benchmarks import measure, report, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--applicants", type=int, default=200_000)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    setup()
+    from screening.models import Applicant
+    from screening.pagination import KeysetPagination
+
+    with test_database():
+        for offset in range(0, args.applicants, 20000):
+            Applicant.objects.bulk_create([
+                Applicant(full_name=f"Applicant {i:07d}", email=f"a{i}@example.com", phone_number="+33123456789",
+                          skills="python")
+                for i in range(offset, min(args.applicants, offset + 20000))
+            ], batch_size=5000)
+
+        paginator = KeysetPagination()
+        # Ordered like paginate_queryset: full_name can be edited, so pages follow the primary key.
+        keys = paginator.get_keys(Applicant.objects.all())
+        ordered = Applicant.objects.order_by(*[("-" if descending else "") + name for name, descending, _ in keys])
+        for depth in (0, args.applicants // 2, args.applicants - 100):
+            queryset = ordered
+            if depth:
+                row = ordered[depth]
+                queryset = ordered.filter(paginator.after(keys, [getattr(row, name) for name, _, _ in keys], False))
+            report(f"keyset page at row {depth}", measure(lambda: list(queryset[:51]), args.iterations, warmup=5))
+            report(f"offset page at row {depth}", measure(
+                lambda: list(ordered[depth:depth + 51]), args.iterations, warmup=5,
+            ))
+
+
+if __name__ == "__main__":
+    main()
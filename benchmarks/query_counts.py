@@ -0,0 +1,103 @@
+"""
+SQL queries per request for every list endpoint, as JSON and through the
+browsable API (whose HTML forms list every related object by its __str__),
+and for the admin changelists and add forms.  Each page is requested with
+5 rows of every model and a page of 5, then again with --rows rows and a
+page of --rows.  A count that grows between the two is an N+1.
+
+    python -m benchmarks.query_counts [--rows 50]
+"""
+import argparse
+import datetime
+
+from benchmarks import setup, test_database
+
+ENDPOINTS = [
+    "/applicants/", "/jobs/", "/resumes/", "/interviews/", "/screening-questions/", "/screening-answers/",
+    "/feedback/", "/notifications/", "/applications/", "/jobs/1/applicants/", "/applicants/1/resumes/",
+    "/jobs/1/candidates/?k=50",
+]
+
+
+ADMIN_MODELS = [
+    "applicant", "job", "resume", "interview", "screeningquestion", "screeninganswer", "feedback", "notification",
+    "jobapplication",
+]
+
+
+def build(start, stop):
+    from django.contrib.auth.models import User
+    from django.core.cache import cache
+    from screening.rescoring import RESCORE_SCHEDULED_KEY
+    from screening.models import (
+        Applicant, Feedback, Interview, Job, JobApplication, JobMatch, Notification, Resume, ScreeningAnswer,
+        ScreeningQuestion,
+    )
+
+    # Job saves would otherwise schedule a re-scoring task on the broker.
+    cache.set(RESCORE_SCHEDULED_KEY, True, timeout=None)
+    for i in range(start, stop):
+        user = User.objects.create_user(f"user{i}")
+        applicant = Applicant.objects.create(user=user, full_name=f"Applicant {i}", email=f"a{i}@example.com",
+                                             phone_number="+33123456789", skills="python")
+        job = Job.objects.create(recruiter="Acme", title=f"Job {i}", description="Build", required_skills="python",
+                                 location="Tunis", salary_range="1-2")
+        first_job = Job.objects.order_by("pk").first()
+        first_job.applicants.add(applicant)
+        resume = Resume.objects.create(applicant=applicant, file=f"resumes/{i}.pdf", parsed_text="python")
+        JobMatch.objects.create(job=first_job, resume=resume, rank=i + 1, score=1 / (i + 1))
+        interview = Interview.objects.create(job=job, applicant=applicant, date=datetime.date(2026, 1, 1),
+                                             time=datetime.time(9), mode="online")
+        question = ScreeningQuestion.objects.create(job=job, question_text=f"Question {i}")
+        ScreeningAnswer.objects.create(question=question, applicant=applicant, answer_text="yes")
+        Feedback.objects.create(interview=interview, reviewer=user, comments="ok", rating=4)
+        Notification.objects.create(user=user, message="hello")
+        JobApplication.objects.create(applicant=applicant, job=job)
+
+
+def count_queries(client, url):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200, (url, response.status_code)
+    return len(queries)
+
+
+def pages(page_size):
+    """(label, [urls]) of every page measured."""
+    for url in ENDPOINTS:
+        separator = "&" if "?" in url else "?"
+        yield url, [f"{url}{separator}page_size={page_size}&format={fmt}" for fmt in ("json", "api")]
+    for model in ADMIN_MODELS:
+        yield f"admin {model}", [f"/admin/screening/{model}/", f"/admin/screening/{model}/add/"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50)
+    args = parser.parse_args()
+
+    setup()
+    from django.contrib.auth.models import User
+    from django.test import Client
+
+    small = 5
+    with test_database():
+        client = Client()
+        client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+        build(0, small)
+        for _, urls in pages(small):
+            for url in urls:
+                client.get(url)  # warm the content type and session caches
+        before = {label: [count_queries(client, url) for url in urls] for label, urls in pages(small)}
+        build(small, args.rows)
+        print(f"{'page':<30} {'json / changelist':>18} {'api (html) / add':>18}   ({small} -> {args.rows} rows)")
+        for label, urls in pages(args.rows):
+            after = [count_queries(client, url) for url in urls]
+            print(f"{label:<30} {before[label][0]:>8} -> {after[0]:<7} {before[label][1]:>8} -> {after[1]:<7}")
+
+
+if __name__ == "__main__":
+    main()
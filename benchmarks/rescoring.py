@@ -0,0 +1,77 @@
+"""
+Cost of re-scoring after one job edit and after one resume edit, against a
+full ``score_resumes`` run, at growing corpus sizes.  "pairs" is the number
+of (resume, job) scores computed: a full run computes resumes x jobs, a job
+edit about one column and a resume edit one row.  A column still reads
+every resume (their term vectors come from the cache the full run filled),
+so its time grows with the resume count; a row does not.
+
+    python -m benchmarks.rescoring [--resumes 2000 8000] [--jobs 500]
+"""
+import argparse
+import random
+import time
+
+from benchmarks import setup, test_database
+
+WORDS = [f"term{i}" for i in range(5000)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(WORDS))]
+SKILLS = ["python", "django", "postgresql", "docker", "kubernetes", "react", "aws", "kafka", "java", "sql"]
+
+
+def text(rng, count):
+    return " ".join(rng.choices(WORDS, weights=WEIGHTS, k=count))
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, nargs="+", default=[2000, 8000])
+    parser.add_argument("--jobs", type=int, default=500)
+    args = parser.parse_args()
+
+    setup()
+    from django.core.cache import cache
+    from screening.matching import score_resumes
+    from screening.models import Applicant, Job, PendingRescore, Resume
+    from screening.rescoring import RESCORE_SCHEDULED_KEY, rescore
+
+    # Rankings that need another pass are queued but not scheduled: there is no worker here.
+    cache.set(RESCORE_SCHEDULED_KEY, True, timeout=None)
+    rng = random.Random(5)
+    with test_database():
+        Job.objects.bulk_create([
+            Job(recruiter="acme", title="Engineer", description=text(rng, 60), location="-",
+                salary_range="-", required_skills=", ".join(rng.sample(SKILLS, 3)))
+            for _ in range(args.jobs)
+        ])
+        applicant = Applicant.objects.create(full_name="Bench", email="bench@example.com",
+                                             phone_number="+33123456789", skills="")
+        for count in sorted(args.resumes):
+            Resume.objects.bulk_create([
+                Resume(applicant=applicant, file=f"resumes/{i}.pdf", parsed_text=text(rng, 300),
+                       extracted_skills=", ".join(rng.sample(SKILLS, 4)))
+                for i in range(Resume.objects.count(), count)
+            ])
+            elapsed, result = timed(score_resumes)
+            print(f"{count} resumes x {args.jobs} jobs")
+            print(f"  {'full run':<14} {elapsed * 1000:9.1f} ms  pairs={result['resumes'] * result['jobs']}")
+
+            job = Job.objects.order_by("?").first()
+            Job.objects.filter(pk=job.pk).update(description=text(rng, 60))
+            elapsed, result = timed(rescore, [job.pk], [])
+            print(f"  {'job edit':<14} {elapsed * 1000:9.1f} ms  pairs={result['pairs']}")
+
+            resume = Resume.objects.order_by("?").first()
+            Resume.objects.filter(pk=resume.pk).update(parsed_text=text(rng, 300))
+            elapsed, result = timed(rescore, [], [resume.pk])
+            print(f"  {'resume edit':<14} {elapsed * 1000:9.1f} ms  pairs={result['pairs']}")
+            PendingRescore.objects.all().delete()
+
+if __name__ == "__main__":
+    main()
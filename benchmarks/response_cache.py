@@ -0,0 +1,53 @@
+"""
+Latency of cached job and resume endpoints: with the response cache off, on
+a cache hit, and for a conditional request answered with a 304.
+
+    python -m benchmarks.response_cache [--jobs 2000] [--iterations 500]
+"""
+import argparse
+
+from benchmarks import measure, report, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    setup()
+    from django.core.cache import cache
+    from django.test import Client, override_settings
+    from screening.models import Applicant, Job, Resume
+    from screening.rescoring import RESCORE_SCHEDULED_KEY
+
+    # Job saves would otherwise schedule a re-scoring task on the broker.
+    cache.set(RESCORE_SCHEDULED_KEY, True, timeout=None)
+    with test_database():
+        Job.objects.bulk_create([
+            Job(recruiter=f"Company {i % 50}", title=f"Job {i:05d}", description="Build and run services. " * 20,
+                required_skills="python, django, sql", location="Tunis", salary_range="1-2")
+            for i in range(args.jobs)
+        ])
+        applicant = Applicant.objects.create(full_name="Ada", email="ada@example.com", phone_number="+33123456789",
+                                             skills="python")
+        Resume.objects.bulk_create([
+            Resume(applicant=applicant, file=f"resumes/{i}.pdf", parsed_text="python " * 500,
+                   extracted_skills="python", ai_score=50.0)
+            for i in range(50)
+        ])
+        job = Job.objects.order_by("pk").first()
+        client = Client()
+        for label, url in (("job list (page of 50)", "/jobs/"), ("job detail", f"/jobs/{job.pk}/"),
+                           ("applicant resumes", f"/applicants/{applicant.pk}/resumes/")):
+            with override_settings(RESPONSE_CACHE={"ENABLED": False}):
+                report(f"{label}, no cache", measure(lambda: client.get(url), args.iterations, warmup=20))
+            report(f"{label}, cache hit", measure(lambda: client.get(url), args.iterations, warmup=20))
+            etag = client.get(url)["ETag"]
+            report(f"{label}, 304", measure(
+                lambda: client.get(url, headers={"if-none-match": etag}), args.iterations, warmup=20,
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Resume parsing throughput (documents per second) on a synthetic corpus of
+PDF and DOCX resumes, in-process and with the worker process pool.  DOC
+files are converted by the antiword program and are left out.
+
+    python -m benchmarks.resume_parsing [--documents 600] [--pages 3] [--workers 4]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import zipfile
+import zlib
+
+from benchmarks import setup
+
+WORDS = (
+    "experienced engineer team project delivered built designed led improved platform service customer "
+    "data pipeline latency reliability migration architecture mentoring stakeholders roadmap"
+).split()
+SKILLS = ["Python", "Django", "PostgreSQL", "Docker", "Kubernetes", "React", "Machine Learning", "AWS", "Kafka",
+          "Terraform", "GraphQL", "Pandas", "Scrum", "Java", "TypeScript"]
+
+
+def resume_lines(rng, pages):
+    lines = [f"Candidate {rng.randrange(10 ** 6)}", "Skills: " + ", ".join(rng.sample(SKILLS, 5))]
+    for _ in range(pages * 40):
+        lines.append(" ".join(rng.choice(WORDS) for _ in range(12)))
+    return lines
+
+
+def pdf_bytes(lines, pages, rng):
+    per_page = max(1, len(lines) // pages)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        chunk = lines[page * per_page:(page + 1) * per_page]
+        content = b"BT /F1 11 Tf 72 760 Td 14 TL " + b" ".join(b"(%s) Tj T*" % line.encode() for line in chunk) + b" ET"
+        compressed = zlib.compress(content)
+        image = rng.randbytes(20000)
+        number = len(objects) + 1
+        kids.append(b"%d 0 R" % number)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> "
+                       b"/XObject << /Im1 %d 0 R >> >> /Contents %d 0 R >>" % (number + 2, number + 1))
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(compressed), compressed))
+        objects.append(b"<< /Type /XObject /Subtype /Image /Width 200 /Height 100 /ColorSpace /DeviceGray "
+                       b"/BitsPerComponent 8 /Length %d >>\nstream\n%s\nendstream" % (len(image), image))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), pages)
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    return data + b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+
+def docx_bytes(lines, path):
+    body = "".join(f"<w:p><w:r><w:t>{line}</w:t></w:r></w:p>" for line in lines)
+    document = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("word/document.xml", document)
+
+
+def build_corpus(directory, documents, pages):
+    rng = random.Random(7)
+    paths = []
+    for i in range(documents):
+        lines = resume_lines(rng, pages)
+        kind = ("pdf", "docx")[i % 2]
+        path = os.path.join(directory, f"resume-{i}.{kind}")
+        if kind == "docx":
+            docx_bytes(lines, path)
+        else:
+            with open(path, "wb") as file:
+                file.write(pdf_bytes(lines, pages, rng))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=600)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    setup()
+    from screening.parsing import parse_files, skill_vocabulary
+
+    vocabulary = skill_vocabulary()
+    with tempfile.TemporaryDirectory() as directory:
+        paths = build_corpus(directory, args.documents, args.pages)
+        size_mb = sum(os.path.getsize(path) for path in paths) / 1e6
+        print(f"corpus: {len(paths)} documents, {size_mb:.1f} MB")
+        for label, workers in (("in-process", 1), (f"process pool ({args.workers} workers)", args.workers)):
+            parse_files(paths[:args.workers * 2], vocabulary, workers)  # warm up the pool
+            start = time.perf_counter()
+            results = parse_files(paths, vocabulary, workers)
+            elapsed = time.perf_counter() - start
+            failures = sum(1 for _, error in results if error)
+            print(f"{label:<40} {len(paths) / elapsed:8.1f} docs/s  ({elapsed:.2f}s, {failures} failures)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Compare the old routing lookup (one query per request) with the in-process
+nearest-node index.
+
+    python -m benchmarks.routing [--nodes 10000] [--iterations 2000]
+"""
+import argparse
+import random
+
+from benchmarks import measure, report, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup()
+    from screening.models import EdgeNode
+    from screening.routing import NodeIndex
+
+    rng = random.Random(42)
+    with test_database():
+        EdgeNode.objects.bulk_create(
+            [
+                EdgeNode(
+                    name=f"node-{i}",
+                    ip_address=f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+                    latitude=rng.uniform(-90, 90),
+                    longitude=rng.uniform(-180, 180),
+                    status="healthy" if rng.random() < 0.9 else "unhealthy",
+                    api_key=f"bench-{i}",
+                )
+                for i in range(args.nodes)
+            ],
+            batch_size=1000,
+        )
+        callers = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(1024)]
+
+        def query_path():
+            EdgeNode.objects.filter(status="healthy").first()
+
+        index = NodeIndex(ttl=3600)
+        index.rebuild()
+        position = iter(range(1 << 62))
+
+        def indexed_path():
+            lat, lng = callers[next(position) % len(callers)]
+            index.nearest(lat, lng, k=1)
+
+        print(f"{args.nodes} nodes, {len(index)} healthy")
+        report("DB query (status=healthy).first()", measure(query_path, args.iterations))
+        report("NodeIndex.nearest(k=1)", measure(indexed_path, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Search latency (p50/p95/p99) over a large synthetic SearchEntry table, for
+a rare word, a common word, a two-word query and a misspelt name.  The
+target is p95 < 50 ms on PostgreSQL with several million rows; on SQLite
+the Python fallback scans every row, so keep --rows small there.
+
+    python -m benchmarks.search [--rows 3000000] [--iterations 50]
+"""
+import argparse
+import itertools
+import random
+import time
+
+from benchmarks import measure, percentile, report, setup, test_database
+
+FIRST = ["Ada", "Alan", "Grace", "Linus", "Margaret", "Dennis", "Barbara", "Ken", "Edsger", "Donald"]
+LAST = [f"Name{i}" for i in range(50000)]
+WORDS = [f"word{i}" for i in range(30000)]
+CUMULATIVE = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(WORDS))))
+SKILLS = ["Python", "Django", "PostgreSQL", "Docker", "React", "AWS", "Kafka", "Java", "SQL", "Go"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    setup()
+    from django.db import connection
+    from screening.models import SearchEntry
+    from screening.search import search
+
+    rng = random.Random(4)
+    kinds = [SearchEntry.APPLICANT, SearchEntry.RESUME, SearchEntry.JOB]
+    with test_database():
+        start = time.perf_counter()
+        for offset in range(0, args.rows, 20000):
+            SearchEntry.objects.bulk_create([
+                SearchEntry(kind=kinds[i % 3], object_id=i, title=f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+                            keywords=", ".join(rng.sample(SKILLS, 3)),
+                            body=" ".join(rng.choices(WORDS, cum_weights=CUMULATIVE, k=200)) if i % 3 else "")
+                for i in range(offset, min(args.rows, offset + 20000))
+            ], batch_size=5000)
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE search_entry")
+        print(f"{args.rows} entries built in {time.perf_counter() - start:.0f}s ({connection.vendor})")
+
+        queries = [("rare word", "word25000"), ("common word", "python"), ("two words", "docker word10"),
+                   ("misspelt name", "Nmae4242")]
+        for label, query in queries:
+            samples = measure(lambda: search(query, limit=20), args.iterations, warmup=3)
+            report(f"{label} ({query})", samples)
+            print(f"{'':<40} p95={percentile(samples, 95) / 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Rows serialized per second, fetch included, by the ModelSerializers and by
+their RowEncoders (screening/fast_serializers.py), for applicants, jobs and
+request logs.
+
+    python -m benchmarks.serialization [--rows 100000]
+"""
+import argparse
+import random
+import time
+
+from benchmarks import setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    setup()
+    from django.core.cache import cache
+    from django.utils import timezone
+    from screening.fast_serializers import row_encoder
+    from screening.models import Applicant, APIRequestLog, EdgeNode, Job
+    from screening.rescoring import RESCORE_SCHEDULED_KEY
+    from screening.serializers import APIRequestLogSerializer, ApplicantSerializer, JobSerializer
+
+    cache.set(RESCORE_SCHEDULED_KEY, True, timeout=None)
+    rng = random.Random(6)
+    with test_database():
+        node = EdgeNode.objects.create(name="bench", ip_address="10.0.0.1", latitude=0, longitude=0)
+        now = timezone.now()
+        for offset in range(0, args.rows, 20000):
+            batch = range(offset, min(args.rows, offset + 20000))
+            Applicant.objects.bulk_create([
+                Applicant(full_name=f"Applicant {i:07d}", email=f"a{i}@example.com", phone_number="+33123456789",
+                          skills="python, django, sql", linkedin_profile=f"https://linkedin.com/in/a{i}")
+                for i in batch
+            ], batch_size=5000)
+            Job.objects.bulk_create([
+                Job(recruiter=f"Company {i % 500}", title=f"Job {i:07d}", description="Build services. " * 10,
+                    required_skills="python, django", location="Tunis", salary_range="1-2")
+                for i in batch
+            ], batch_size=5000)
+            APIRequestLog.objects.bulk_create([
+                APIRequestLog(edge_node=node, request_time=now, response_time_ms=rng.uniform(1, 500),
+                              latitude=rng.uniform(-90, 90), longitude=rng.uniform(-180, 180), status_code=200,
+                              client_ip="10.1.2.3", extra_data={"path": "/route-request/"})
+                for _ in batch
+            ], batch_size=5000)
+
+        for label, serializer_class, queryset in (
+            ("applicants", ApplicantSerializer, Applicant.objects.order_by("id")),
+            ("jobs", JobSerializer, Job.objects.order_by("id")),
+            ("request logs", APIRequestLogSerializer, APIRequestLog.objects.order_by("id")),
+        ):
+            for path, serialize in (
+                ("ModelSerializer", lambda: serializer_class(queryset, many=True).data),
+                ("RowEncoder", lambda: row_encoder(serializer_class).encode_queryset(queryset)),
+            ):
+                start = time.perf_counter()
+                rows = len(serialize())
+                elapsed = time.perf_counter() - start
+                print(f"{label:<14} {path:<16} {rows / elapsed:10,.0f} rows/s  ({elapsed:5.2f}s for {rows})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Skill lookup latency over a large applicant table: the former
+``skills__icontains`` scan against the ApplicantSkill index, for a rare
+skill, a common one and a two-skill AND query.  Each query fetches the
+first page (20 applicants) and the total count, as the views do.
+
+    python -m benchmarks.skill_search [--applicants 1000000] [--iterations 20]
+"""
+import argparse
+import random
+import time
+
+from benchmarks import measure, report, setup, test_database
+
+COMMON = ["Python", "JavaScript", "SQL", "Java", "Git", "Docker", "React", "AWS", "Linux", "Django"]
+RARE = [f"Skill{i}" for i in range(20000)]
+
+
+def skills_text(rng):
+    picked = rng.sample(COMMON, rng.randint(1, 4)) + rng.sample(RARE, rng.randint(1, 4))
+    rng.shuffle(picked)
+    return ", ".join(picked + [rng.choice(["developer", "engineer", "analyst"])])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--applicants", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    from django.db.models import Q
+    from screening.models import Applicant
+    from screening.skills import applicants_with_skills, rebuild_skill_index
+
+    rng = random.Random(9)
+    with test_database():
+        start = time.perf_counter()
+        for offset in range(0, args.applicants, 50000):
+            Applicant.objects.bulk_create([
+                Applicant(full_name=f"Applicant {i}", email=f"a{i}@example.com", phone_number="+33123456789",
+                          skills=skills_text(rng))
+                for i in range(offset, min(args.applicants, offset + 50000))
+            ], batch_size=5000)
+        rows = rebuild_skill_index(batch_size=20000)
+        print(f"{args.applicants} applicants, {rows} index rows built in {time.perf_counter() - start:.0f}s")
+
+        queries = [("rare skill", ["Skill42"]), ("common skill", ["Docker"]), ("AND of two", ["Python", "Docker"])]
+        for label, skills in queries:
+            scan = Applicant.objects.filter(*[Q(skills__icontains=skill) for skill in skills])
+            indexed = applicants_with_skills(skills)
+            for kind, queryset in (("icontains", scan), ("index", indexed)):
+                def query():
+                    list(queryset[:20])
+                    queryset.count()
+                report(f"{label} / {kind} ({queryset.count()} hits)", measure(query, args.iterations, warmup=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Bytes transferred and database time per page of 500 rows, with every
+field, with the default list projection (large text columns deferred) and
+with a ?fields= projection, for /resumes/ and /applicants/.  Database time
+is the time to run the page's queries and fetch their rows.
+
+    python -m benchmarks.sparse_fields [--rows 20000] [--iterations 20]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks import setup, test_database
+
+WORDS = ("python django postgres docker kubernetes react typescript machine learning data pipelines "
+         "led team delivered project customers reliability observability mentoring agile").split()
+
+
+def fetch_time(connection, queries):
+    """Milliseconds to run ``queries`` again and fetch every row.
+
+    The debug cursor only times execute(), and SQLite reads the rows in fetch.
+    """
+    start = time.perf_counter()
+    with connection.cursor() as cursor:
+        for query in queries:
+            cursor.execute(query["sql"])
+            cursor.fetchall()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+    from screening.models import Applicant, Resume
+
+    rng = random.Random(7)
+    with test_database(), override_settings(RESPONSE_CACHE={"ENABLED": False}):
+        cache.clear()
+        for offset in range(0, args.rows, 5000):
+            batch = range(offset, min(args.rows, offset + 5000))
+            Applicant.objects.bulk_create([
+                Applicant(full_name=f"Applicant {i:07d}", email=f"a{i}@example.com", phone_number="+33123456789",
+                          skills=", ".join(rng.choices(WORDS, k=40)))
+                for i in batch
+            ])
+            applicants = list(Applicant.objects.filter(email__in=[f"a{i}@example.com" for i in batch]))
+            # Parsed resumes are a few pages of text: about 2,000 words.
+            Resume.objects.bulk_create([
+                Resume(applicant=applicant, file=f"resumes/{applicant.pk}.pdf",
+                       parsed_text=" ".join(rng.choices(WORDS, k=2000)),
+                       extracted_skills=", ".join(rng.sample(WORDS, 8)), ai_score=rng.uniform(0, 100))
+                for applicant in applicants
+            ])
+
+        client = Client()
+        cases = [
+            ("/resumes/ every field", "/resumes/?fields=id,applicant,file,parsed_text,extracted_skills,ai_score"),
+            ("/resumes/ default", "/resumes/"),
+            ("/resumes/?fields=id,applicant,ai_score", "/resumes/?fields=id,applicant,ai_score"),
+            ("/applicants/ default", "/applicants/"),
+            ("/applicants/?fields=id,full_name", "/applicants/?fields=id,full_name"),
+        ]
+        print(f"{'page of 500':<42} {'bytes':>10} {'db ms':>8} {'total ms':>9}")
+        for label, url in cases:
+            url += ("&" if "?" in url else "?") + "page_size=500"
+            sizes, db, total = [], [], []
+            for _ in range(args.iterations):
+                start = time.perf_counter()
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.get(url)
+                total.append((time.perf_counter() - start) * 1000)
+                db.append(fetch_time(connection, queries.captured_queries))
+                sizes.append(len(response.content))
+            print(f"{label:<42} {sizes[-1]:>10,} {statistics.median(db):8.1f} {statistics.median(total):9.1f}")
+
+
+if __name__ == "__main__":
+    main()
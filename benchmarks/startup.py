@@ -0,0 +1,81 @@
+"""
+Startup cost of the project with the routing model loaded lazily versus
+eagerly at import time (the previous behaviour).
+
+Reports the cumulative `python -X importtime` cost of importing
+screening.tasks, and the wall time from interpreter start to the first
+response served by the WSGI application.
+
+    python -m benchmarks.startup [--runs 5]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+FIRST_RESPONSE = """
+import time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+from django.test import Client
+application = get_wsgi_application()
+if {eager}:
+    from screening.tasks import routing_model
+    routing_model.get()
+Client().get("/metrics/timings/")
+print(time.perf_counter() - start)
+"""
+
+IMPORT_TASKS = """
+import django
+django.setup()
+if {eager}:
+    from screening.tasks import routing_model
+    routing_model.get()
+import screening.tasks
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "ai_based_resume_screening_recruitment.settings")
+    env["PYTHONWARNINGS"] = "ignore"
+    return env
+
+
+def import_time_ms(eager):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_TASKS.format(eager=eager)],
+        capture_output=True, text=True, env=_env(), check=True,
+    )
+    total = 0
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\S.*)$", line)
+        # Top-level imports only: cumulative time already includes their children.
+        if match and not match.group(2).startswith(" "):
+            total += int(match.group(1))
+    return total / 1000
+
+
+def first_response_ms(eager):
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_RESPONSE.format(eager=eager)],
+        capture_output=True, text=True, env=_env(), check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1]) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    for label, eager in (("eager model load", True), ("lazy model load", False)):
+        imports = statistics.median(import_time_ms(eager) for _ in range(args.runs))
+        first = statistics.median(first_response_ms(eager) for _ in range(args.runs))
+        print(f"{label:<18} imports={imports:8.1f}ms  cold start to first response={first:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
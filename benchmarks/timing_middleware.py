@@ -0,0 +1,46 @@
+"""
+Cost of RequestTimingMiddleware itself: a trivial view and a view running a
+few queries, called with and without the middleware.
+
+    python -m benchmarks.timing_middleware [--iterations 20000]
+"""
+import argparse
+
+from benchmarks import measure, percentile, report, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    setup()
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+    from screening.middleware import RequestTimingMiddleware
+    from screening.models import EdgeNode
+
+    with test_database():
+        request = RequestFactory().get("/bench/")
+
+        def empty_view(request):
+            return HttpResponse(b"ok")
+
+        def query_view(request):
+            for _ in range(5):
+                EdgeNode.objects.filter(pk=1).exists()
+            return HttpResponse(b"ok")
+
+        for label, view, iterations in (
+            ("no queries", empty_view, args.iterations),
+            ("5 queries", query_view, args.iterations // 10),
+        ):
+            bare = measure(lambda: view(request), iterations)
+            timed = measure(lambda: RequestTimingMiddleware(view)(request), iterations)
+            report(f"{label}: without middleware", bare)
+            report(f"{label}: with middleware", timed)
+            print(f"{label}: p50 overhead {percentile(timed, 50) - percentile(bare, 50):.1f}us")
+
+
+if __name__ == "__main__":
+    main()
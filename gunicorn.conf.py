@@ -0,0 +1,14 @@
+# Gunicorn reads ./gunicorn.conf.py automatically; command-line flags
+# (see Dockerfile) still take precedence.
+import gc
+
+# Import Django and the project once in the master so workers fork with it loaded.
+preload_app = True
+
+
+def when_ready(server):
+    """Load the routing model before workers fork so they share its memory copy-on-write."""
+    from screening.tasks import routing_model
+    routing_model.preload()
+    # Keep the garbage collector from touching (and so copying) pages inherited from the master.
+    gc.freeze()
@@ -1,16 +1,146 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from django.contrib.auth.models import AnonymousUser
 from .models import EdgeNode
 
+DEFAULT_CACHE_SETTINGS = {
+    "ENABLED": True,
+    "MAX_ENTRIES": 10000,
+    "TTL": 10,
+    "NEGATIVE_TTL": 30,
+    "SHARED_CACHE": None,
+    "SHARED_TTL": 300,
+}
+
+# Stored for keys known not to match any edge node.
+MISSING = "missing"
+
+
+def hash_api_key(api_key):
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+class APIKeyCache:
+    """
+    Two-tier cache of API key hash -> EdgeNode.
+
+    The first tier is a process-local LRU with a short TTL, which bounds how
+    long another process's changes can go unnoticed.  The optional second tier
+    is a shared Django cache (``SHARED_CACHE`` alias) that signal handlers
+    invalidate precisely.  Unknown keys are cached as ``MISSING`` for
+    ``NEGATIVE_TTL`` seconds so repeated bad keys never reach the database.
+    Plain-text keys are never stored: entries are keyed by SHA-256 and hold
+    EdgeNode instances loaded without ``api_key`` (reading it queries the
+    database).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._hash_by_node = {}
+
+    @property
+    def config(self):
+        return {**DEFAULT_CACHE_SETTINGS, **getattr(settings, "EDGE_NODE_AUTH_CACHE", {})}
+
+    def _shared(self):
+        alias = self.config["SHARED_CACHE"]
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def _shared_key(key_hash):
+        return f"edge-node-auth:{key_hash}"
+
+    def get(self, key_hash):
+        """Return the cached EdgeNode, ``MISSING``, or None when nothing is cached."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key_hash)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key_hash)
+                    return entry[0]
+                del self._entries[key_hash]
+        shared = self._shared()
+        if shared is None:
+            return None
+        value = shared.get(self._shared_key(key_hash))
+        if value is not None:
+            self._store_local(key_hash, value)
+        return value
+
+    def set(self, key_hash, value):
+        config = self.config
+        self._store_local(key_hash, value)
+        shared = self._shared()
+        if shared is not None:
+            ttl = config["NEGATIVE_TTL"] if value == MISSING else config["SHARED_TTL"]
+            shared.set(self._shared_key(key_hash), value, ttl)
+
+    def _store_local(self, key_hash, value):
+        config = self.config
+        ttl = config["NEGATIVE_TTL"] if value == MISSING else config["TTL"]
+        with self._lock:
+            self._entries[key_hash] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key_hash)
+            if value != MISSING:
+                self._hash_by_node[value.pk] = key_hash
+            while len(self._entries) > config["MAX_ENTRIES"]:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                if evicted != MISSING:
+                    self._hash_by_node.pop(evicted.pk, None)
+
+    def invalidate(self, node, previous_api_key=None):
+        """Drop cached entries for ``node`` under its current, previous and any locally cached key."""
+        hashes = {hash_api_key(key) for key in (node.api_key, previous_api_key) if key}
+        with self._lock:
+            previous = self._hash_by_node.pop(node.pk, None)
+            if previous:
+                hashes.add(previous)
+            for key_hash in hashes:
+                self._entries.pop(key_hash, None)
+        shared = self._shared()
+        if shared is not None:
+            shared.delete_many([self._shared_key(key_hash) for key_hash in hashes])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hash_by_node.clear()
+
+
+api_key_cache = APIKeyCache()
+
+
+def get_edge_node_for_key(api_key):
+    """Resolve an API key to its EdgeNode, or None if it is invalid."""
+    if not api_key_cache.config["ENABLED"]:
+        return EdgeNode.objects.filter(api_key=api_key).first()
+    key_hash = hash_api_key(api_key)
+    cached = api_key_cache.get(key_hash)
+    if cached is None:
+        cached = EdgeNode.objects.defer("api_key").filter(api_key=api_key).first() or MISSING
+        api_key_cache.set(key_hash, cached)
+    if cached == MISSING:
+        return None
+    return copy.copy(cached)
+
+
 class EdgeNodeAPIKeyAuthentication(BaseAuthentication):
     def authenticate(self, request):
         api_key = request.headers.get('X-API-KEY')
         if not api_key:
             return None
-        try:
-            edge_node = EdgeNode.objects.get(api_key=api_key)
-        except EdgeNode.DoesNotExist:
+        edge_node = get_edge_node_for_key(api_key)
+        if edge_node is None:
             raise AuthenticationFailed('Invalid API Key')
         request.edge_node = edge_node
-        return (AnonymousUser(), None)
\ No newline at end of file
+        return (AnonymousUser(), None)
@@ -0,0 +1,182 @@
+"""
+Bulk import of applicants and jobs from CSV or NDJSON.
+
+Input is read as a stream, one ``BATCH_SIZE`` batch of rows at a time.
+Each row is validated with its import serializer; invalid rows are reported
+with their line number and the rest of the batch is still written.  Valid
+applicants are upserted in one ``bulk_create(update_conflicts=True)`` per
+batch on the ``unique_applicant_email`` constraint, so re-importing a file
+updates the existing applicants.  Jobs have no natural key and are always
+inserted.
+
+``bulk_create`` sends no signals, so each batch refreshes what the signal
+handlers would have: the skill and search indexes, cached API responses,
+and the re-scoring queue for jobs.
+"""
+import codecs
+import csv
+import itertools
+import json
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from rest_framework import serializers
+
+from .models import Applicant, Job, Resume, SearchEntry
+from .serializers import ApplicantImportSerializer, JobSerializer
+
+DEFAULT_IMPORT_SETTINGS = {
+    "BATCH_SIZE": 1000,
+    "MAX_ERRORS": 1000,
+}
+
+FORMATS = ("csv", "ndjson")
+
+
+def import_settings():
+    return {**DEFAULT_IMPORT_SETTINGS, **getattr(settings, "IMPORT", {})}
+
+
+def read_rows(binary, fmt):
+    """Yield (line number, dict) from a binary stream; rows that cannot be decoded yield a str error."""
+    # A codecs reader only needs .read(), so an HttpRequest body can be streamed directly.
+    text = codecs.getreader("utf-8-sig")(binary)
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            # Empty cells count as missing, so optional fields get their defaults.
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in ("", None)}
+        return
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield number, f"Invalid JSON: {error}"
+            continue
+        yield number, row if isinstance(row, dict) else "Each line must be a JSON object."
+
+
+class Importer:
+    """Validates and writes one kind of object; subclasses define the model side."""
+    serializer_class = None
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        # One serializer for every row, as ListSerializer does: building the
+        # fields again for each row would cost more than validating it.
+        self.serializer = self.serializer_class()
+
+    def validate(self, rows):
+        """Split (line, data) pairs into (valid (line, validated data) pairs, errors)."""
+        valid, errors = [], []
+        for line, data in rows:
+            if isinstance(data, str):
+                errors.append({"line": line, "errors": {"non_field_errors": [data]}})
+                continue
+            try:
+                valid.append((line, self.serializer.run_validation(data)))
+            except serializers.ValidationError as error:
+                errors.append({"line": line, "errors": serializers.as_serializer_error(error)})
+        return valid, errors
+
+    def write(self, valid):
+        """Save validated rows; return errors for rows that could not be written."""
+        raise NotImplementedError
+
+
+class ApplicantImporter(Importer):
+    serializer_class = ApplicantImportSerializer
+    update_fields = ["full_name", "birthdate", "phone_number", "skills", "linkedin_profile", "updated_at"]
+
+    def write(self, valid):
+        from .response_cache import invalidate_applicants
+        from .search import index_objects
+        from .skills import rebuild_skill_index
+
+        errors = []
+        by_email = {}
+        for line, data in valid:
+            if data["email"] in by_email:
+                errors.append({"line": by_email[data["email"]][0],
+                               "errors": {"email": [f"Superseded by line {line} with the same email."]}})
+            by_email[data["email"]] = (line, data)
+        emails = list(by_email)
+        existing = set(Applicant.objects.filter(email__in=emails).values_list("email", flat=True))
+        Applicant.objects.bulk_create(
+            [Applicant(**data) for _, data in by_email.values()],
+            update_conflicts=True, unique_fields=["email"], update_fields=self.update_fields,
+        )
+        self.created += len(emails) - len(existing)
+        self.updated += len(existing)
+
+        written = Applicant.objects.filter(email__in=emails)
+        rebuild_skill_index(written)
+        ids = list(written.values_list("pk", flat=True))
+        index_objects(SearchEntry.APPLICANT, ids)
+        invalidate_applicants(ids)
+        if existing:
+            # Resume entries carry the applicant's name.
+            index_objects(SearchEntry.RESUME,
+                          Resume.objects.filter(applicant__email__in=existing).values_list("pk", flat=True))
+        return errors
+
+
+class JobImporter(Importer):
+    serializer_class = JobSerializer
+
+    def write(self, valid):
+        from .rescoring import mark_dirty
+        from .response_cache import invalidate_jobs
+        from .search import index_objects
+
+        jobs = Job.objects.bulk_create([Job(**data) for _, data in valid])
+        ids = [job.pk for job in jobs if job.pk is not None]
+        self.created += len(jobs)
+        index_objects(SearchEntry.JOB, ids)
+        mark_dirty(jobs=ids)
+        invalidate_jobs(ids)
+        return []
+
+
+IMPORTERS = {"applicants": ApplicantImporter, "jobs": JobImporter}
+
+
+def import_rows(name, rows, batch_size=None):
+    """
+    Validate and write (line, data) rows of import ``name`` in batches.
+    Returns:
+        dict: Numbers of created, updated and failed rows, and the first MAX_ERRORS row errors.
+    """
+    config = import_settings()
+    batch_size = batch_size or config["BATCH_SIZE"]
+    importer = IMPORTERS[name]()
+    failed = 0
+    errors = []
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            break
+        valid, batch_errors = importer.validate(batch)
+        if valid:
+            counts = importer.created, importer.updated
+            try:
+                with transaction.atomic():
+                    batch_errors += importer.write(valid)
+            except DatabaseError as error:
+                importer.created, importer.updated = counts
+                # The batch was rolled back as a whole; report every row of it.
+                batch_errors += [{"line": line, "errors": {"non_field_errors": [f"Database error: {error}"]}}
+                                 for line, _ in valid]
+        failed += len(batch_errors)
+        errors.extend(batch_errors[:max(0, config["MAX_ERRORS"] - len(errors))])
+    return {"created": importer.created, "updated": importer.updated, "failed": failed,
+            "errors": sorted(errors, key=lambda error: error["line"])}
+
+
+def import_stream(name, binary, fmt="csv", batch_size=None):
+    """Import ``name`` from a binary stream of CSV or NDJSON."""
+    return import_rows(name, read_rows(binary, fmt), batch_size)
@@ -0,0 +1,94 @@
+"""
+Content-addressed storage and parse-result reuse for resume uploads.
+
+``HashingUploadHandler`` (first in ``FILE_UPLOAD_HANDLERS``) feeds every
+uploaded chunk to SHA-256 while Django streams the request body, so the
+digest is known without reading the file again.  ``store_resume_upload``
+stores each distinct file once under ``resumes/sha256/..`` and returns its
+ResumeContent; a resume uploaded with known content points at the existing
+blob and copies the parsed text, skills and score instead of being parsed
+again.  ``ResumeContent.upload_count`` doubles as the hit counter reported
+by ``dedup_stats``.
+"""
+import hashlib
+
+from django.core.files.uploadhandler import FileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import ResumeContent, resume_content_path
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """Computes the SHA-256 of each uploaded file and passes the data on unchanged."""
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        self.size += len(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.request is not None:
+            hashes = getattr(self.request, "upload_content_hashes", None)
+            if hashes is None:
+                hashes = self.request.upload_content_hashes = {}
+            hashes[self.field_name] = (self.size, self.digest.hexdigest())
+        return None
+
+
+def uploaded_file_hash(uploaded, request=None, field_name="file"):
+    """SHA-256 of an uploaded file, from HashingUploadHandler when it saw the upload."""
+    size, digest = getattr(request, "upload_content_hashes", {}).get(field_name, (None, None))
+    if digest is not None and size == uploaded.size:
+        return digest
+    hasher = hashlib.sha256()
+    for chunk in uploaded.chunks():
+        hasher.update(chunk)
+    uploaded.seek(0)
+    return hasher.hexdigest()
+
+
+def store_resume_upload(uploaded, digest):
+    """
+    Return the ResumeContent for an upload, storing the file only if its content is new.
+    Returns:
+        tuple: (ResumeContent, created)
+    """
+    content = ResumeContent.objects.filter(pk=digest).first()
+    if content is None:
+        content = ResumeContent(content_hash=digest, size=uploaded.size)
+        storage = content.file.storage
+        name = resume_content_path(content, uploaded.name)
+        content.file.name = name if storage.exists(name) else storage.save(name, uploaded)
+        try:
+            with transaction.atomic():
+                content.save(force_insert=True)
+            return content, True
+        except IntegrityError:
+            # Stored concurrently by another request: fall through and count a hit.
+            content = ResumeContent.objects.get(pk=digest)
+    ResumeContent.objects.filter(pk=digest).update(upload_count=F("upload_count") + 1)
+    return content, False
+
+
+def dedup_stats():
+    """Upload, hit and CPU-saved counters across all stored resume contents."""
+    totals = ResumeContent.objects.aggregate(
+        contents=Count("pk"),
+        uploads=Sum("upload_count"),
+        cpu_ms_saved=Sum((F("upload_count") - 1) * F("parse_cpu_ms")),
+    )
+    uploads = totals["uploads"] or 0
+    hits = uploads - totals["contents"]
+    return {
+        "uploads": uploads,
+        "unique_contents": totals["contents"],
+        "hits": hits,
+        "hit_rate": round(hits / uploads, 4) if uploads else 0.0,
+        "cpu_ms_saved": round(totals["cpu_ms_saved"] or 0.0, 1),
+    }
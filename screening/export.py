@@ -0,0 +1,142 @@
+"""
+Streaming bulk export of applicants, job applications and request logs.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)``, which uses
+a server-side cursor on PostgreSQL, and written out as CSV or NDJSON in
+blocks of about ``BLOCK_BYTES``, optionally through an incremental gzip
+compressor.  Nothing holds more than one chunk of rows, so memory stays
+flat however many rows are exported.  ``ExportView`` wraps the stream in a
+StreamingHttpResponse; the ``export_data`` management command writes it to
+a file or stdout.
+"""
+import csv
+import datetime
+import decimal
+import io
+import json
+import zlib
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Applicant, APIRequestLog, JobApplication
+
+DEFAULT_EXPORT_SETTINGS = {
+    "CHUNK_SIZE": 5000,
+    "BLOCK_BYTES": 64 * 1024,
+    "GZIP_LEVEL": 6,
+}
+
+# name: (model, exported fields, field filtered by ?since=/?until=)
+EXPORTS = {
+    "applicants": (
+        Applicant,
+        ("id", "full_name", "email", "birthdate", "phone_number", "skills", "linkedin_profile", "user_id",
+         "created_at", "updated_at"),
+        "created_at",
+    ),
+    "applications": (
+        JobApplication,
+        ("id", "applicant_id", "job_id", "status", "created_at", "updated_at"),
+        "created_at",
+    ),
+    "request-logs": (
+        APIRequestLog,
+        ("id", "edge_node_id", "request_time", "response_time_ms", "db_time_ms", "latitude", "longitude",
+         "status_code", "client_ip", "extra_data"),
+        "request_time",
+    ),
+}
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def export_settings():
+    return {**DEFAULT_EXPORT_SETTINGS, **getattr(settings, "EXPORT", {})}
+
+
+def parse_bound(value):
+    """Aware datetime for an ISO date or datetime string; ValueError if it is neither."""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date or datetime: {value!r}")
+        parsed = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, datetime.timezone.utc)
+    return parsed
+
+
+def export_rows(name, since=None, until=None, chunk_size=None):
+    """Iterate the value tuples of export ``name``, in id order, with since <= time < until."""
+    model, fields, time_field = EXPORTS[name]
+    queryset = model.objects.order_by("id")
+    if since is not None:
+        queryset = queryset.filter(**{f"{time_field}__gte": since})
+    if until is not None:
+        queryset = queryset.filter(**{f"{time_field}__lt": until})
+    return queryset.values_list(*fields).iterator(chunk_size=chunk_size or export_settings()["CHUNK_SIZE"])
+
+
+def _plain(value):
+    if isinstance(value, (datetime.date, datetime.time, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+def _csv_blocks(fields, rows, block_bytes):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow([
+            json.dumps(value) if isinstance(value, (dict, list)) else _plain(value) for value in row
+        ])
+        if buffer.tell() >= block_bytes:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def _ndjson_blocks(fields, rows, block_bytes):
+    lines = []
+    size = 0
+    for row in rows:
+        line = json.dumps(dict(zip(fields, map(_plain, row))), separators=(",", ":"))
+        lines.append(line)
+        size += len(line) + 1
+        if size >= block_bytes:
+            yield ("\n".join(lines) + "\n").encode()
+            lines, size = [], 0
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def gzip_blocks(blocks, level=6):
+    """Compress a stream of byte blocks into one gzip member, incrementally."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for block in blocks:
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(name, fmt="csv", since=None, until=None, compress=False):
+    """
+    Byte blocks of export ``name`` in ``fmt`` ("csv" or "ndjson").
+    Args:
+        since (datetime): Only rows at or after this time.
+        until (datetime): Only rows before this time.
+        compress (bool): Gzip the stream.
+    """
+    config = export_settings()
+    fields = EXPORTS[name][1]
+    rows = export_rows(name, since, until, config["CHUNK_SIZE"])
+    write = _csv_blocks if fmt == "csv" else _ndjson_blocks
+    blocks = write(fields, rows, config["BLOCK_BYTES"])
+    return gzip_blocks(blocks, config["GZIP_LEVEL"]) if compress else blocks
@@ -0,0 +1,171 @@
+"""
+Fast read-only serialization of large lists.
+
+A ModelSerializer builds a model instance per row and walks its field tree
+for every attribute.  ``RowEncoder`` does that work once per serializer
+class: it reads the serializer's fields, maps each to the database column
+behind its source, and keeps a converter only for the fields whose
+representation differs from the value the database returns (dates,
+choices, ...).  Rows are then fetched with ``.values_list()`` (or
+``.values()`` for keyset pages, whose cursors read the ordering columns by
+name) and encoded with one dict build and the remaining converters, and the
+output is the same as the serializer's.
+
+Supported fields are those read from a column: model fields, primary key
+related fields and dotted sources through non-null foreign keys (e.g.
+``resume.applicant.full_name``).  Serializers with method, file, nested or
+many-related fields raise ImproperlyConfigured.
+
+``FastListMixin`` uses it for the ``list`` action of a viewset when
+``FAST_SERIALIZATION["ENABLED"]`` is set, one encoder per ``?fields=``
+projection (see screening.projection).
+"""
+import copy
+import functools
+import operator
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .projection import SparseFieldsMixin
+
+DEFAULT_FAST_SERIALIZATION_SETTINGS = {
+    "ENABLED": True,
+}
+
+# Fields whose to_representation returns the database value unchanged.
+PASSTHROUGH_FIELDS = {
+    serializers.CharField, serializers.EmailField, serializers.URLField, serializers.SlugField,
+    serializers.RegexField, serializers.IPAddressField, serializers.IntegerField, serializers.FloatField,
+    serializers.BooleanField, serializers.ReadOnlyField,
+}
+UNSUPPORTED_FIELDS = (
+    serializers.SerializerMethodField, serializers.FileField, serializers.BaseSerializer,
+    serializers.ManyRelatedField, serializers.HiddenField,
+)
+
+
+def fast_serialization_settings():
+    return {**DEFAULT_FAST_SERIALIZATION_SETTINGS, **getattr(settings, "FAST_SERIALIZATION", {})}
+
+
+def _converter(field):
+    """None when the field represents database values as they are, else a function of the value."""
+    if type(field) in PASSTHROUGH_FIELDS:
+        return None
+    if type(field) is serializers.JSONField:
+        return field.to_representation if field.binary else None
+    if type(field) is serializers.PrimaryKeyRelatedField:
+        return field.pk_field.to_representation if field.pk_field is not None else None
+    if isinstance(field, serializers.RelatedField):
+        raise ImproperlyConfigured(f"{type(field).__name__} {field.field_name!r} needs the related object.")
+    return field.to_representation
+
+
+class RowEncoder:
+    """Serializer output for database rows, compiled once per serializer class."""
+
+    def __init__(self, serializer_class, fields=None):
+        self.serializer_class = serializer_class
+        self.names, self.columns, self.converters = [], [], []
+        for name, field in serializer_class().fields.items():
+            if field.write_only or (fields is not None and name not in fields):
+                continue
+            if isinstance(field, UNSUPPORTED_FIELDS) or field.source == "*":
+                raise ImproperlyConfigured(
+                    f"{serializer_class.__name__}.{name} ({type(field).__name__}) cannot be read from a column."
+                )
+            self.names.append(name)
+            self.columns.append("__".join(field.source_attrs))
+            convert = _converter(field)
+            if convert is not None:
+                self.converters.append((name, field, convert))
+        self.columns_of = operator.itemgetter(*self.columns) if len(self.columns) > 1 else (
+            lambda row: (row[self.columns[0]],))
+
+    def values(self, queryset, extra=()):
+        """``queryset`` as dict rows holding the serializer's columns and ``extra`` columns."""
+        return queryset.values(*dict.fromkeys([*self.columns, *extra]))
+
+    def values_list(self, queryset):
+        """``queryset`` as tuples of the serializer's columns, in field order."""
+        return queryset.values_list(*self.columns)
+
+    def bind(self):
+        """(name, converter) pairs for one batch of rows."""
+        converters = []
+        for name, field, convert in self.converters:
+            if isinstance(field, serializers.DateTimeField) and not hasattr(field, "timezone"):
+                # Resolve the active time zone once per batch rather than once per value.
+                field = copy.copy(field)
+                field.timezone = field.default_timezone()
+                convert = field.to_representation
+            converters.append((name, convert))
+        return converters
+
+    def encode(self, row, converters=None):
+        """Serialized form of a tuple of the serializer's columns."""
+        data = dict(zip(self.names, row))
+        for name, convert in self.bind() if converters is None else converters:
+            value = data[name]
+            if value is not None:
+                data[name] = convert(value)
+        return data
+
+    def encode_rows(self, rows):
+        """Serialized form of tuple rows, or of dict rows from ``values()``."""
+        converters = self.bind()
+        return [self.encode(self.columns_of(row) if isinstance(row, dict) else row, converters) for row in rows]
+
+    def encode_queryset(self, queryset):
+        """Serialized rows of ``queryset``, as ``serializer_class(queryset, many=True).data`` would be."""
+        return self.encode_rows(self.values_list(queryset))
+
+
+@functools.lru_cache(maxsize=None)
+def row_encoder(serializer_class, fields=None):
+    """RowEncoder of ``serializer_class``, restricted to the tuple of field names ``fields``."""
+    return RowEncoder(serializer_class, fields)
+
+
+def serialize_queryset(serializer_class, queryset):
+    """``serializer_class(queryset, many=True).data``, through its RowEncoder when enabled."""
+    if not fast_serialization_settings()["ENABLED"]:
+        return serializer_class(queryset, many=True).data
+    return row_encoder(serializer_class).encode_queryset(queryset)
+
+
+class FastListMixin(SparseFieldsMixin):
+    """
+    Serve ``list`` through the serializer's RowEncoder instead of model
+    instances, with the ``?fields=`` projection applied.  Serializers the
+    encoder cannot read are served through model instances.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.fast_list_response(self.filter_queryset(self.get_queryset()))
+
+    def fast_list_response(self, queryset, serializer_class=None):
+        """Paginated (when the view paginates) list response of ``queryset``."""
+        serializer_class = serializer_class or self.get_serializer_class()
+        queryset, fields = self.project(queryset, serializer_class, many=True)
+        try:
+            encoder = row_encoder(serializer_class, fields) if fast_serialization_settings()["ENABLED"] else None
+        except ImproperlyConfigured:
+            encoder = None
+        if encoder is None:
+            page = self.paginate_queryset(queryset)
+            context = self.get_serializer_context()
+            if page is not None:
+                return self.get_paginated_response(serializer_class(page, many=True, fields=fields,
+                                                                    context=context).data)
+            return Response(serializer_class(queryset, many=True, fields=fields, context=context).data)
+        # Keyset cursors are built from the ordering columns, so the rows must carry them.
+        keys = self.paginator.get_keys(queryset) if hasattr(self.paginator, "get_keys") else []
+        rows = encoder.values(queryset, [name for name, _, _ in keys])
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(encoder.encode_rows(page))
+        return Response(encoder.encode_rows(rows))
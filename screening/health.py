@@ -0,0 +1,172 @@
+"""
+Active health checks for the EdgeNode fleet.
+
+``probe_targets`` sends one ``GET`` to every node concurrently on a single
+asyncio event loop.  Each probe has its own timeout, at most ``CONCURRENCY``
+connections are open at once, and the whole cycle is cut off after
+``BUDGET`` seconds; nodes that were not reached in time keep their current
+state until the next cycle.
+
+``check_edge_nodes`` applies the results with hysteresis: a healthy node is
+only marked unhealthy after ``FAIL_THRESHOLD`` consecutive failed probes, and
+an unhealthy one only recovers after ``RECOVER_THRESHOLD`` consecutive
+successes, so a flapping node does not keep entering and leaving the routing
+index.  The probe bookkeeping of all probed nodes is saved with one
+``bulk_update``; a status change is written with a conditional UPDATE that
+only applies if the status is still the one read before probing, so a status
+an operator set by hand during the cycle wins.  Status changes are published
+to the routing index of every process (``NodeIndex.publish``).
+"""
+import asyncio
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import EdgeNode
+from .routing import node_index
+
+DEFAULT_HEALTH_CHECK_SETTINGS = {
+    "PORT": 80,
+    "PATH": "/health/",
+    "TIMEOUT": 2.0,
+    "CONCURRENCY": 500,
+    "BUDGET": 20.0,
+    "FAIL_THRESHOLD": 3,
+    "RECOVER_THRESHOLD": 2,
+}
+
+ProbeTarget = namedtuple("ProbeTarget", ["node_id", "host", "port", "path"])
+ProbeResult = namedtuple("ProbeResult", ["node_id", "ok", "latency_ms"])
+
+
+def health_check_settings():
+    return {**DEFAULT_HEALTH_CHECK_SETTINGS, **getattr(settings, "EDGE_HEALTH_CHECK", {})}
+
+
+def default_target(node, config):
+    return ProbeTarget(node.pk, node.ip_address, config["PORT"], config["PATH"])
+
+
+async def _request(target):
+    reader, writer = await asyncio.open_connection(target.host, target.port)
+    try:
+        host = f"[{target.host}]" if ":" in target.host else target.host
+        writer.write(
+            f"GET {target.path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode("ascii")
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+    finally:
+        writer.close()
+    parts = status_line.split()
+    return len(parts) >= 2 and parts[0].startswith(b"HTTP/") and parts[1].startswith(b"2")
+
+
+async def _probe(target, timeout, semaphore):
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            ok = await asyncio.wait_for(_request(target), timeout)
+        except (OSError, asyncio.TimeoutError, UnicodeError):
+            ok = False
+        latency_ms = (time.perf_counter() - started) * 1000
+    return ProbeResult(target.node_id, ok, latency_ms if ok else None)
+
+
+async def _probe_all(targets, timeout, concurrency, budget):
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [asyncio.ensure_future(_probe(target, timeout, semaphore)) for target in targets]
+    if not tasks:
+        return []
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    return [task.result() for task in done]
+
+
+def probe_targets(targets, timeout=None, concurrency=None, budget=None):
+    """
+    Probe every target concurrently.
+    Args:
+        targets (list): ProbeTarget tuples.
+        timeout (float): Seconds allowed per probe (connect and status line).
+        concurrency (int): Maximum number of probes in flight.
+        budget (float): Seconds allowed for the whole cycle.
+    Returns:
+        dict: node_id -> ProbeResult, for the targets probed within the budget.
+    """
+    config = health_check_settings()
+    results = asyncio.run(_probe_all(
+        list(targets),
+        config["TIMEOUT"] if timeout is None else timeout,
+        config["CONCURRENCY"] if concurrency is None else concurrency,
+        config["BUDGET"] if budget is None else budget,
+    ))
+    return {result.node_id: result for result in results}
+
+
+def apply_probe_result(node, result, config, now):
+    """Update ``node`` in place from one probe result. Returns True if its status changed."""
+    if result.ok:
+        node.health_streak = max(node.health_streak, 0) + 1
+        node.last_health_latency_ms = result.latency_ms
+        new_status = "healthy" if node.health_streak >= config["RECOVER_THRESHOLD"] else node.status
+    else:
+        node.health_streak = min(node.health_streak, 0) - 1
+        node.last_health_latency_ms = None
+        new_status = "unhealthy" if -node.health_streak >= config["FAIL_THRESHOLD"] else node.status
+    node.last_health_check = now
+    changed = new_status != node.status
+    node.status = new_status
+    return changed
+
+
+def check_edge_nodes(target=default_target, **probe_options):
+    """
+    Probe all edge nodes and save the outcome.
+    Args:
+        target (callable): Maps (node, config) to the ProbeTarget to check.
+        **probe_options: Overrides for probe_targets (timeout, concurrency, budget).
+    Returns:
+        dict: Counts of probed, healthy, unhealthy and changed nodes, and the elapsed time.
+    """
+    config = health_check_settings()
+    started = time.perf_counter()
+    nodes = list(EdgeNode.objects.only(
+        "id", "ip_address", "status", "last_health_check", "last_health_latency_ms", "health_streak",
+    ))
+    results = probe_targets([target(node, config) for node in nodes], **probe_options)
+
+    now = timezone.now()
+    probed, transitions, changed = [], [], []
+    for node in nodes:
+        result = results.get(node.pk)
+        if result is None:
+            continue
+        probed.append(node)
+        previous = node.status
+        if apply_probe_result(node, result, config, now):
+            transitions.append((node, previous))
+    EdgeNode.objects.bulk_update(
+        probed, ["last_health_check", "last_health_latency_ms", "health_streak"], batch_size=1000,
+    )
+    for node, previous in transitions:
+        if EdgeNode.objects.filter(pk=node.pk, status=previous).update(status=node.status):
+            changed.append(node.pk)
+        else:
+            node.status = EdgeNode.objects.filter(pk=node.pk).values_list("status", flat=True).first()
+    if changed:
+        # Queryset updates send no post_save signals, so refresh the routing indexes here.
+        node_index.publish()
+    return {
+        "probed": len(probed),
+        "skipped": len(nodes) - len(probed),
+        "healthy": sum(1 for node in probed if node.status == "healthy"),
+        "unhealthy": sum(1 for node in probed if node.status == "unhealthy"),
+        "changed": len(changed),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
@@ -0,0 +1,152 @@
+"""
+Fast inference for the routing model.
+
+``CompiledForest`` flattens a fitted RandomForestClassifier into plain NumPy
+arrays and walks every tree for a whole batch at once, reproducing
+scikit-learn's ``predict`` exactly (same float32 input cast, same per-tree
+probability normalisation and accumulation order).  ``BatchPredictor``
+collects concurrent single-sample requests for a few milliseconds and scores
+them in one call.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class CompiledForest:
+    def __init__(self, forest):
+        estimators = getattr(forest, "estimators_", None)
+        if not estimators or getattr(forest, "n_outputs_", 1) != 1:
+            raise ValueError("CompiledForest needs a fitted single-output forest classifier.")
+        self.classes_ = forest.classes_
+        self.n_features = forest.n_features_in_
+        n_classes = len(self.classes_)
+
+        left, right, feature, threshold, value, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            # Leaves point at themselves so every row can take the same number of steps.
+            left.append(np.where(is_leaf, ids, tree.children_left) + offset)
+            right.append(np.where(is_leaf, ids, tree.children_right) + offset)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            proba = tree.value[:, 0, :n_classes].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            value.append(proba / normalizer)
+            roots.append(offset)
+            offset += tree.node_count
+            depth = max(depth, tree.max_depth)
+
+        self.left = np.concatenate(left)
+        self.right = np.concatenate(right)
+        self.feature = np.concatenate(feature)
+        self.threshold = np.concatenate(threshold)
+        self.value = np.concatenate(value)
+        self.roots = np.asarray(roots)
+        self.depth = depth
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected input of shape (n_samples, {self.n_features}).")
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        leaf_values = self.value[nodes]
+        proba = np.zeros((X.shape[0], len(self.classes_)))
+        for tree in range(len(self.roots)):
+            proba += leaf_values[:, tree]
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+def compile_model(model):
+    """Return a fast equivalent of ``model`` when it is a forest classifier, else ``model`` itself."""
+    try:
+        return CompiledForest(model)
+    except (ValueError, AttributeError):
+        return model
+
+
+class BatchPredictor:
+    """
+    Micro-batches concurrent ``predict`` calls.
+
+    Callers block on a future while a background thread gathers requests for
+    up to ``max_wait_ms`` (or ``max_batch_size`` samples) and scores them with
+    one ``predict_batch`` call.  If that call fails, the samples are scored one
+    at a time so only the callers whose sample fails get the exception.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=256, max_wait_ms=2.0):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            threading.Thread(target=self._run, name="batch-predictor", daemon=True).start()
+            self._pid = os.getpid()
+
+    def submit(self, features):
+        """Queue one sample and return a Future of its prediction."""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((features, future))
+        return future
+
+    def predict(self, features):
+        return self.submit(features).result()
+
+    def _gather(self):
+        batch = [self._queue.get()]
+        end = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = end - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _predict_each(self, batch):
+        for features, future in batch:
+            try:
+                prediction = self.predict_batch(np.asarray([features]))[0]
+            except Exception as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(prediction)
+
+    def _run(self):
+        while True:
+            batch = self._gather()
+            try:
+                predictions = self.predict_batch(np.asarray([features for features, _ in batch]))
+            except Exception:
+                self._predict_each(batch)
+            else:
+                for (_, future), prediction in zip(batch, predictions):
+                    future.set_result(prediction)
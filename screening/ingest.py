@@ -0,0 +1,389 @@
+"""
+Bulk ingestion of APIRequestLog records posted by edge nodes.
+
+An edge node authenticated by its X-API-KEY POSTs a batch of records to
+``/ingest/logs/`` with an ``Idempotency-Key`` header, as NDJSON (one record
+per line) or a JSON array, optionally compressed (``Content-Encoding: gzip``
+or ``deflate``)::
+
+    {"request_time": "2026-10-18T10:00:00Z", "response_time_ms": 12.5, "db_time_ms": 3.1,
+     "latitude": 36.8, "longitude": 10.2, "status_code": 200, "client_ip": "10.1.2.3", "extra_data": {...}}
+
+``request_time`` may also be a Unix timestamp, and may not be more than
+``MAX_CLOCK_SKEW_SECONDS`` ahead of the server clock nor more than
+``MAX_AGE_DAYS`` behind it (never past the log retention period): the
+rollups and the partition retention both follow request times, and a row
+backdated into a compacted or dropped partition would be lost or land in the
+default partition.  Numbers are JSON numbers or numeric strings, never
+booleans; ``client_ip`` may not carry an IPv6 zone (``fe80::1%eth0``),
+which PostgreSQL's inet type rejects.  ``db_time_ms`` and
+``extra_data`` are optional, the latter a JSON object of at most
+``MAX_EXTRA_DATA_BYTES`` encoded bytes.  Every record is stored for the posting node.
+
+Records are validated a column at a time: numeric fields are converted to
+numpy arrays and range-checked with array operations, and only timestamps
+and IP addresses are parsed per value (IP addresses once per distinct
+address).  Invalid records are reported by index and the valid ones are
+written: with COPY on PostgreSQL, with one executemany INSERT per
+``BATCH_SIZE`` rows elsewhere.  Either way the ORM is bypassed (as
+``bulk_create`` would be for signals): values are prepared for the
+database a column at a time rather than field by field.
+
+The rows and the LogIngestBatch row holding the key are written in one
+transaction, and the unique (edge_node, key) constraint makes a retried
+upload, even one racing the original, return the stored result instead of
+writing the rows again.  Keys are kept ``KEY_TTL_DAYS`` days.
+"""
+import io
+import ipaddress
+import json
+import re
+import zlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import APIRequestLog, LogIngestBatch
+from .partitions import log_partition_settings
+
+DEFAULT_LOG_INGEST_SETTINGS = {
+    "MAX_BYTES": 32 * 1024 * 1024,
+    "MAX_RECORDS": 100_000,
+    "BATCH_SIZE": 5000,
+    "MAX_ERRORS": 100,
+    "KEY_TTL_DAYS": 7,
+    "MAX_CLOCK_SKEW_SECONDS": 300,
+    "MAX_AGE_DAYS": 7,
+    "MAX_EXTRA_DATA_BYTES": 16 * 1024,
+}
+
+COLUMNS = ("edge_node_id", "request_time", "response_time_ms", "db_time_ms", "latitude", "longitude",
+           "status_code", "client_ip", "extra_data")
+_OCTET = r"(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])"
+IPV4_RE = re.compile(rf"{_OCTET}(?:\.{_OCTET}){{3}}")
+# zlib window bits: gzip header, zlib header.
+ENCODINGS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+# Exact types, so that booleans (an int subclass) are not numbers.
+NUMBER_TYPES = (int, float)
+
+
+class IngestError(ValueError):
+    """The upload as a whole cannot be read; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def log_ingest_settings():
+    return {**DEFAULT_LOG_INGEST_SETTINGS, **getattr(settings, "LOG_INGEST", {})}
+
+
+def decode_body(body, encoding=None, max_bytes=None):
+    """Uncompressed body, refusing anything larger than ``max_bytes`` once uncompressed."""
+    max_bytes = max_bytes or log_ingest_settings()["MAX_BYTES"]
+    encoding = (encoding or "identity").strip().lower()
+    if encoding in ("", "identity"):
+        data = body
+    elif encoding in ENCODINGS:
+        decompressor = zlib.decompressobj(ENCODINGS[encoding])
+        try:
+            data = decompressor.decompress(body, max_bytes + 1)
+        except zlib.error as error:
+            raise IngestError(f"Invalid {encoding} body: {error}")
+    else:
+        raise IngestError(f"Unsupported Content-Encoding {encoding!r}; use gzip or deflate.", status=415)
+    if len(data) > max_bytes:
+        raise IngestError(f"Body larger than {max_bytes} bytes.", status=413)
+    return data
+
+
+def parse_records(data):
+    """
+    Records of an NDJSON or JSON array body.
+    Returns:
+        tuple: (records, {index: error}) where unparsable lines are None records.
+    """
+    stripped = data.lstrip()
+    if stripped[:1] == b"[":
+        try:
+            records = json.loads(stripped)
+        except ValueError as error:
+            raise IngestError(f"Invalid JSON: {error}")
+        if not isinstance(records, list):
+            raise IngestError("Expected a JSON array of records.")
+        return records, {}
+    # Each line is parsed on its own so that record indexes always match line numbers.
+    lines = [line for line in data.splitlines() if line.strip()]
+    records, errors = [], {}
+    for index, line in enumerate(lines):
+        try:
+            records.append(json.loads(line))
+        except ValueError as error:
+            records.append(None)
+            errors[index] = {"non_field_errors": [f"Invalid JSON: {error}"]}
+    return records, errors
+
+
+def _number_column(values):
+    """float64 array of ``values``; missing values, booleans and non-numeric values are NaN."""
+    if all(type(value) in NUMBER_TYPES for value in values):
+        try:
+            return np.array(values, dtype=np.float64)
+        except OverflowError:
+            pass
+    column = np.empty(len(values), dtype=np.float64)
+    for index, value in enumerate(values):
+        try:
+            column[index] = float(value) if type(value) in NUMBER_TYPES or type(value) is str else np.nan
+        except (ValueError, OverflowError):
+            column[index] = np.nan
+    return column
+
+
+def _parse_time(value):
+    """Aware datetime of an ISO 8601 string (naive ones are UTC) or a Unix timestamp; ValueError otherwise."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value, dt_timezone.utc)
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        raise ValueError
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def validate_records(records, errors=None, now=None):
+    """
+    Check ``records`` a field at a time; request times past ``now`` plus the allowed clock skew, or older
+    than the allowed age, are rejected.
+    Returns:
+        tuple: (dict of valid column lists, keyed like COLUMNS without edge_node_id; {index: field errors}).
+    """
+    errors = dict(errors or {})
+    count = len(records)
+    invalid = np.zeros(count, dtype=bool)
+
+    def reject(mask, field, message):
+        for index in np.flatnonzero(mask):
+            errors.setdefault(int(index), {}).setdefault(field, []).append(message)
+        invalid[mask] = True
+
+    is_dict = np.fromiter((isinstance(record, dict) for record in records), dtype=bool, count=count)
+    for index in np.flatnonzero(~is_dict):
+        errors.setdefault(int(index), {"non_field_errors": ["Each record must be a JSON object."]})
+    invalid |= ~is_dict
+    records = [record if isinstance(record, dict) else {} for record in records]
+
+    numbers = {
+        field: _number_column([record.get(field) for record in records])
+        for field in ("response_time_ms", "db_time_ms", "latitude", "longitude", "status_code")
+    }
+    with np.errstate(invalid="ignore"):
+        for field in ("response_time_ms", "latitude", "longitude", "status_code"):
+            reject(np.isnan(numbers[field]) & is_dict, field, "A number is required.")
+        reject(np.abs(numbers["latitude"]) > 90, "latitude", "Latitude must be between -90 and 90 degrees.")
+        reject(np.abs(numbers["longitude"]) > 180, "longitude", "Longitude must be between -180 and 180 degrees.")
+        for field in ("response_time_ms", "db_time_ms"):
+            reject((numbers[field] < 0) | np.isinf(numbers[field]), field, "Must be a finite number >= 0.")
+        status = numbers["status_code"]
+        reject(((status < 100) | (status > 599) | (status != np.floor(status))) & ~np.isnan(status),
+               "status_code", "Must be an HTTP status code.")
+
+    config = log_ingest_settings()
+    now = now or timezone.now()
+    skew = config["MAX_CLOCK_SKEW_SECONDS"]
+    latest = now + timedelta(seconds=skew)
+    max_age = min(config["MAX_AGE_DAYS"], log_partition_settings()["RETENTION_DAYS"])
+    earliest = now - timedelta(days=max_age)
+    request_times = [None] * count
+    for index, record in enumerate(records):
+        try:
+            request_times[index] = _parse_time(record["request_time"])
+        except (KeyError, TypeError, ValueError, OverflowError, OSError):
+            if is_dict[index]:
+                errors.setdefault(index, {}).setdefault("request_time", []).append(
+                    "An ISO 8601 datetime or Unix timestamp is required.")
+                invalid[index] = True
+            continue
+        if request_times[index] > latest:
+            errors.setdefault(index, {}).setdefault("request_time", []).append(
+                f"Must not be more than {skew} seconds in the future.")
+            invalid[index] = True
+        elif request_times[index] < earliest:
+            errors.setdefault(index, {}).setdefault("request_time", []).append(
+                f"Must not be more than {max_age} days old.")
+            invalid[index] = True
+
+    addresses = {}
+    client_ips = [record.get("client_ip") for record in records]
+    for index, address in enumerate(client_ips):
+        valid = addresses.get(address) if isinstance(address, str) else False
+        if valid is None:
+            # Dotted IPv4 addresses are checked with a regex; ipaddress parses the rest.
+            valid = IPV4_RE.fullmatch(address) is not None
+            if not valid:
+                try:
+                    valid = getattr(ipaddress.ip_address(address), "scope_id", None) is None
+                except ValueError:
+                    pass
+            addresses[address] = valid
+        if not valid and is_dict[index]:
+            errors.setdefault(index, {}).setdefault("client_ip", []).append("A valid IPv4 or IPv6 address is required.")
+            invalid[index] = True
+
+    max_extra = log_ingest_settings()["MAX_EXTRA_DATA_BYTES"]
+    for index, record in enumerate(records):
+        extra = record.get("extra_data")
+        if extra is None:
+            continue
+        message = None
+        if not isinstance(extra, dict):
+            message = "Must be a JSON object."
+        else:
+            try:
+                encoded = json.dumps(extra, allow_nan=False)
+            except ValueError:
+                message = "NaN and Infinity are not valid JSON."
+            else:
+                if len(encoded) > max_extra:
+                    message = f"At most {max_extra} bytes once encoded."
+                elif "\\u0000" in encoded:
+                    # PostgreSQL's jsonb cannot store NUL characters.
+                    message = "Must not contain NUL characters."
+        if message:
+            errors.setdefault(index, {}).setdefault("extra_data", []).append(message)
+            invalid[index] = True
+
+    keep = np.flatnonzero(~invalid)
+    db_time = numbers["db_time_ms"][keep]
+    columns = {
+        "request_time": [request_times[index] for index in keep],
+        "response_time_ms": numbers["response_time_ms"][keep].tolist(),
+        "db_time_ms": [None if value != value else value for value in db_time.tolist()],
+        "latitude": numbers["latitude"][keep].tolist(),
+        "longitude": numbers["longitude"][keep].tolist(),
+        "status_code": numbers["status_code"][keep].astype(np.int64).tolist(),
+        "client_ip": [client_ips[index] for index in keep],
+        "extra_data": [records[index].get("extra_data") for index in keep],
+    }
+    return columns, errors
+
+
+def _copy_text(value):
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def copy_buffer(columns):
+    """COPY text-format data of ``columns`` (keyed like COLUMNS), formatted a column at a time."""
+    null = "\\N"
+    formatted = [
+        [str(value) for value in columns["edge_node_id"]],
+        [value.isoformat() for value in columns["request_time"]],
+        [repr(value) for value in columns["response_time_ms"]],
+        [null if value is None else repr(value) for value in columns["db_time_ms"]],
+        [repr(value) for value in columns["latitude"]],
+        [repr(value) for value in columns["longitude"]],
+        [str(value) for value in columns["status_code"]],
+        # Validated addresses hold no character COPY would need escaped.
+        columns["client_ip"],
+        [null if value is None else _copy_text(json.dumps(value)) for value in columns["extra_data"]],
+    ]
+    buffer = io.StringIO()
+    buffer.writelines("\t".join(row) + "\n" for row in zip(*formatted))
+    buffer.seek(0)
+    return buffer
+
+
+def _copy_rows(columns):
+    """COPY ``columns`` into the log table (psycopg2's copy_expert, or psycopg 3's copy)."""
+    buffer = copy_buffer(columns)
+    quoted = connection.ops.quote_name
+    sql = f"COPY {quoted(APIRequestLog._meta.db_table)} ({', '.join(map(quoted, COLUMNS))}) FROM STDIN"
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):
+            raw.copy_expert(sql, buffer)
+        else:
+            with raw.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def _insert_rows(columns, count, batch_size):
+    """INSERT the rows of ``columns`` with executemany, preparing values a column at a time."""
+    ops = connection.ops
+    prepared = [
+        columns["edge_node_id"],
+        [ops.adapt_datetimefield_value(value) for value in columns["request_time"]],
+        *(columns[name] for name in ("response_time_ms", "db_time_ms", "latitude", "longitude", "status_code",
+                                     "client_ip")),
+        [None if value is None else ops.adapt_json_value(value, None) for value in columns["extra_data"]],
+    ]
+    rows = list(zip(*prepared))
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        ops.quote_name(APIRequestLog._meta.db_table), ", ".join(map(ops.quote_name, COLUMNS)),
+        ", ".join(["%s"] * len(COLUMNS)),
+    )
+    with connection.cursor() as cursor:
+        for start in range(0, count, batch_size):
+            cursor.executemany(sql, rows[start:start + batch_size])
+
+
+def write_columns(edge_node_id, columns, batch_size=None):
+    """Insert the validated ``columns`` for ``edge_node_id``; return the number of rows written."""
+    count = len(columns["request_time"])
+    if not count:
+        return 0
+    columns = {**columns, "edge_node_id": [edge_node_id] * count}
+    if connection.vendor == "postgresql":
+        _copy_rows(columns)
+    else:
+        _insert_rows(columns, count, batch_size or log_ingest_settings()["BATCH_SIZE"])
+    return count
+
+
+def _result(batch, duplicate):
+    return {"accepted": batch.accepted, "rejected": batch.rejected, "errors": batch.errors, "duplicate": duplicate}
+
+
+def ingest_logs(edge_node, key, body, encoding=None):
+    """
+    Validate and store one upload of ``edge_node``, once per idempotency ``key``.
+    Returns:
+        dict: accepted and rejected record counts, the first MAX_ERRORS errors, and whether
+        ``key`` had already been ingested (in which case nothing is written).
+    Raises:
+        IngestError: The body cannot be decoded, or holds too many records.
+    """
+    config = log_ingest_settings()
+    batch = LogIngestBatch.objects.filter(edge_node=edge_node, key=key).first()
+    if batch is not None:
+        return _result(batch, True)
+    records, errors = parse_records(decode_body(body, encoding, config["MAX_BYTES"]))
+    if len(records) > config["MAX_RECORDS"]:
+        raise IngestError(f"At most {config['MAX_RECORDS']} records per upload.", status=413)
+    columns, errors = validate_records(records, errors)
+    reported = [{"index": index, "errors": errors[index]} for index in sorted(errors)[:config["MAX_ERRORS"]]]
+    try:
+        with transaction.atomic():
+            batch = LogIngestBatch.objects.create(edge_node=edge_node, key=key, rejected=len(errors),
+                                                  errors=reported)
+            batch.accepted = write_columns(edge_node.pk, columns, config["BATCH_SIZE"])
+            batch.save(update_fields=["accepted"])
+    except IntegrityError:
+        # The same upload was ingested concurrently; its transaction has committed.
+        batch = LogIngestBatch.objects.filter(edge_node=edge_node, key=key).first()
+        if batch is None:
+            raise
+        return _result(batch, True)
+    return _result(batch, False)
+
+
+def prune_ingest_batches(now=None):
+    """Forget idempotency keys older than KEY_TTL_DAYS; return how many were deleted."""
+    cutoff = (now or timezone.now()) - timedelta(days=log_ingest_settings()["KEY_TTL_DAYS"])
+    return LogIngestBatch.objects.filter(received_at__lt=cutoff).delete()[0]
@@ -0,0 +1,97 @@
+"""
+Per-request batch loaders for the GraphQL schema.
+
+Resolvers run synchronously, so instead of promise-based DataLoaders the
+parent resolver announces the keys its children will ask for
+(``enqueue``) and the first ``load`` fetches all pending keys in a single
+query.  Loaders live on the request object, so results are never shared
+between requests.
+"""
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .models import APIRequestLog, EdgeNode
+from .partitions import in_window, time_windows
+
+
+class BatchLoader:
+    def __init__(self, batch_fn, default=None):
+        self._batch_fn = batch_fn
+        self._default = default
+        self._cache = {}
+        self._pending = set()
+
+    def enqueue(self, keys):
+        self._pending.update(key for key in keys if key not in self._cache)
+
+    def prime(self, key, value):
+        self._cache[key] = value
+        self._pending.discard(key)
+
+    def load(self, key):
+        if key not in self._cache:
+            self._pending.add(key)
+            self._dispatch()
+        return self._cache[key]
+
+    def _dispatch(self):
+        keys, self._pending = self._pending, set()
+        results = self._batch_fn(keys)
+        for key in keys:
+            self._cache[key] = results.get(key, self._default() if callable(self._default) else self._default)
+
+
+class RequestLoaders:
+    def __init__(self):
+        self.edge_nodes = BatchLoader(self._load_edge_nodes)
+        self._api_logs = {}
+        self._node_ids = set()
+
+    def _load_edge_nodes(self, ids):
+        nodes = EdgeNode.objects.in_bulk(ids)
+        self.note_nodes(nodes)
+        return nodes
+
+    def note_nodes(self, node_ids):
+        """Remember nodes resolved in this request so their api_logs can be fetched together."""
+        node_ids = set(node_ids)
+        self._node_ids |= node_ids
+        for loader in self._api_logs.values():
+            loader.enqueue(node_ids)
+
+    def api_logs(self, first):
+        """Loader of each node's ``first`` most recent logs."""
+        loader = self._api_logs.get(first)
+        if loader is None:
+            loader = self._api_logs[first] = BatchLoader(lambda ids: self._load_api_logs(ids, first), default=list)
+            loader.enqueue(self._node_ids)
+        return loader
+
+    def _load_api_logs(self, node_ids, first):
+        """Each node's ``first`` newest logs, in one query per time window (see screening.partitions)."""
+        logs = {}
+        pending = set(node_ids)
+        for lower, upper in time_windows(APIRequestLog.objects.filter(edge_node_id__in=pending)):
+            ranked = in_window(APIRequestLog.objects.filter(edge_node_id__in=pending), lower, upper).annotate(
+                position=Window(
+                    RowNumber(),
+                    partition_by=F('edge_node_id'),
+                    order_by=[F('request_time').desc(), F('id').desc()],
+                )
+            ).filter(position__lte=first).order_by('edge_node_id', '-request_time', '-id')
+            for log in ranked:
+                logs.setdefault(log.edge_node_id, []).append(log)
+            # Windows get older: only nodes still short of ``first`` logs read the next one.
+            pending = {node_id for node_id in pending if len(logs.get(node_id, ())) < first}
+            if not pending:
+                break
+        return {node_id: node_logs[:first] for node_id, node_logs in logs.items()}
+
+
+def get_loaders(context):
+    """Return the loaders bound to the current request, creating them on first use."""
+    loaders = getattr(context, "_graphql_loaders", None)
+    if loaders is None:
+        loaders = RequestLoaders()
+        context._graphql_loaders = loaders
+    return loaders
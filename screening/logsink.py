@@ -0,0 +1,191 @@
+"""
+Buffered writer for APIRequestLog rows.
+
+Request handlers hand log rows to ``api_log_buffer`` instead of inserting
+them one by one.  Rows are queued in memory and written with ``bulk_create``
+once ``BATCH_SIZE`` rows are waiting or ``FLUSH_INTERVAL`` seconds have
+passed.  The queue is bounded: when it is full the submitting thread flushes
+a batch itself, which slows producers down instead of growing memory.  Rows
+that cannot be written (database unavailable, process shutting down with a
+broken connection) are handed to the ``persist_api_request_logs`` Celery task
+so they survive a worker restart.
+
+Configuration lives in ``settings.API_REQUEST_LOG_BUFFER``:
+
+    API_REQUEST_LOG_BUFFER = {
+        "ENABLED": True,        # False writes every row synchronously
+        "BATCH_SIZE": 500,      # rows per bulk_create
+        "MAX_SIZE": 10000,      # queued rows before back-pressure kicks in
+        "FLUSH_INTERVAL": 1.0,  # seconds; None disables the background flusher
+    }
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": True,
+    "BATCH_SIZE": 500,
+    "MAX_SIZE": 10000,
+    "FLUSH_INTERVAL": 1.0,
+}
+
+
+def _config():
+    return {**DEFAULTS, **getattr(settings, "API_REQUEST_LOG_BUFFER", {})}
+
+
+def serialize_rows(rows):
+    """Make log rows JSON-safe for the Celery fallback."""
+    return [{**row, "request_time": row["request_time"].isoformat()} for row in rows]
+
+
+def write_rows(rows):
+    """Insert log rows (dicts of APIRequestLog field values) in one statement."""
+    from .models import APIRequestLog
+    APIRequestLog.objects.bulk_create([APIRequestLog(**row) for row in rows], batch_size=len(rows) or None)
+
+
+class APIRequestLogBuffer:
+    def __init__(self, batch_size=None, max_size=None, flush_interval=None, enabled=None):
+        self._overrides = {
+            "BATCH_SIZE": batch_size,
+            "MAX_SIZE": max_size,
+            "FLUSH_INTERVAL": flush_interval,
+            "ENABLED": enabled,
+        }
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.dropped = 0
+
+    def _option(self, name):
+        value = self._overrides[name]
+        return _config()[name] if value is None else value
+
+    @property
+    def enabled(self):
+        return self._option("ENABLED")
+
+    def _ensure_started(self):
+        # Queues and threads do not survive a fork, so each worker process gets its own.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self._option("MAX_SIZE"))
+            self._wakeup = threading.Event()
+            self._thread = None
+            if self._option("FLUSH_INTERVAL") is not None:
+                self._thread = threading.Thread(target=self._run, name="api-log-flusher", daemon=True)
+                self._thread.start()
+            if self._pid is None:
+                atexit.register(self.close)
+            self._pid = os.getpid()
+
+    def submit(self, **row):
+        """Queue one APIRequestLog row, given as model field values."""
+        row.setdefault("request_time", timezone.now())
+        if not self.enabled:
+            self._write([row])
+            return
+        self._ensure_started()
+        while True:
+            try:
+                self._queue.put_nowait(row)
+                break
+            except queue.Full:
+                # Back-pressure: the producer pays for a flush before it can enqueue.
+                self.flush(max_batches=1)
+        if self._queue.qsize() >= self._option("BATCH_SIZE"):
+            if self._thread is None:
+                self.flush(max_batches=1)
+            else:
+                self._wakeup.set()
+
+    def _drain(self):
+        batch = []
+        batch_size = self._option("BATCH_SIZE")
+        while len(batch) < batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self, max_batches=None):
+        """Write queued rows to the database; returns the number of rows written or handed off."""
+        if self._queue is None or self._pid != os.getpid():
+            return 0
+        written = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            batch = self._drain()
+            if not batch:
+                break
+            self._write(batch)
+            written += len(batch)
+            batches += 1
+        return written
+
+    def _write(self, rows):
+        try:
+            write_rows(rows)
+        except DatabaseError:
+            logger.exception("Writing %d API request logs failed, deferring to Celery", len(rows))
+            self._defer(rows)
+
+    def _defer(self, rows):
+        from .tasks import persist_api_request_logs
+        try:
+            persist_api_request_logs.delay(serialize_rows(rows))
+        except Exception:
+            self.dropped += len(rows)
+            logger.exception("Dropping %d API request logs: Celery fallback unavailable", len(rows))
+
+    def _run(self):
+        interval = self._option("FLUSH_INTERVAL")
+        while True:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("API request log flusher failed")
+            finally:
+                close_old_connections()
+
+    def close(self):
+        """Flush everything still queued; registered to run at interpreter exit."""
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Final API request log flush failed")
+
+
+api_log_buffer = APIRequestLogBuffer()
+
+
+def log_api_request(request, **row):
+    """
+    Queue an APIRequestLog row for ``request``.
+
+    With ``RequestTimingMiddleware`` installed the row is held until the
+    response is ready so the measured response and DB times can be attached.
+    """
+    timing = getattr(request, "timing", None)
+    if timing is None:
+        api_log_buffer.submit(response_time_ms=0, **row)
+    else:
+        timing.pending_logs.append(row)
@@ -0,0 +1,35 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from screening.export import EXPORTS, FORMATS, export_stream, parse_bound
+
+
+class Command(BaseCommand):
+    help = "Stream applicants, job applications or request logs as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", choices=sorted(EXPORTS), help="What to export.")
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv", dest="fmt")
+        parser.add_argument("--since", help="Only rows at or after this ISO date/datetime.")
+        parser.add_argument("--until", help="Only rows before this ISO date/datetime.")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output.")
+        parser.add_argument("--output", "-o", help="File to write (default: stdout).")
+
+    def handle(self, *args, **options):
+        try:
+            since, until = (parse_bound(options[key]) if options[key] else None for key in ("since", "until"))
+        except ValueError as error:
+            raise CommandError(str(error))
+        blocks = export_stream(options["name"], options["fmt"], since, until, options["gzip"])
+        output = open(options["output"], "wb") if options["output"] else sys.stdout.buffer
+        written = 0
+        try:
+            for block in blocks:
+                output.write(block)
+                written += len(block)
+        finally:
+            if options["output"]:
+                output.close()
+        if options["output"]:
+            self.stdout.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}"))
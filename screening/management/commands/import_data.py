@@ -0,0 +1,26 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from screening.bulk_import import FORMATS, IMPORTERS, import_stream
+
+
+class Command(BaseCommand):
+    help = "Bulk import applicants (upserted by email) or jobs from a CSV or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", choices=sorted(IMPORTERS), help="What to import.")
+        parser.add_argument("path", help="CSV or NDJSON file.")
+        parser.add_argument("--format", choices=FORMATS, dest="fmt",
+                            help="Input format (default: from the file extension).")
+        parser.add_argument("--batch-size", type=int, help="Rows validated and written per batch.")
+
+    def handle(self, *args, **options):
+        fmt = options["fmt"] or ("ndjson" if options["path"].endswith((".ndjson", ".jsonl")) else "csv")
+        with open(options["path"], "rb") as file:
+            result = import_stream(options["name"], file, fmt, options["batch_size"])
+        for error in result["errors"]:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']} created, {result['updated']} updated, {result['failed']} failed"
+        ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from screening.training import train_routing_model
+
+
+class Command(BaseCommand):
+    help = "Train the routing model from APIRequestLog history and publish a new versioned artifact."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=10000, help="Log rows per partial_fit call.")
+        parser.add_argument("--epochs", type=int, default=1, help="Passes over the training rows.")
+        parser.add_argument("--from-scratch", action="store_true", help="Ignore the latest artifact and retrain on all logs.")
+        parser.add_argument("--no-publish", action="store_true", help="Write the artifact without publishing it.")
+
+    def handle(self, *args, **options):
+        result = train_routing_model(
+            chunk_size=options["chunk_size"],
+            epochs=options["epochs"],
+            warm_start=not options["from_scratch"],
+            publish=not options["no_publish"],
+        )
+        if result["status"] != "trained":
+            self.stdout.write(f"Nothing to train: {result['reason']}.")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Trained routing model {result['version']} on {result['samples']} samples "
+            f"(logs up to id {result['trained_through_log_id']}) -> {result['path']}"
+        ))
@@ -0,0 +1,392 @@
+"""
+Resume-to-job matching.
+
+Resumes (``parsed_text`` + ``extracted_skills``) and jobs (``title`` +
+``description`` + ``required_skills``) are turned into L2-normalised sparse
+vectors with the hashing trick, so no vocabulary has to be fitted or kept in
+memory.  Skill fields are weighted above free text and terms are weighted by
+their inverse document frequency over the jobs.  A resume's score against
+every job is one row of ``R @ J.T`` (see JobSpace): resumes are streamed
+from the database in chunks and each chunk is multiplied by the job matrix,
+so memory is bounded by ``chunk size x number of jobs`` (``MAX_BLOCK_CELLS``)
+whatever the number of resumes.
+
+From every block the engine keeps:
+
+* ``Resume.ai_score``: the best cosine similarity over all jobs, as a
+  percentage, saved with ``bulk_update``;
+* the running top ``TOP_K`` resumes per job, merged block by block with
+  ``argpartition`` and saved as JobMatch rows at the end.
+
+Tokenizing resumes is most of the cost of a run, and a resume's term
+counts do not depend on the jobs, so each process keeps the sublinear-tf
+vectors of up to ``VECTOR_CACHE_SIZE`` resume documents (``resume_vectors``).
+A job edit (see screening.rescoring) then re-scores every resume without
+tokenizing the cached ones; with more scorable resumes than that, the rest
+are tokenized again on every column re-score (see TermVectorCache), so the
+setting should cover the resume count (about 4 KB per 300-word resume).
+Job term vectors are cached the same way (``job_vectors``), and the last
+JobSpace is kept while the jobs are unchanged (``job_space``).
+"""
+import copy
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .models import Job, JobMatch, Resume, ResumeContent
+from .response_cache import invalidate_resumes
+
+DEFAULT_MATCHING_SETTINGS = {
+    "N_FEATURES": 2 ** 20,
+    "SKILL_WEIGHT": 3,
+    "TOP_K": 50,
+    "MAX_BLOCK_CELLS": 20_000_000,
+    "MIN_SCORE": 0.0,
+    "MAX_DF": 0.5,
+    "DENSE_DF": 0.01,
+    "MAX_DENSE_FEATURES": 1024,
+    "BATCH_SIZE": 1000,
+    "RESCORE_DELAY": 5,
+    "RESCORE_BATCH": 10000,
+    "VECTOR_CACHE_SIZE": 20_000,
+}
+
+# Same token rules as screening.parsing, so "c++", "node.js" and "ci/cd" survive.
+TOKEN_PATTERN = r"(?u)[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]"
+
+
+def matching_settings():
+    return {**DEFAULT_MATCHING_SETTINGS, **getattr(settings, "RESUME_MATCHING", {})}
+
+
+def _vectorizer(config):
+    from sklearn.feature_extraction.text import HashingVectorizer
+    return HashingVectorizer(
+        n_features=config["N_FEATURES"],
+        token_pattern=TOKEN_PATTERN,
+        ngram_range=(1, 2),
+        stop_words="english",
+        alternate_sign=False,
+        norm=None,
+        dtype=np.float32,
+    )
+
+
+def _skills_text(skills, weight):
+    # Comma-separated skills become single phrases repeated `weight` times.
+    phrases = [phrase.strip() for phrase in (skills or "").split(",") if phrase.strip()]
+    return " . ".join(phrases * weight)
+
+
+def term_vectors(documents, config):
+    """Sublinear-tf hashed vectors (CSR, float32) for a list of strings, before idf and normalisation."""
+    matrix = _vectorizer(config).transform(documents)
+    np.log1p(matrix.data, out=matrix.data)
+    return matrix
+
+
+class TermVectorCache:
+    """
+    ``term_vectors`` rows keyed by a digest of the document, at most ``VECTOR_CACHE_SIZE`` of them.
+
+    A document changes whenever the text or skills behind it do, so entries never
+    need invalidating; ``N_FEATURES`` is part of the key.  Scoring passes read
+    every resume in the same order, which a plain LRU would turn into no hits at
+    all once there are more documents than room.  So once full, the least
+    recently used entry only makes room if no pass since the previous one has
+    used it (the document was edited or deleted); otherwise the new document is
+    not kept, and a pass over R documents tokenizes R - VECTOR_CACHE_SIZE of them.
+    """
+
+    def __init__(self):
+        # key -> (pass, indices, data), least recently used first.
+        self.entries = OrderedDict()
+        self.passes = 0
+
+    def clear(self):
+        self.entries.clear()
+
+    def start_pass(self):
+        """Mark the start of a pass over every document."""
+        self.passes += 1
+
+    def _make_room(self, size):
+        if len(self.entries) < size:
+            return True
+        if self.entries and next(iter(self.entries.values()))[0] < self.passes - 1:
+            self.entries.popitem(last=False)
+            return True
+        return False
+
+    def transform(self, documents, config):
+        from scipy.sparse import csr_matrix
+
+        size = config["VECTOR_CACHE_SIZE"]
+        keys = [(config["N_FEATURES"], hashlib.blake2b(document.encode(), digest_size=16).digest())
+                for document in documents]
+        rows = [self.entries.get(key) for key in keys]
+        rows = [row[1:] if row is not None else None for row in rows]
+        missing = [i for i, row in enumerate(rows) if row is None]
+        if missing:
+            matrix = term_vectors([documents[i] for i in missing], config)
+            split = matrix.indptr[1:-1]
+            for i, indices, data in zip(missing, np.split(matrix.indices, split), np.split(matrix.data, split)):
+                rows[i] = (indices, data)
+        for key, row in zip(keys, rows):
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            elif not self._make_room(size):
+                continue
+            self.entries[key] = (self.passes, *row)
+        while len(self.entries) > size:
+            self.entries.popitem(last=False)
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(indices) for indices, _ in rows], out=indptr[1:])
+        indices = np.concatenate([indices for indices, _ in rows]) if rows else np.empty(0, dtype=np.int32)
+        data = np.concatenate([data for _, data in rows]) if rows else np.empty(0, dtype=np.float32)
+        return csr_matrix((data, indices, indptr), shape=(len(rows), config["N_FEATURES"]))
+
+
+resume_vectors = TermVectorCache()
+job_vectors = TermVectorCache()
+
+
+def _weigh(matrix, idf):
+    from sklearn.preprocessing import normalize
+    if idf is not None:
+        matrix.data *= idf[matrix.indices]
+        matrix.eliminate_zeros()
+    return normalize(matrix, copy=False)
+
+
+def vectorize(documents, config, idf=None, cache=None):
+    """
+    Sublinear-tf(-idf), L2-normalised hashed vectors (CSR, float32) for a list of strings.
+    Args:
+        cache (TermVectorCache): Reuse and keep the term vectors of ``documents`` there.
+    """
+    matrix = cache.transform(documents, config) if cache is not None else term_vectors(documents, config)
+    return _weigh(matrix, idf)
+
+
+def resume_document(parsed_text, extracted_skills, config):
+    return f"{parsed_text or ''} . {_skills_text(extracted_skills, config['SKILL_WEIGHT'])}".lower()
+
+
+def job_document(title, description, required_skills, config):
+    weight = config["SKILL_WEIGHT"]
+    return f"{title} . {description} . {_skills_text(required_skills, weight)}".lower()
+
+
+class JobSpace:
+    """
+    The job side of the score product, prepared once per scoring run.
+
+    Job vectors use idf weights from the job corpus; features found in more
+    than ``MAX_DF`` of the jobs get weight 0, since they say little about fit
+    and dominate the cost of the product.  Only features that occur in some
+    job can contribute to a score, so resume vectors are projected onto that
+    compact column space.  The most common ones (in more than ``DENSE_DF`` of
+    the jobs, at most ``MAX_DENSE_FEATURES``) are multiplied as dense
+    float32 matrices through BLAS; the long tail uses a sparse product.
+    """
+
+    def __init__(self, jobs, config):
+        self.config = config
+        self.job_ids = [job[0] for job in jobs]
+        documents = [job_document(title, description, skills, config) for _, title, description, skills in jobs]
+        job_vectors.start_pass()
+        terms = job_vectors.transform(documents, config)
+        n = len(jobs)
+        df = np.bincount(terms.indices, minlength=terms.shape[1])
+        self.idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+        if n >= 10:
+            self.idf[df > config["MAX_DF"] * n] = 0
+        matrix = _weigh(terms, self.idf)
+
+        used = np.flatnonzero((df > 0) & (self.idf > 0))
+        used = used[np.argsort(-df[used], kind="stable")]
+        self.n_dense = min(int((df[used] > config["DENSE_DF"] * n).sum()), config["MAX_DENSE_FEATURES"])
+        self.column = np.full(terms.shape[1], -1, dtype=np.int64)
+        self.column[used] = np.arange(len(used))
+        compact = matrix[:, used]
+        self.dense_t = np.ascontiguousarray(compact[:, :self.n_dense].T.toarray())
+        self.sparse_t = compact[:, self.n_dense:].T.tocsr()
+
+    def select(self, job_ids):
+        """A copy restricted to ``job_ids`` (in that order), sharing idf and column space."""
+        position = {job_id: i for i, job_id in enumerate(self.job_ids)}
+        columns = [position[job_id] for job_id in job_ids]
+        subset = copy.copy(self)
+        subset.job_ids = list(job_ids)
+        subset.dense_t = np.ascontiguousarray(self.dense_t[:, columns])
+        subset.sparse_t = self.sparse_t[:, columns].tocsr()
+        return subset
+
+    def scores(self, documents):
+        """Dense (len(documents) x n_jobs) float32 matrix of cosine similarities."""
+        from scipy.sparse import csr_matrix
+
+        resumes = vectorize(documents, self.config, self.idf, cache=resume_vectors)
+        columns = self.column[resumes.indices]
+        rows = np.repeat(np.arange(resumes.shape[0]), np.diff(resumes.indptr))
+        known = columns >= 0
+        rows, columns, data = rows[known], columns[known], resumes.data[known]
+
+        dense = columns < self.n_dense
+        block = np.zeros((resumes.shape[0], self.n_dense), dtype=np.float32)
+        block[rows[dense], columns[dense]] = data[dense]
+        scores = block @ self.dense_t
+        tail = csr_matrix(
+            (data[~dense], (rows[~dense], columns[~dense] - self.n_dense)),
+            shape=(resumes.shape[0], self.sparse_t.shape[0]),
+        )
+        scores += (tail @ self.sparse_t).toarray()
+        return scores
+
+
+_last_job_space = None
+
+
+def job_space(jobs, config):
+    """
+    JobSpace of ``jobs``, reused from the previous call while the jobs and settings are unchanged.
+    The key digests every job row, so any edit, insert or delete builds a new one.
+    """
+    global _last_job_space
+    digest = hashlib.blake2b(repr(sorted(config.items())).encode(), digest_size=16)
+    for job in jobs:
+        digest.update(repr(job).encode())
+    key = digest.digest()
+    if _last_job_space is None or _last_job_space[0] != key:
+        _last_job_space = (key, JobSpace(jobs, config))
+    return _last_job_space[1]
+
+
+class TopK:
+    """Running top-k (score, resume id) per job column, merged one block at a time."""
+
+    def __init__(self, n_jobs, k):
+        self.k = k
+        self.scores = np.empty((0, n_jobs), dtype=np.float32)
+        self.ids = np.empty((0, n_jobs), dtype=np.int64)
+
+    def add(self, block, row_ids):
+        k = min(self.k, block.shape[0])
+        if k == 0:
+            return
+        rows = np.argpartition(-block, k - 1, axis=0)[:k]
+        scores = np.vstack([self.scores, np.take_along_axis(block, rows, axis=0)])
+        ids = np.vstack([self.ids, row_ids[rows]])
+        if scores.shape[0] > self.k:
+            keep = np.argpartition(-scores, self.k - 1, axis=0)[:self.k]
+            scores = np.take_along_axis(scores, keep, axis=0)
+            ids = np.take_along_axis(ids, keep, axis=0)
+        self.scores, self.ids = scores, ids
+
+    def ranked(self, column):
+        """(resume id, score) pairs for one job, best first."""
+        order = np.argsort(-self.scores[:, column], kind="stable")
+        return [(int(self.ids[row, column]), float(self.scores[row, column])) for row in order]
+
+
+def block_rows(n_jobs, config=None):
+    """Resumes per block for ``n_jobs`` jobs under the MAX_BLOCK_CELLS budget."""
+    config = config or matching_settings()
+    return max(1, min(10000, config["MAX_BLOCK_CELLS"] // max(1, n_jobs)))
+
+
+RESUME_FIELDS = ("id", "parsed_text", "extracted_skills", "content_hash", "ai_score", "best_job_id")
+
+
+def scorable_resumes():
+    return Resume.objects.exclude(parsed_text="", extracted_skills="")
+
+
+def resume_chunks(chunk_size, queryset=None):
+    """Yield lists of RESUME_FIELDS tuples in id order."""
+    # Keyset pagination rather than a long-lived cursor: scores are written between reads.
+    queryset = (scorable_resumes() if queryset is None else queryset).order_by("id")
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id).values_list(*RESUME_FIELDS)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1][0]
+
+
+def documents_for(chunk, config):
+    return [resume_document(row[1], row[2], config) for row in chunk]
+
+
+def to_percent(score):
+    return round(float(score) * 100, 2)
+
+
+def save_scores(rows, scores, best_jobs, batch_size):
+    """Save ai_score/best_job for RESUME_FIELDS rows, and the score on their ResumeContent."""
+    Resume.objects.bulk_update(
+        [Resume(id=row[0], ai_score=score, best_job_id=job_id) for row, score, job_id in zip(rows, scores, best_jobs)],
+        ["ai_score", "best_job"], batch_size=batch_size,
+    )
+    contents = {row[3]: score for row, score in zip(rows, scores) if row[3]}
+    ResumeContent.objects.bulk_update(
+        [ResumeContent(content_hash=digest, ai_score=score) for digest, score in contents.items()],
+        ["ai_score"], batch_size=batch_size,
+    )
+    invalidate_resumes(row[0] for row in rows)
+
+
+def save_matches(job_ids, top, min_score, batch_size):
+    """Replace the stored matches of ``job_ids`` with the ranked results in ``top``."""
+    matches = []
+    for column, job_id in enumerate(job_ids):
+        rank = 0
+        for resume_id, score in top.ranked(column):
+            percent = to_percent(score)
+            if percent <= min_score:
+                break
+            rank += 1
+            matches.append(JobMatch(job_id=job_id, resume_id=resume_id, score=percent, rank=rank))
+    with transaction.atomic():
+        JobMatch.objects.filter(job_id__in=job_ids).delete()
+        JobMatch.objects.bulk_create(matches, batch_size=batch_size)
+    return len(matches)
+
+
+def score_resumes(chunk_size=None):
+    """
+    Score every parsed resume against every job.
+    Args:
+        chunk_size (int): Resumes per block; defaults to what fits in MAX_BLOCK_CELLS.
+    Returns:
+        dict: Numbers of resumes scored, jobs and stored matches.
+    """
+    config = matching_settings()
+    jobs = list(Job.objects.order_by("id").values_list("id", "title", "description", "required_skills"))
+    if not jobs:
+        return {"resumes": 0, "jobs": 0, "matches": 0}
+    space = job_space(jobs, config)
+    chunk_size = chunk_size or block_rows(len(jobs), config)
+    top = TopK(len(jobs), config["TOP_K"])
+    resume_vectors.start_pass()
+
+    scored = 0
+    for chunk in resume_chunks(chunk_size):
+        block = space.scores(documents_for(chunk, config))
+        best = block.argmax(axis=1)
+        save_scores(
+            chunk,
+            [to_percent(block[i, column]) for i, column in enumerate(best)],
+            [space.job_ids[column] for column in best],
+            config["BATCH_SIZE"],
+        )
+        top.add(block, np.fromiter((row[0] for row in chunk), dtype=np.int64, count=len(chunk)))
+        scored += len(chunk)
+
+    matches = save_matches(space.job_ids, top, config["MIN_SCORE"], config["BATCH_SIZE"])
+    return {"resumes": scored, "jobs": len(jobs), "matches": matches}
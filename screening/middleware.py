@@ -0,0 +1,163 @@
+"""
+Per-request timing.
+
+``RequestTimingMiddleware`` measures wall-clock time and time spent in
+database queries for every request, records both in per-endpoint
+histograms and fills ``response_time_ms``/``db_time_ms`` on any
+APIRequestLog rows the view queued through ``screening.logsink.log_api_request``.
+
+The ``Server-Timing`` header is only sent to staff users, or to everyone when
+``DEBUG`` is on, so anonymous clients do not learn how long queries take.
+
+Streaming responses run most of their queries while the server consumes the
+body, after the view has returned.  Their timing is recorded when the server
+closes the response, so ``wall_ms`` includes the time spent sending the body,
+and they carry no ``Server-Timing`` header (it is sent before the body).
+Asynchronous streaming responses are iterated outside this thread's database
+connection; only the time up to the view's return is recorded for them.
+"""
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+
+from .logsink import api_log_buffer
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is unbounded.
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class RequestTiming:
+    """Timing state for one request; also serves as the connection execute wrapper."""
+
+    __slots__ = ("started", "db_time", "db_queries", "pending_logs")
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.pending_logs = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - start
+            self.db_queries += 1
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKET_BOUNDS_MS, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def as_dict(self):
+        labels = [f"le_{bound}" for bound in BUCKET_BOUNDS_MS] + ["le_inf"]
+        return {"count": self.count, "sum": round(self.total, 3), "buckets": dict(zip(labels, self.counts))}
+
+
+class EndpointTimings:
+    """Process-local wall/DB time histograms keyed by ``"<METHOD> <view name>"``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, endpoint, wall_ms, db_ms):
+        with self._lock:
+            histograms = self._histograms.get(endpoint)
+            if histograms is None:
+                histograms = self._histograms[endpoint] = (Histogram(), Histogram())
+            histograms[0].observe(wall_ms)
+            histograms[1].observe(db_ms)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                endpoint: {"wall_ms": wall.as_dict(), "db_ms": db.as_dict()}
+                for endpoint, (wall, db) in sorted(self._histograms.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+endpoint_timings = EndpointTimings()
+
+
+def _endpoint_name(request):
+    match = getattr(request, "resolver_match", None)
+    name = (match.view_name or match.route) if match else "<unresolved>"
+    return f"{request.method} {name}"
+
+
+def _shows_server_timing(request):
+    if settings.DEBUG:
+        return True
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_staff)
+
+
+def _record(request, timing):
+    wall_ms = (perf_counter() - timing.started) * 1000
+    db_ms = timing.db_time * 1000
+    endpoint_timings.observe(_endpoint_name(request), wall_ms, db_ms)
+    for row in timing.pending_logs:
+        api_log_buffer.submit(**row, response_time_ms=wall_ms, db_time_ms=db_ms)
+    return wall_ms, db_ms
+
+
+class TimedStream:
+    """Streaming body that keeps timing queries until the server closes it."""
+
+    def __init__(self, content, request, timing):
+        self.request = request
+        self.timing = timing
+        self.recorded = False
+        self.chunks = self._timed(content)
+
+    def _timed(self, content):
+        with connection.execute_wrapper(self.timing):
+            yield from content
+
+    def __iter__(self):
+        return self.chunks
+
+    def close(self):
+        # Registered by StreamingHttpResponse as a resource closer, so this runs
+        # once per response, after the body was sent (or abandoned).  Closing
+        # the generator first takes the execute wrapper off the connection.
+        self.chunks.close()
+        if not self.recorded:
+            self.recorded = True
+            _record(self.request, self.timing)
+
+
+class RequestTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = RequestTiming()
+        request.timing = timing
+        with connection.execute_wrapper(timing):
+            response = self.get_response(request)
+        if response.streaming and not response.is_async:
+            response.streaming_content = TimedStream(response.streaming_content, request, timing)
+            return response
+        wall_ms, db_ms = _record(request, timing)
+        if _shows_server_timing(request):
+            response["Server-Timing"] = f"app;dur={wall_ms:.2f}, db;dur={db_ms:.2f}"
+        return response
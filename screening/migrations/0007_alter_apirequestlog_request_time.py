@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 02:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0006_alter_edgenode_api_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='apirequestlog',
+            name='request_time',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
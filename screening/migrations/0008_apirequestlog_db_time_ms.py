@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0007_alter_apirequestlog_request_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apirequestlog',
+            name='db_time_ms',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 02:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0008_apirequestlog_db_time_ms'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NodePerformanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField()),
+                ('request_count', models.PositiveIntegerField(default=0)),
+                ('total_response_ms', models.FloatField(default=0)),
+                ('min_response_ms', models.FloatField(blank=True, null=True)),
+                ('max_response_ms', models.FloatField(blank=True, null=True)),
+                ('latency_sketch', models.JSONField(default=dict)),
+                ('last_log_id', models.BigIntegerField(default=0)),
+                ('edge_node', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='performance_rollups', to='screening.edgenode')),
+            ],
+            options={
+                'db_table': 'node_performance_rollup',
+                'ordering': ['bucket_start'],
+                'indexes': [models.Index(fields=['edge_node', 'bucket_start'], name='node_perfor_edge_no_2dc408_idx'), models.Index(fields=['last_log_id'], name='node_perfor_last_lo_85c7b3_idx')],
+                'constraints': [models.UniqueConstraint(fields=('edge_node', 'bucket_start'), name='unique_node_rollup_bucket')],
+            },
+        ),
+    ]
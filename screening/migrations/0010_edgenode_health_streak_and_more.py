@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 02:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0009_nodeperformancerollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='edgenode',
+            name='health_streak',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='edgenode',
+            name='last_health_latency_ms',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
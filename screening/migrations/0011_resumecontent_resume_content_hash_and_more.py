@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-18 02:43
+
+import screening.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0010_edgenode_health_streak_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeContent',
+            fields=[
+                ('content_hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('file', models.FileField(upload_to=screening.models.resume_content_path)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('parsed_text', models.TextField(blank=True)),
+                ('extracted_skills', models.TextField(blank=True)),
+                ('ai_score', models.FloatField(blank=True, null=True)),
+                ('parsed_at', models.DateTimeField(blank=True, null=True)),
+                ('parse_cpu_ms', models.FloatField(default=0)),
+                ('upload_count', models.PositiveIntegerField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'resume_content',
+            },
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['content_hash'], name='resume_content_21a24a_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 02:45
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0011_resumecontent_resume_content_hash_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(validators=[django.core.validators.MinValueValidator(0.0)])),
+                ('rank', models.PositiveIntegerField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='screening.job')),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_matches', to='screening.resume')),
+            ],
+            options={
+                'db_table': 'job_match',
+                'ordering': ['job', 'rank'],
+                'indexes': [models.Index(fields=['job', 'rank'], name='job_match_job_id_e5094e_idx'), models.Index(fields=['resume'], name='job_match_resume__d66f2f_idx')],
+                'constraints': [models.UniqueConstraint(fields=('job', 'resume'), name='unique_job_match')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 02:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0012_jobmatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='best_job',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='screening.job'),
+        ),
+        migrations.CreateModel(
+            name='PendingRescore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('job', 'Job'), ('resume', 'Resume')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'pending_rescore',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_pending_rescore')],
+            },
+        ),
+    ]
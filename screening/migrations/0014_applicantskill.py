@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-18 02:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def index_existing_skills(apps, schema_editor):
+    from screening.skills import skill_terms
+
+    Applicant = apps.get_model('screening', 'Applicant')
+    ApplicantSkill = apps.get_model('screening', 'ApplicantSkill')
+    batch = []
+    for pk, skills in Applicant.objects.values_list('pk', 'skills').iterator(chunk_size=5000):
+        batch.extend(ApplicantSkill(applicant_id=pk, skill=term) for term in skill_terms(skills))
+        if len(batch) >= 5000:
+            ApplicantSkill.objects.bulk_create(batch)
+            batch = []
+    ApplicantSkill.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0013_resume_best_job_pendingrescore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicantSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=100)),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_index', to='screening.applicant')),
+            ],
+            options={
+                'db_table': 'applicant_skill',
+                'constraints': [models.UniqueConstraint(fields=('skill', 'applicant'), name='unique_applicant_skill')],
+            },
+        ),
+        migrations.RunPython(index_existing_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2 on 2026-10-18 03:14
+
+from django.db import migrations, models
+
+
+def add_postgres_search_columns(apps, schema_editor):
+    from screening.search import POSTGRES_SCHEMA
+
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_SCHEMA:
+            schema_editor.execute(statement)
+
+
+def remove_postgres_search_columns(apps, schema_editor):
+    from screening.search import POSTGRES_SCHEMA_REVERSE
+
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_SCHEMA_REVERSE:
+            schema_editor.execute(statement)
+
+
+def index_existing_objects(apps, schema_editor):
+    from screening.search import rebuild_search_index
+
+    rebuild_search_index(get_model=apps.get_model)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0014_applicantskill'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('applicant', 'Applicant'), ('resume', 'Resume'), ('job', 'Job')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('title', models.CharField(max_length=190)),
+                ('keywords', models.TextField(blank=True)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'search_entry',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_entry')],
+            },
+        ),
+        migrations.RunPython(add_postgres_search_columns, remove_postgres_search_columns),
+        migrations.RunPython(index_existing_objects, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-18 03:53
+
+from django.db import migrations, models
+
+
+def partition_request_logs(apps, schema_editor):
+    from screening.partitions import log_partition_settings, partition_existing_table
+
+    if schema_editor.connection.vendor == 'postgresql' and log_partition_settings()['ENABLED']:
+        partition_existing_table(schema_editor)
+
+
+def merge_request_logs(apps, schema_editor):
+    from screening.partitions import is_partitioned, merge_partitioned_table
+
+    if is_partitioned():
+        merge_partitioned_table(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0016_jobapplication_job_applica_created_e0f1c3_idx_and_more'),
+    ]
+
+    operations = [
+        # Indexes created on the partitioned table apply to every partition.
+        migrations.RunPython(partition_request_logs, merge_request_logs),
+        migrations.AddIndex(
+            model_name='apirequestlog',
+            index=models.Index(fields=['request_time'], name='screening_a_request_4b5193_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apirequestlog',
+            index=models.Index(fields=['edge_node', 'request_time'], name='screening_a_edge_no_ce7427_idx'),
+        ),
+    ]
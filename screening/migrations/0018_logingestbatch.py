@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 03:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0017_apirequestlog_partitions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogIngestBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('accepted', models.PositiveIntegerField(default=0)),
+                ('rejected', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('edge_node', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ingest_batches', to='screening.edgenode')),
+            ],
+            options={
+                'db_table': 'log_ingest_batch',
+                'indexes': [models.Index(fields=['received_at'], name='log_ingest__receive_b93e7c_idx')],
+                'constraints': [models.UniqueConstraint(fields=('edge_node', 'key'), name='unique_log_ingest_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 04:37
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def flag_rolled_up_logs(apps, schema_editor):
+    # Rows at or below the old id watermark were counted by earlier rollup runs.
+    APIRequestLog = apps.get_model('screening', 'APIRequestLog')
+    NodePerformanceRollup = apps.get_model('screening', 'NodePerformanceRollup')
+    watermark = NodePerformanceRollup.objects.aggregate(m=Max('last_log_id'))['m'] or 0
+    APIRequestLog.objects.filter(id__lte=watermark).update(rolled_up=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('screening', '0019_created_at_auto_now_add'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apirequestlog',
+            name='rolled_up',
+            field=models.BooleanField(db_default=False, default=False),
+        ),
+        migrations.RunPython(flag_rolled_up_logs, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='apirequestlog',
+            index=models.Index(condition=models.Q(('rolled_up', False)), fields=['id'], name='apirequestlog_pending_rollup'),
+        ),
+        migrations.RemoveIndex(
+            model_name='nodeperformancerollup',
+            name='node_perfor_last_lo_85c7b3_idx',
+        ),
+        migrations.RemoveField(
+            model_name='nodeperformancerollup',
+            name='last_log_id',
+        ),
+    ]
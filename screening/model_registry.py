@@ -0,0 +1,120 @@
+"""
+Lazily loaded, hot-reloadable routing model.
+
+The pickled model (and scikit-learn with it) is only loaded the first time a
+prediction is needed.  Afterwards the file is stat'ed at most every
+``settings.ROUTING_MODEL_CHECK_INTERVAL`` seconds; when its mtime or size
+changes and the SHA-256 differs, the new model is loaded and compiled next
+to the old one and swapped in with a single reference assignment, so
+in-flight predictions keep using the model they started with.  Under
+gunicorn, ``gunicorn.conf.py`` preloads the model in the master process so
+forked workers share it copy-on-write.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LoadedModel:
+    __slots__ = ("model", "compiled", "checksum", "stat")
+
+    def __init__(self, model, compiled, checksum, stat):
+        self.model = model
+        self.compiled = compiled
+        self.checksum = checksum
+        self.stat = stat
+
+
+def file_checksum(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stat_key(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class ModelRegistry:
+    def __init__(self, path, check_interval=None):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._current = None
+        self._failed_stat = None
+        self._checked_at = 0.0
+        self._predictor = None
+
+    def _interval(self):
+        if self.check_interval is not None:
+            return self.check_interval
+        return getattr(settings, "ROUTING_MODEL_CHECK_INTERVAL", 5)
+
+    def get(self):
+        """Return the current LoadedModel, or None if the model file cannot be loaded."""
+        current = self._current
+        if current is not None and time.monotonic() - self._checked_at < self._interval():
+            return current
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                stat = _stat_key(self.path)
+            except OSError as e:
+                if self._current is None:
+                    logger.error("Failed to load AI model: %s", e)
+                return self._current
+            if self._current is not None and self._current.stat == stat:
+                return self._current
+            if stat == self._failed_stat:
+                return self._current
+            self._reload(stat)
+            return self._current
+
+    def _reload(self, stat):
+        from .inference import compile_model
+        try:
+            checksum = file_checksum(self.path)
+            if self._current is not None and self._current.checksum == checksum:
+                self._current = LoadedModel(self._current.model, self._current.compiled, checksum, stat)
+                return
+            with open(self.path, "rb") as file:
+                model = pickle.load(file)
+            loaded = LoadedModel(model, compile_model(model), checksum, stat)
+        except Exception as e:
+            self._failed_stat = stat
+            logger.error("Failed to load AI model: %s", e)
+            return
+        previous = self._current
+        self._current = loaded
+        self._failed_stat = None
+        if previous is not None:
+            logger.info("Reloaded AI model %s (checksum %s)", self.path, checksum[:12])
+
+    def preload(self):
+        """Load the model eagerly, e.g. in a pre-fork master process."""
+        return self.get()
+
+    @property
+    def predictor(self):
+        """Micro-batching predictor that always scores with the current model."""
+        if self._predictor is not None:
+            return self._predictor
+        with self._lock:
+            # Threads racing on the first request must share one predictor (and its worker thread).
+            if self._predictor is None:
+                from .inference import BatchPredictor
+                self._predictor = BatchPredictor(
+                    lambda samples: self.get().compiled.predict(samples),
+                    max_wait_ms=getattr(settings, "ROUTING_MODEL_BATCH_WAIT_MS", 2.0),
+                )
+            return self._predictor
@@ -1,4 +1,5 @@
 import datetime
+import os
 from datetime import timezone
 from email.policy import default
 from django.db import models
@@ -6,6 +7,7 @@ from django.contrib.auth.models import User
 from django.core.validators import RegexValidator, FileExtensionValidator, EmailValidator, MinValueValidator
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.utils import timezone as django_timezone
 
 from django.db import models
 from django.contrib.auth.models import User
@@ -31,6 +33,9 @@ class EdgeNode(models.Model):
     api_key = models.CharField(max_length=100, unique=True, blank=True)
     registered_at = models.DateTimeField(auto_now_add=True)
     last_health_check = models.DateTimeField(null=True, blank=True)
+    last_health_latency_ms = models.FloatField(null=True, blank=True)
+    # Consecutive probe successes (> 0) or failures (< 0), used to damp status flapping.
+    health_streak = models.IntegerField(default=0)
     
     def __str__(self):
         return self.name
@@ -41,21 +46,78 @@ class EdgeNode(models.Model):
 
 class APIRequestLog(models.Model):
     edge_node = models.ForeignKey(EdgeNode, related_name='api_logs', on_delete=models.CASCADE)
-    request_time = models.DateTimeField(auto_now_add=True)
+    request_time = models.DateTimeField(default=django_timezone.now)
     response_time_ms = models.FloatField()
+    db_time_ms = models.FloatField(null=True, blank=True)
     latitude = models.FloatField(validators=[validate_latitude])
     longitude = models.FloatField(validators=[validate_longitude])
     status_code = models.IntegerField()
     client_ip = models.GenericIPAddressField()
     extra_data = models.JSONField(blank=True, null=True)
+    # Set once the row is counted in NodePerformanceRollup (see screening/rollups.py).
+    rolled_up = models.BooleanField(default=False, db_default=False)
+
+    class Meta:
+        # On PostgreSQL the table is partitioned by request_time (see screening/partitions.py).
+        indexes = [
+            models.Index(fields=['request_time']),
+            models.Index(fields=['edge_node', 'request_time']),
+            models.Index(fields=['id'], condition=models.Q(rolled_up=False), name='apirequestlog_pending_rollup'),
+        ]
 
     def __str__(self):
         return f"{self.edge_node.name} @ {self.request_time}"
 
 
+class LogIngestBatch(models.Model):
+    """Idempotency key and result of one bulk log upload of an edge node (see screening/ingest.py)."""
+    edge_node = models.ForeignKey(EdgeNode, related_name='ingest_batches', on_delete=models.CASCADE)
+    key = models.CharField(max_length=100)
+    received_at = models.DateTimeField(auto_now_add=True)
+    accepted = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        db_table = 'log_ingest_batch'
+        indexes = [
+            models.Index(fields=['received_at'])
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['edge_node', 'key'], name='unique_log_ingest_key')
+        ]
+
+    def __str__(self):
+        return f"{self.edge_node_id}:{self.key}"
+
+
+class NodePerformanceRollup(models.Model):
+    """Per-node, per-minute aggregate of APIRequestLog response times."""
+    edge_node = models.ForeignKey(EdgeNode, related_name='performance_rollups', on_delete=models.CASCADE)
+    bucket_start = models.DateTimeField()
+    request_count = models.PositiveIntegerField(default=0)
+    total_response_ms = models.FloatField(default=0)
+    min_response_ms = models.FloatField(null=True, blank=True)
+    max_response_ms = models.FloatField(null=True, blank=True)
+    latency_sketch = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ['bucket_start']
+        db_table = 'node_performance_rollup'
+        indexes = [
+            models.Index(fields=['edge_node', 'bucket_start'])
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['edge_node', 'bucket_start'], name='unique_node_rollup_bucket')
+        ]
+
+    def __str__(self):
+        return f"{self.edge_node_id} @ {self.bucket_start}: {self.request_count} requests"
+
+
 class TimeStampedModel(models.Model):
-    """Abstract base class that provides self-updating created_at and updated_at fields."""
-    created_at = models.DateTimeField(auto_now=True)
+    """Abstract base class that provides a creation time and a self-updating updated_at field."""
+    created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -88,6 +150,22 @@ class Applicant(TimeStampedModel):
         return self.full_name
 
 
+class ApplicantSkill(models.Model):
+    """One normalised term of Applicant.skills (see screening.skills), for indexed skill lookups."""
+    applicant = models.ForeignKey(Applicant, on_delete=models.CASCADE, related_name='skill_index')
+    skill = models.CharField(max_length=100)
+
+    class Meta:
+        db_table = 'applicant_skill'
+        constraints = [
+            # Also the lookup index: skill first, so a skill query is a range scan.
+            models.UniqueConstraint(fields=['skill', 'applicant'], name='unique_applicant_skill')
+        ]
+
+    def __str__(self):
+        return f"{self.applicant_id}: {self.skill}"
+
+
 class Recruiter(TimeStampedModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='recruiter_profile',null=True)
     company_name = models.CharField(max_length=190)
@@ -138,19 +216,120 @@ class Resume(TimeStampedModel):
     parsed_text = models.TextField(blank=True)
     extracted_skills = models.TextField(blank=True)
     ai_score = models.FloatField(null=True, blank=True, validators=[MinValueValidator(0.0)])
+    # SHA-256 of the uploaded file; identical uploads share one ResumeContent.
+    content_hash = models.CharField(max_length=64, blank=True)
+    # Job that produced ai_score, so a change to that job knows which scores to revisit.
+    best_job = models.ForeignKey('Job', null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
 
     class Meta:
         ordering = ['-id']
         db_table = 'resume'
         indexes = [
             models.Index(fields=['applicant']),
-            models.Index(fields=['ai_score'])
+            models.Index(fields=['ai_score']),
+            models.Index(fields=['content_hash'])
         ]
 
     def __str__(self):
         return f"Resume of {self.applicant.full_name}"
 
 
+class JobMatch(models.Model):
+    """One of the best-scoring resumes for a job, as computed by screening.matching."""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='matches')
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='job_matches')
+    score = models.FloatField(validators=[MinValueValidator(0.0)])
+    rank = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['job', 'rank']
+        db_table = 'job_match'
+        indexes = [
+            models.Index(fields=['job', 'rank']),
+            models.Index(fields=['resume'])
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'resume'], name='unique_job_match')
+        ]
+
+    def __str__(self):
+        return f"{self.job_id} #{self.rank}: resume {self.resume_id} ({self.score:.2f})"
+
+
+class PendingRescore(models.Model):
+    """A job or resume whose scores are out of date, waiting for screening.rescoring."""
+    JOB = 'job'
+    RESUME = 'resume'
+    KIND_CHOICES = [(JOB, 'Job'), (RESUME, 'Resume')]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'pending_rescore'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_pending_rescore')
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}"
+
+
+class SearchEntry(models.Model):
+    """
+    Searchable text of an Applicant, Resume or Job, kept up to date by screening.search.
+    On PostgreSQL the table also has generated ``document`` (tsvector) and ``fuzzy`` (trigram) columns.
+    """
+    APPLICANT = 'applicant'
+    RESUME = 'resume'
+    JOB = 'job'
+    KIND_CHOICES = [(APPLICANT, 'Applicant'), (RESUME, 'Resume'), (JOB, 'Job')]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    title = models.CharField(max_length=190)
+    keywords = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'search_entry'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_entry')
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.title}"
+
+
+def resume_content_path(instance, filename):
+    extension = os.path.splitext(filename)[1].lower()
+    digest = instance.content_hash
+    return f"resumes/sha256/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+
+class ResumeContent(models.Model):
+    """A stored resume file and its parse results, addressed by the SHA-256 of its bytes."""
+    content_hash = models.CharField(max_length=64, primary_key=True)
+    file = models.FileField(upload_to=resume_content_path)
+    size = models.PositiveBigIntegerField(default=0)
+    parsed_text = models.TextField(blank=True)
+    extracted_skills = models.TextField(blank=True)
+    ai_score = models.FloatField(null=True, blank=True)
+    parsed_at = models.DateTimeField(null=True, blank=True)
+    # CPU time the parse took, i.e. what every later duplicate upload saves.
+    parse_cpu_ms = models.FloatField(default=0)
+    upload_count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'resume_content'
+
+    def __str__(self):
+        return self.content_hash
+
+
 class Interview(TimeStampedModel):
     INTERVIEW_MODE_CHOICES = [
         ('online', 'Online'),
@@ -251,6 +430,7 @@ class Notification(TimeStampedModel):
         ordering = ['-created_at']
         db_table = 'notification'
         indexes = [
+            models.Index(fields=['created_at', 'id']),
             models.Index(fields=['user']),
             models.Index(fields=['is_read'])
         ]
@@ -274,6 +454,7 @@ class JobApplication(TimeStampedModel):
         ordering = ['-created_at']
         db_table = 'job_application'
         indexes = [
+            models.Index(fields=['created_at', 'id']),
             models.Index(fields=['applicant']),
             models.Index(fields=['job'])
         ]
@@ -282,4 +463,24 @@ class JobApplication(TimeStampedModel):
         ]
 
     def __str__(self):
-        return f"Application by {self.applicant.full_name} for {self.job.title}"
\ No newline at end of file
+        return f"Application by {self.applicant.full_name} for {self.job.title}"
+
+# Relations read by each model's __str__. Anything that displays many objects
+# at once (admin changelists, the choice lists of related fields in forms)
+# should select them in the same query, or it runs one query per object.
+STR_RELATED = {
+    APIRequestLog: ('edge_node',),
+    Resume: ('applicant',),
+    Interview: ('applicant',),
+    ScreeningQuestion: ('job',),
+    ScreeningAnswer: ('applicant', 'question'),
+    Feedback: ('interview__applicant', 'reviewer'),
+    Notification: ('user',),
+    JobApplication: ('applicant', 'job'),
+}
+
+
+def select_str_related(queryset):
+    """``queryset`` with the relations its model's __str__ reads selected."""
+    related = STR_RELATED.get(queryset.model)
+    return queryset.select_related(*related) if related else queryset
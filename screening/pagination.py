@@ -0,0 +1,178 @@
+"""
+Keyset (cursor) pagination for the REST API.
+
+Pages are read in the order of the queryset (``order_by``) or, when it has
+none, the model's ``Meta.ordering``, with the primary key appended as a tie
+breaker so that the order is total.  Only keys a write cannot change are
+used: the primary key and ``auto_now_add`` timestamps.  A row whose key is
+edited (a name, an ``auto_now`` timestamp) would move across the cursor and
+be skipped or served twice, so the ordering is cut at its first mutable key
+and the primary key, in the direction of the first key, orders the rest.
+A cursor holds the key values of the row at the edge of the previous page,
+and the next page is the rows strictly after it::
+
+    WHERE created_at <= %s AND ((created_at < %s) OR (created_at = %s AND id < %s))
+    ORDER BY created_at DESC, id DESC LIMIT page_size + 1
+
+so every page costs one index range scan however deep it is, cursors stay
+valid when rows are inserted or deleted elsewhere, and memory per request
+is one page.  The extra row tells whether there is a next page, so no
+``COUNT(*)`` is run unless the client asks for one with ``?count=1``.
+
+Nullable ordering fields are not supported.
+"""
+import base64
+import binascii
+import datetime
+import decimal
+import json
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+DEFAULT_PAGINATION_SETTINGS = {
+    "PAGE_SIZE": 50,
+    "MAX_PAGE_SIZE": 500,
+}
+
+
+def pagination_settings():
+    return {**DEFAULT_PAGINATION_SETTINGS, **getattr(settings, "PAGINATION", {})}
+
+
+def _dump(value):
+    # isoformat keeps microseconds, which DjangoJSONEncoder would truncate.
+    if isinstance(value, (datetime.date, datetime.time, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor."
+
+    def get_page_size(self, request):
+        config = pagination_settings()
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, config["PAGE_SIZE"]))
+        except ValueError:
+            size = config["PAGE_SIZE"]
+        return min(max(size, 1), config["MAX_PAGE_SIZE"])
+
+    @staticmethod
+    def is_immutable(field):
+        return field.primary_key or getattr(field, "auto_now_add", False)
+
+    def get_keys(self, queryset):
+        """(attname, descending, field) of each immutable ordering key, ending with the primary key."""
+        meta = queryset.model._meta
+        keys = []
+        first_descending = None
+        for item in list(queryset.query.order_by) or list(meta.ordering):
+            if not isinstance(item, str) or "__" in item or item == "?":
+                raise ImproperlyConfigured(f"Keyset pagination cannot order {meta.label} by {item!r}.")
+            descending = item.startswith("-")
+            name = item.lstrip("-")
+            field = meta.pk if name == "pk" else meta.get_field(name)
+            if first_descending is None:
+                first_descending = descending
+            if not self.is_immutable(field):
+                break
+            if field.null:
+                raise ImproperlyConfigured(f"Keyset pagination cannot order by nullable {meta.label}.{name}.")
+            keys.append((field.attname, descending, field))
+            if field.primary_key:
+                return keys
+        keys.append((meta.pk.attname, bool(first_descending), meta.pk))
+        return keys
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({"v": [_dump(value) for value in values], "r": int(reverse)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, encoded, keys):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            values = payload["v"]
+            if len(values) != len(keys):
+                raise ValueError
+            return [field.to_python(value) for value, (_, _, field) in zip(values, keys)], bool(payload["r"])
+        except (binascii.Error, UnicodeDecodeError, ValueError, ValidationError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def after(self, keys, values, reverse):
+        """Rows strictly after ``values`` in the (possibly reversed) key order."""
+        condition = Q()
+        equal = {}
+        for (name, descending, _), value in zip(keys, values):
+            lookup = "lt" if descending != reverse else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        # Redundant bound on the first key, so the planner sees an index range rather than an OR.
+        name, descending, _ = keys[0]
+        return Q(**{f"{name}__{'lte' if descending != reverse else 'gte'}": values[0]}) & condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.keys = self.get_keys(queryset)
+        self.count = queryset.count() if request.query_params.get(self.count_query_param) in ("1", "true") else None
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        values, reverse = self.decode_cursor(encoded, self.keys) if encoded else (None, False)
+        ordered = queryset.order_by(*[
+            ("-" if descending != reverse else "") + name for name, descending, _ in self.keys
+        ])
+        if values is not None:
+            ordered = ordered.filter(self.after(self.keys, values, reverse))
+        page = list(ordered[:self.page_size + 1])
+        more = len(page) > self.page_size
+        page = page[:self.page_size]
+        if reverse:
+            page.reverse()
+        self.has_next = more if not reverse else True
+        self.has_previous = values is not None if not reverse else more
+        self.page = page
+        return page
+
+    def cursor_url(self, row, reverse):
+        # Rows are model instances, or dicts when the view pages a .values() queryset.
+        values = [row[name] if isinstance(row, dict) else getattr(row, name) for name, _, _ in self.keys]
+        params = self.request.query_params.copy()
+        params[self.cursor_query_param] = self.encode_cursor(values, reverse)
+        params.pop(self.count_query_param, None)
+        return self.request.build_absolute_uri(f"{self.request.path}?{params.urlencode()}")
+
+    def get_next_link(self):
+        return self.cursor_url(self.page[-1], False) if self.has_next and self.page else None
+
+    def get_previous_link(self):
+        return self.cursor_url(self.page[0], True) if self.has_previous and self.page else None
+
+    def get_paginated_response(self, data):
+        body = {"next": self.get_next_link(), "previous": self.get_previous_link()}
+        if self.count is not None:
+            body["count"] = self.count
+        body["results"] = data
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "count": {"type": "integer"},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,392 @@
+"""
+Text and skill extraction for uploaded resumes.
+
+* DOCX: ``word/document.xml`` is streamed out of the zip archive and walked
+  with ``iterparse``, clearing elements as soon as they are read, so memory
+  stays bounded by the chunk size however large the upload is.
+* PDF: pages are read one at a time by pdfminer.six, which maps glyphs to
+  text through the fonts' ToUnicode CMaps and encodings (CID/Type0 fonts
+  included) and rebuilds words and lines from glyph positions.  Glyphs that
+  no mapping covers come out as ``(cid:N)``; a page made mostly of those
+  fails the file rather than saving garbage as its text.
+* DOC: legacy Word files are converted by the ``antiword`` program, which
+  reads the document body from the piece table instead of guessing at
+  printable runs.
+
+``parse_resume_file`` is a plain function of a file path so it can run in a
+worker process; ``screening.tasks.parse_resumes`` fans files out to a process
+pool and writes the results back in batches.  Each file gets ``TIMEOUT``
+seconds, so one pathological upload cannot hold a worker.
+"""
+import logging
+import os
+import re
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack, contextmanager
+from itertools import repeat
+from xml.etree.ElementTree import iterparse
+
+from django.conf import settings
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LAParams, LTTextContainer
+from pdfminer.pdfexceptions import PDFException
+from pdfminer.psexceptions import PSException
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARSING_SETTINGS = {
+    "WORKERS": None,
+    "BATCH_SIZE": 100,
+    "CHUNK_SIZE": 64 * 1024,
+    "MAX_CHARS": 200_000,
+    "TIMEOUT": 60,
+    "SKILLS": [],
+}
+
+# Built-in skill vocabulary; settings.RESUME_PARSING["SKILLS"] and the
+# required_skills of open jobs are added to it.
+DEFAULT_SKILLS = [
+    "python", "java", "javascript", "typescript", "c++", "c#", "golang", "rust", "ruby", "php", "kotlin",
+    "swift", "scala", "sql", "nosql", "html", "css", "django", "flask", "fastapi", "spring", "react",
+    "angular", "vue", "node.js", "express", "graphql", "rest api", "postgresql", "mysql", "mongodb", "redis",
+    "elasticsearch", "kafka", "rabbitmq", "celery", "docker", "kubernetes", "terraform", "ansible", "aws",
+    "azure", "gcp", "linux", "git", "ci/cd", "jenkins", "machine learning", "deep learning", "nlp",
+    "computer vision", "data analysis", "data science", "pandas", "numpy", "scikit-learn", "tensorflow",
+    "pytorch", "spark", "hadoop", "tableau", "power bi", "excel", "agile", "scrum", "project management",
+    "communication", "leadership", "devops", "microservices", "security", "networking", "figma",
+]
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+MAX_SKILL_WORDS = 3
+
+
+def parsing_settings():
+    return {**DEFAULT_PARSING_SETTINGS, **getattr(settings, "RESUME_PARSING", {})}
+
+
+class ResumeParseError(Exception):
+    pass
+
+
+# DOCX
+
+
+def iter_docx_text(path, chunk_size=None):
+    try:
+        archive = zipfile.ZipFile(path)
+    except zipfile.BadZipFile as e:
+        raise ResumeParseError(f"Not a DOCX file: {e}")
+    with archive, archive.open("word/document.xml") as document:
+        for event, element in iterparse(document, events=("end",)):
+            if element.tag == WORD_NS + "t" and element.text:
+                yield element.text
+            elif element.tag == WORD_NS + "tab":
+                yield "\t"
+            elif element.tag in (WORD_NS + "p", WORD_NS + "br"):
+                yield "\n"
+                element.clear()
+
+
+# PDF
+
+# pdfminer.six writes glyphs that no font mapping covers as "(cid:N)".
+UNMAPPED_GLYPH_RE = re.compile(r"\(cid:\d+\)")
+MAX_UNMAPPED_RATIO = 0.1
+
+
+def _check_decodable(text):
+    """Raise ResumeParseError when ``text`` is mostly unmapped glyphs rather than characters."""
+    unmapped = len(UNMAPPED_GLYPH_RE.findall(text))
+    if unmapped and unmapped > MAX_UNMAPPED_RATIO * len(UNMAPPED_GLYPH_RE.sub("", text).split()):
+        raise ResumeParseError("PDF text uses fonts without a Unicode mapping; it cannot be extracted.")
+
+
+def iter_pdf_text(path, chunk_size=None):
+    # pdfminer reads the file itself, a page at a time; chunk_size does not apply.
+    with open(path, "rb") as file:
+        if not file.read(5).startswith(b"%PDF"):
+            raise ResumeParseError("Not a PDF file.")
+    try:
+        for page in extract_pages(path, laparams=LAParams()):
+            text = "".join(element.get_text() for element in page if isinstance(element, LTTextContainer))
+            _check_decodable(text)
+            yield UNMAPPED_GLYPH_RE.sub("", text)
+    except (PDFException, PSException) as e:
+        raise ResumeParseError(f"Unreadable PDF: {e}")
+
+
+# DOC
+
+
+def iter_doc_text(path, chunk_size=None):
+    antiword = shutil.which("antiword")
+    if antiword is None:
+        raise ResumeParseError("DOC resumes need the antiword program, which is not installed.")
+    try:
+        result = subprocess.run(
+            [antiword, "-m", "UTF-8.txt", "-w", "0", path],
+            capture_output=True, timeout=parsing_settings()["TIMEOUT"],
+        )
+    except subprocess.TimeoutExpired:
+        raise ResumeParseError("antiword timed out.")
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", "replace").strip() or f"exit status {result.returncode}"
+        raise ResumeParseError(f"Unreadable DOC file: {message}")
+    yield result.stdout.decode("utf-8", "replace")
+
+
+EXTRACTORS = {
+    ".pdf": iter_pdf_text,
+    ".docx": iter_docx_text,
+    ".doc": iter_doc_text,
+}
+
+
+def extract_text(path, max_chars=None, chunk_size=None):
+    """Extract up to ``max_chars`` characters of text from a PDF, DOC or DOCX file."""
+    config = parsing_settings()
+    max_chars = max_chars or config["MAX_CHARS"]
+    extractor = EXTRACTORS.get(os.path.splitext(path)[1].lower())
+    if extractor is None:
+        raise ResumeParseError(f"Unsupported resume format: {path}")
+    parts, length = [], 0
+    for fragment in extractor(path, chunk_size or config["CHUNK_SIZE"]):
+        parts.append(fragment)
+        length += len(fragment)
+        if length >= max_chars:
+            break
+    text = "".join(parts)[:max_chars].replace("\x00", "")
+    # Collapse runs of blank lines and trailing spaces left by layout operators.
+    return re.sub(r"[ \t]*\n\s*\n+", "\n", text).strip()
+
+
+# Skills
+
+
+def skill_vocabulary(extra=()):
+    """Lower-cased skill phrases to look for: built-ins, settings and ``extra``."""
+    vocabulary = set(DEFAULT_SKILLS)
+    vocabulary.update(parsing_settings()["SKILLS"])
+    vocabulary.update(extra)
+    return frozenset(skill.strip().lower() for skill in vocabulary if skill and skill.strip())
+
+
+def job_skills():
+    """Skill phrases listed in Job.required_skills (comma separated)."""
+    from .models import Job
+    skills = set()
+    for required in Job.objects.values_list("required_skills", flat=True).distinct().iterator():
+        skills.update(part.strip().lower() for part in required.split(",") if part.strip())
+    return skills
+
+
+def extract_skills(text, vocabulary):
+    """Vocabulary entries found in ``text`` as whole words, in order of first mention."""
+    tokens = TOKEN_RE.findall(text.lower())
+    found = {}
+    for i in range(len(tokens)):
+        for n in range(1, MAX_SKILL_WORDS + 1):
+            phrase = " ".join(tokens[i:i + n])
+            if phrase in vocabulary and phrase not in found:
+                found[phrase] = None
+    return list(found)
+
+
+def parse_resume_file(path, vocabulary):
+    """
+    Parse one resume file. Runs in worker processes, so it must not touch the database.
+    Returns:
+        tuple: (parsed_text, comma-separated extracted skills)
+    """
+    text = extract_text(path)
+    return text, ", ".join(extract_skills(text, vocabulary))
+
+
+@contextmanager
+def time_limit(seconds):
+    """Raise ResumeParseError in this thread after ``seconds``; only the main thread can receive SIGALRM."""
+    if not seconds or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def expire(signum, frame):
+        raise ResumeParseError(f"Parsing took longer than {seconds}s.")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _parse_or_error(path, vocabulary):
+    # Uploads are untrusted: any failure is reported for that file only.
+    started = time.process_time()
+    try:
+        with time_limit(parsing_settings()["TIMEOUT"]):
+            text, skills = parse_resume_file(path, vocabulary)
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    return (text, skills, (time.process_time() - started) * 1000), None
+
+
+_executor = None
+_executor_pid = None
+
+
+def _process_pool(workers):
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        _executor_pid = os.getpid()
+    return _executor
+
+
+def _discard_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+
+
+def parse_files(paths, vocabulary, workers=None):
+    """
+    Parse files in a process pool, falling back to this process when one cannot be started
+    (e.g. inside a daemonic worker).
+    Returns:
+        list: (result, error) per path, in order.
+    """
+    workers = workers if workers is not None else parsing_settings()["WORKERS"]
+    if workers == 1 or len(paths) <= 1:
+        return [_parse_or_error(path, vocabulary) for path in paths]
+    try:
+        pool = _process_pool(workers)
+        chunksize = max(1, len(paths) // (4 * (workers or os.cpu_count() or 1)))
+        return list(pool.map(_parse_or_error, paths, repeat(vocabulary), chunksize=chunksize))
+    except (AssertionError, OSError, BrokenProcessPool) as e:
+        logger.warning("Resume parsing pool unavailable (%s); parsing in-process.", e)
+        _discard_pool()
+        return [_parse_or_error(path, vocabulary) for path in paths]
+
+
+@contextmanager
+def local_copy(field_file):
+    """Yield a filesystem path for a stored file, copying it to a temporary file if needed."""
+    try:
+        path = field_file.path
+    except NotImplementedError:
+        path = None
+    if path is not None:
+        yield path
+        return
+    suffix = os.path.splitext(field_file.name)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix) as temp, field_file.open("rb") as source:
+        shutil.copyfileobj(source, temp)
+        temp.flush()
+        yield temp.name
+
+
+def parse_stored_resumes(resume_ids=None, batch_size=None, workers=None):
+    """
+    Parse stored resume files and save parsed_text/extracted_skills with one bulk_update per batch.
+    Each distinct file content is parsed once: resumes sharing a ResumeContent reuse its
+    results, and newly parsed results are written to the ResumeContent and every resume
+    that shares it.
+    Args:
+        resume_ids (list): Resumes to parse; defaults to every resume without parsed text.
+        batch_size (int): Resumes parsed and saved per batch.
+        workers (int): Worker processes (None: one per CPU, 1: parse in-process).
+    Returns:
+        dict: Counts of parsed, reused and failed resumes.
+    """
+    from django.utils import timezone
+
+    from .models import Resume, ResumeContent, SearchEntry
+    from .rescoring import mark_dirty
+    from .response_cache import invalidate_resumes
+    from .search import index_objects
+
+    config = parsing_settings()
+    batch_size = batch_size or config["BATCH_SIZE"]
+    vocabulary = skill_vocabulary(job_skills())
+    queryset = Resume.objects.exclude(file="").order_by("id")
+    if resume_ids is not None:
+        queryset = queryset.filter(pk__in=resume_ids)
+    else:
+        queryset = queryset.filter(parsed_text="")
+
+    parsed = reused = failed = 0
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id).only("id", "file", "content_hash")[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        contents = ResumeContent.objects.in_bulk({resume.content_hash for resume in batch if resume.content_hash})
+
+        # One parse per distinct content; resumes without a hash are parsed on their own.
+        groups = {}
+        for resume in batch:
+            groups.setdefault(resume.content_hash or ("resume", resume.pk), []).append(resume)
+        results = {}
+        to_parse = []
+        for key, resumes in groups.items():
+            content = contents.get(key) if isinstance(key, str) else None
+            if content is not None and content.parsed_at is not None:
+                results[key] = ((content.parsed_text, content.extracted_skills, None), None)
+                reused += len(resumes)
+            else:
+                to_parse.append(key)
+        with ExitStack() as stack:
+            paths = [stack.enter_context(local_copy(groups[key][0].file)) for key in to_parse]
+            results.update(zip(to_parse, parse_files(paths, vocabulary, workers)))
+
+        now = timezone.now()
+        parsed_contents = {}
+        for key in to_parse:
+            result, error = results[key]
+            if error is not None:
+                failed += len(groups[key])
+                logger.warning("Could not parse resume %s: %s", groups[key][0].pk, error)
+                continue
+            parsed += len(groups[key])
+            content = contents.get(key) if isinstance(key, str) else None
+            if content is not None:
+                content.parsed_text, content.extracted_skills, content.parse_cpu_ms = result
+                content.parsed_at = now
+                parsed_contents[key] = content
+        ResumeContent.objects.bulk_update(
+            parsed_contents.values(), ["parsed_text", "extracted_skills", "parse_cpu_ms", "parsed_at"],
+        )
+
+        updated = []
+        for key, resumes in groups.items():
+            result, error = results[key]
+            if error is None:
+                for resume in resumes:
+                    resume.parsed_text, resume.extracted_skills = result[:2]
+                    updated.append(resume)
+        # Earlier uploads of the same content that are not part of this batch.
+        batch_ids = [resume.pk for resume in batch]
+        for resume in Resume.objects.filter(content_hash__in=list(parsed_contents), parsed_text="").exclude(
+                pk__in=batch_ids).only("id", "content_hash"):
+            content = parsed_contents[resume.content_hash]
+            resume.parsed_text, resume.extracted_skills = content.parsed_text, content.extracted_skills
+            updated.append(resume)
+        Resume.objects.bulk_update(updated, ["parsed_text", "extracted_skills"])
+        # bulk_update sends no post_save, so queue the new text for scoring and search here.
+        mark_dirty(resumes=[resume.pk for resume in updated])
+        index_objects(SearchEntry.RESUME, [resume.pk for resume in updated])
+        invalidate_resumes(resume.pk for resume in updated)
+    return {"parsed": parsed, "reused": reused, "failed": failed}
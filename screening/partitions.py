@@ -0,0 +1,377 @@
+"""
+Time-range partitioning and retention of APIRequestLog rows.
+
+On PostgreSQL the log table is partitioned by range of ``request_time``,
+one partition per ``INTERVAL`` (day, week or month)::
+
+    screening_apirequestlog              partitioned parent, PK (id, request_time)
+    screening_apirequestlog_legacy       rows logged before partitioning (MINVALUE to its last day)
+    screening_apirequestlog_p20261018    one table per interval
+    screening_apirequestlog_default      rows outside every partition (clock skew, late maintenance)
+
+``manage_log_partitions`` runs from a beat task.  It creates the partitions
+of the next ``PREMAKE`` intervals (moving any of their rows out of the
+default partition first), and drops the partitions that ended more than
+``RETENTION_DAYS`` ago: a DROP TABLE instead of a DELETE per row, with no
+dead tuples left to vacuum.  Before raw rows are removed they are folded
+into NodePerformanceRollup (see screening.rollups), so node_performance
+keeps reporting on them; a partition whose rows are not all rolled up yet
+is kept until the next run.
+
+On other databases, or with ``ENABLED`` off, the table stays a plain table
+and expired rows that are rolled up are deleted in ``DELETE_BATCH`` batches
+through the ``request_time`` index.
+
+Reads prune partitions by bounding ``request_time``: ``time_windows`` walks
+back from the newest rows one interval at a time, doubling the window until
+enough rows are found, so a newest-first page usually reads one or two
+partitions instead of every one of them.
+"""
+import logging
+import re
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import APIRequestLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_PARTITION_SETTINGS = {
+    "ENABLED": True,
+    "INTERVAL": "day",
+    "PREMAKE": 3,
+    "RETENTION_DAYS": 30,
+    "DELETE_BATCH": 10000,
+}
+
+INTERVALS = ("day", "week", "month")
+TABLE = APIRequestLog._meta.db_table
+LEGACY = f"{TABLE}_legacy"
+DEFAULT_PARTITION = f"{TABLE}_default"
+SEQUENCE = f"{TABLE}_partitioned_id_seq"
+BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def log_partition_settings():
+    config = {**DEFAULT_LOG_PARTITION_SETTINGS, **getattr(settings, "API_REQUEST_LOG_PARTITIONS", {})}
+    if config["INTERVAL"] not in INTERVALS:
+        raise ValueError(f"API_REQUEST_LOG_PARTITIONS['INTERVAL'] must be one of {', '.join(INTERVALS)}.")
+    return config
+
+
+# Interval arithmetic (partitions are aligned on UTC boundaries)
+
+
+def interval_start(moment, interval):
+    """Start of the interval holding ``moment``."""
+    moment = moment.astimezone(dt_timezone.utc)
+    start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "week":
+        return start - timedelta(days=start.weekday())
+    if interval == "month":
+        return start.replace(day=1)
+    return start
+
+
+def next_interval(start, interval):
+    """Start of the interval following the one starting at ``start``."""
+    if interval == "week":
+        return start + timedelta(days=7)
+    if interval == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def interval_length(interval):
+    return {"day": timedelta(days=1), "week": timedelta(days=7), "month": timedelta(days=31)}[interval]
+
+
+def partition_name(start):
+    return f"{TABLE}_p{start:%Y%m%d}"
+
+
+def plan_partitions(existing, now, config):
+    """
+    Partitions to create and to drop.
+    Args:
+        existing (list): (name, lower, upper) of the current partitions; None bounds are MINVALUE/MAXVALUE.
+        now (datetime): Current time.
+        config (dict): log_partition_settings().
+    Returns:
+        tuple: ([(name, lower, upper) to create], [(name, upper) to drop]), oldest first.
+    """
+    interval = config["INTERVAL"]
+    covered = [(lower, upper) for _, lower, upper in existing]
+
+    def overlaps(lower, upper):
+        return any((low is None or low < upper) and (high is None or lower < high) for low, high in covered)
+
+    create = []
+    start = interval_start(now, interval)
+    for _ in range(config["PREMAKE"] + 1):
+        end = next_interval(start, interval)
+        if not overlaps(start, end):
+            create.append((partition_name(start), start, end))
+        start = end
+    cutoff = now - timedelta(days=config["RETENTION_DAYS"])
+    drop = sorted(((name, upper) for name, _, upper in existing if upper is not None and upper <= cutoff),
+                  key=lambda partition: partition[1])
+    return create, drop
+
+
+# Rollup before removal
+
+
+def compact_logs(before):
+    """
+    Fold every log row older than ``before`` into the rollups.
+    Returns:
+        bool: Whether such rows are still not rolled up (claimed by a concurrent rollup run).
+    """
+    from .rollups import roll_up_logs
+
+    pending = APIRequestLog.objects.filter(request_time__lt=before, rolled_up=False)
+    while pending.exists():
+        if not roll_up_logs():
+            return True
+    return False
+
+
+# PostgreSQL partitions
+
+
+def is_partitioned():
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass", [TABLE])
+        return cursor.fetchone() is not None
+
+
+def _parse_bound(value):
+    value = value.strip()
+    if value.upper() in ("MINVALUE", "MAXVALUE"):
+        return None
+    parsed = datetime.fromisoformat(value.strip("'"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=dt_timezone.utc)
+
+
+def list_partitions():
+    """(name, lower, upper) of every range partition; the default partition is left out."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+            FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            """,
+            [TABLE],
+        )
+        rows = cursor.fetchall()
+    partitions = []
+    for name, bound in rows:
+        match = BOUND_RE.search(bound)
+        if match:
+            partitions.append((name, _parse_bound(match.group(1)), _parse_bound(match.group(2))))
+    return partitions
+
+
+def create_partition(name, lower, upper):
+    """Attach a partition for [lower, upper), moving its rows out of the default partition."""
+    quoted = connection.ops.quote_name
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {quoted(name)} (LIKE {quoted(TABLE)} INCLUDING DEFAULTS)")
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {quoted(DEFAULT_PARTITION)} WHERE request_time >= %s AND request_time < %s RETURNING *
+            )
+            INSERT INTO {quoted(name)} SELECT * FROM moved
+            """,
+            [lower, upper],
+        )
+        cursor.execute(
+            f"ALTER TABLE {quoted(TABLE)} ATTACH PARTITION {quoted(name)} FOR VALUES FROM (%s) TO (%s)",
+            [lower, upper],
+        )
+
+
+def drop_partition(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE {connection.ops.quote_name(name)}")
+
+
+def drop_rolled_up_partition(name):
+    """
+    Drop a partition if every one of its rows is rolled up.
+    The partition is locked first, so a late insert cannot land between the check and the drop.
+    Returns:
+        bool: Whether it was dropped.
+    """
+    quoted = connection.ops.quote_name(name)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {quoted} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(f"SELECT 1 FROM {quoted} WHERE NOT rolled_up LIMIT 1")
+        if cursor.fetchone() is not None:
+            return False
+        cursor.execute(f"DROP TABLE {quoted}")
+    return True
+
+
+def _manage_postgres(now, config):
+    create, drop = plan_partitions(list_partitions(), now, config)
+    for name, lower, upper in create:
+        create_partition(name, lower, upper)
+    dropped = []
+    cutoff = now - timedelta(days=config["RETENTION_DAYS"])
+    compact_logs(cutoff)
+    for name, upper in drop:
+        if drop_rolled_up_partition(name):
+            dropped.append(name)
+        else:
+            logger.warning("Keeping %s: some of its rows are not rolled up yet.", name)
+    # Rows that landed in the default partition expire row by row.
+    deleted = _delete_expired(cutoff, config["DELETE_BATCH"])
+    return {"created": [name for name, _, _ in create], "dropped": dropped, "deleted": deleted}
+
+
+# Plain table
+
+
+def _delete_expired(cutoff, batch_size):
+    deleted = 0
+    expired = APIRequestLog.objects.filter(request_time__lt=cutoff, rolled_up=True)
+    while True:
+        ids = list(expired.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += APIRequestLog.objects.filter(id__in=ids).delete()[0]
+
+
+def manage_log_partitions(now=None):
+    """
+    Create upcoming partitions and remove the logs older than the retention period.
+    Returns:
+        dict: Names of the created and dropped partitions, and the number of rows deleted one by one.
+    """
+    config = log_partition_settings()
+    now = now or timezone.now()
+    if config["ENABLED"] and is_partitioned():
+        return _manage_postgres(now, config)
+    cutoff = now - timedelta(days=config["RETENTION_DAYS"])
+    compact_logs(cutoff)
+    deleted = _delete_expired(cutoff, config["DELETE_BATCH"])
+    return {"created": [], "dropped": [], "deleted": deleted}
+
+
+# Conversion of the existing table (migration 0017)
+
+
+def partition_existing_table(schema_editor):
+    """
+    Turn the plain log table into a partitioned one; its rows become the legacy partition.
+
+    Only PostgreSQL runs this, and the test suite covers it only when run
+    against PostgreSQL (LogPartitionPostgresTest); check the migration on a
+    copy of the production database before deploying it.
+    """
+    interval = log_partition_settings()["INTERVAL"]
+    quoted = schema_editor.quote_name
+    execute = schema_editor.execute
+    execute(f"ALTER TABLE {quoted(TABLE)} RENAME TO {quoted(LEGACY)}")
+    execute(f"CREATE TABLE {quoted(TABLE)} (LIKE {quoted(LEGACY)}) PARTITION BY RANGE (request_time)")
+    execute(f"ALTER TABLE {quoted(TABLE)} ADD PRIMARY KEY (id, request_time)")
+    execute(
+        f"ALTER TABLE {quoted(TABLE)} ADD CONSTRAINT {quoted(TABLE + '_edge_node_id_fk')} FOREIGN KEY (edge_node_id) "
+        f"REFERENCES {quoted(APIRequestLog._meta.get_field('edge_node').related_model._meta.db_table)} (id) "
+        "DEFERRABLE INITIALLY DEFERRED"
+    )
+    # Partitioned tables cannot own an identity column before PostgreSQL 17, and a partition may not
+    # keep one: the legacy table loses its identity (or serial default, for tables created before
+    # Django 4.1) and ids come from a sequence owned by the parent, continuing after the legacy ids.
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT is_identity, column_default FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = %s AND column_name = 'id'",
+            [LEGACY],
+        )
+        is_identity, column_default = cursor.fetchone()
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0), MAX(request_time) FROM {quoted(LEGACY)}")
+        last_id, last_time = cursor.fetchone()
+    if is_identity == "YES":
+        execute(f"ALTER TABLE {quoted(LEGACY)} ALTER COLUMN id DROP IDENTITY")
+    elif column_default is not None:
+        execute(f"ALTER TABLE {quoted(LEGACY)} ALTER COLUMN id DROP DEFAULT")
+    execute(f"CREATE SEQUENCE {quoted(SEQUENCE)} START WITH {int(last_id) + 1} OWNED BY {quoted(TABLE)}.id")
+    execute(f"ALTER TABLE {quoted(TABLE)} ALTER COLUMN id SET DEFAULT nextval('{SEQUENCE}')")
+    now = timezone.now()
+    upper = next_interval(interval_start(max(now, last_time or now), interval), interval)
+    execute(f"ALTER TABLE {quoted(TABLE)} ATTACH PARTITION {quoted(LEGACY)} FOR VALUES FROM (MINVALUE) TO (%s)",
+            [upper])
+    execute(f"CREATE TABLE {quoted(DEFAULT_PARTITION)} PARTITION OF {quoted(TABLE)} DEFAULT")
+    create, _ = plan_partitions(list_partitions(), now, log_partition_settings())
+    for name, lower, upper in create:
+        create_partition(name, lower, upper)
+
+
+def merge_partitioned_table(schema_editor):
+    """Reverse of partition_existing_table: copy every partition back into one plain table."""
+    quoted = schema_editor.quote_name
+    execute = schema_editor.execute
+    plain = f"{TABLE}_plain"
+    execute(f"CREATE TABLE {quoted(plain)} (LIKE {quoted(TABLE)})")
+    execute(f"INSERT INTO {quoted(plain)} SELECT * FROM {quoted(TABLE)}")
+    execute(f"DROP TABLE {quoted(TABLE)} CASCADE")
+    execute(f"ALTER TABLE {quoted(plain)} RENAME TO {quoted(TABLE)}")
+    execute(f"ALTER TABLE {quoted(TABLE)} ADD PRIMARY KEY (id)")
+    execute(f"ALTER TABLE {quoted(TABLE)} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY")
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {quoted(TABLE)}")
+        execute(f"ALTER TABLE {quoted(TABLE)} ALTER COLUMN id RESTART WITH {int(cursor.fetchone()[0])}")
+    execute(
+        f"ALTER TABLE {quoted(TABLE)} ADD CONSTRAINT {quoted(TABLE + '_edge_node_id_fk')} FOREIGN KEY (edge_node_id) "
+        f"REFERENCES {quoted(APIRequestLog._meta.get_field('edge_node').related_model._meta.db_table)} (id) "
+        "DEFERRABLE INITIALLY DEFERRED"
+    )
+    execute(f"CREATE INDEX {quoted(schema_editor._create_index_name(TABLE, ['edge_node_id']))} "
+            f"ON {quoted(TABLE)} (edge_node_id)")
+
+
+# Partition pruning of reads
+
+
+def time_windows(queryset, until=None, field="request_time"):
+    """
+    Yield (lower, upper) bounds of ``field`` walking back from ``until`` (or from the newest rows).
+
+    The first window starts at the beginning of the previous partition
+    interval and each next one is about twice as long, until the oldest row
+    of ``queryset`` is covered.  Callers filter with ``lower <= field`` and
+    ``field < upper`` (``upper`` is None for the first window without
+    ``until``) and stop iterating once they have enough rows, so they only
+    read the partitions they need.
+    """
+    interval = log_partition_settings()["INTERVAL"]
+    span = interval_length(interval)
+    upper = until
+    lower = interval_start(interval_start(until or timezone.now(), interval) - span / 2, interval)
+    oldest = None
+    while True:
+        yield lower, upper
+        if oldest is None:
+            oldest = queryset.aggregate(oldest=Min(field))["oldest"]
+            if oldest is None:
+                return
+        if lower <= oldest:
+            return
+        span *= 2
+        upper, lower = lower, interval_start(lower - span, interval)
+
+
+def in_window(queryset, lower, upper, field="request_time"):
+    queryset = queryset.filter(**{f"{field}__gte": lower})
+    return queryset.filter(**{f"{field}__lt": upper}) if upper is not None else queryset
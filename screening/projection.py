@@ -0,0 +1,85 @@
+"""
+Sparse fieldsets: ``?fields=id,full_name`` on the REST endpoints.
+
+The projection narrows both the serializer output and the SQL: the
+queryset is restricted with ``.only()`` to the columns behind the requested
+fields (the fast list path reads them with ``values_list()``).  Without
+``?fields=``, list responses leave out the large text columns a serializer
+names in ``Meta.list_deferred_fields`` (e.g. a resume's ``parsed_text``);
+clients that need them ask for them by name, or read the detail endpoint.
+
+Only read requests are projected; writes always see the full serializer.
+"""
+import functools
+
+from rest_framework.exceptions import ValidationError
+
+
+@functools.lru_cache(maxsize=None)
+def readable_fields(serializer_class):
+    """Names of the fields ``serializer_class`` outputs, in order."""
+    return tuple(name for name, field in serializer_class().fields.items() if not field.write_only)
+
+
+def list_deferred_fields(serializer_class):
+    return tuple(getattr(getattr(serializer_class, "Meta", None), "list_deferred_fields", ()))
+
+
+def model_columns(serializer_class, names):
+    """Model fields to load for the serializer fields ``names``, or None if one of them needs more."""
+    model = serializer_class.Meta.model
+    concrete = {field.name for field in model._meta.concrete_fields} | {
+        field.attname for field in model._meta.concrete_fields
+    }
+    fields = serializer_class().fields
+    columns = {model._meta.pk.name}
+    for name in names:
+        source = fields[name].source_attrs
+        if len(source) != 1 or source[0] not in concrete:
+            return None
+        columns.add(source[0])
+    return sorted(columns)
+
+
+class SparseFieldsMixin:
+    """``?fields=`` projection for a viewset; see the module docstring."""
+    fields_query_param = "fields"
+
+    def requested_fields(self, serializer_class, many=False):
+        """Field names to output, or None for all of them."""
+        if self.request.method not in ("GET", "HEAD"):
+            return None
+        available = readable_fields(serializer_class)
+        raw = self.request.query_params.get(self.fields_query_param)
+        if raw:
+            names = {name.strip() for name in raw.split(",") if name.strip()}
+            unknown = names - set(available)
+            if unknown:
+                raise ValidationError({self.fields_query_param: [
+                    f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(available)}."
+                ]})
+            return tuple(name for name in available if name in names)
+        deferred = list_deferred_fields(serializer_class) if many else ()
+        return tuple(name for name in available if name not in deferred) if deferred else None
+
+    def project(self, queryset, serializer_class, many=False):
+        """(queryset narrowed to the projected columns, projected field names or None)."""
+        fields = self.requested_fields(serializer_class, many)
+        columns = model_columns(serializer_class, fields) if fields is not None else None
+        if not columns:
+            return queryset, fields
+        if many and hasattr(self.paginator, "get_keys"):
+            # Keyset cursors read the ordering fields of the page's edge rows.
+            columns += [field.name for _, _, field in self.paginator.get_keys(queryset)]
+        return queryset.only(*columns), fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("list", "retrieve"):
+            queryset, _ = self.project(queryset, self.get_serializer_class(), many=self.action == "list")
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in ("list", "retrieve") and "fields" not in kwargs:
+            kwargs["fields"] = self.requested_fields(self.get_serializer_class(), many=self.action == "list")
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,77 @@
+"""
+Page-size limits and a static cost check for GraphQL queries.
+
+Every list field that can grow with the data takes a ``first`` argument.
+``QueryCostRule`` multiplies the page sizes of nested paginated fields to
+estimate how many rows an operation can return, and rejects it before
+execution when the estimate exceeds ``settings.GRAPHQL_MAX_QUERY_COST``.
+"""
+from django.conf import settings
+from graphql import GraphQLError
+from graphql.language import FieldNode, FragmentSpreadNode, InlineFragmentNode, IntValueNode
+from graphql.validation import ValidationRule
+
+# Paginated fields, by their GraphQL name.
+PAGINATED_FIELDS = {"nodeLogs", "edgeNodes", "apiLogs"}
+
+
+def default_page_size():
+    return getattr(settings, "GRAPHQL_DEFAULT_PAGE_SIZE", 100)
+
+
+def max_page_size():
+    return getattr(settings, "GRAPHQL_MAX_PAGE_SIZE", 1000)
+
+
+def max_query_cost():
+    return getattr(settings, "GRAPHQL_MAX_QUERY_COST", 20000)
+
+
+def page_size(first):
+    """Validate a ``first`` argument at execution time and return the effective page size."""
+    if first is None:
+        return default_page_size()
+    if not 1 <= first <= max_page_size():
+        raise GraphQLError(f"`first` must be between 1 and {max_page_size()}.")
+    return first
+
+
+class QueryCostRule(ValidationRule):
+    def enter_operation_definition(self, node, *args):
+        cost = self._cost(node.selection_set, 1, frozenset())
+        limit = max_query_cost()
+        if cost > limit:
+            self.report_error(GraphQLError(f"Query may return {cost} rows, above the limit of {limit}.", node))
+
+    def _cost(self, selection_set, multiplier, fragments):
+        if selection_set is None:
+            return 0
+        total = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                inner = multiplier
+                if selection.name.value in PAGINATED_FIELDS:
+                    inner = multiplier * self._page_size(selection)
+                    total += inner
+                total += self._cost(selection.selection_set, inner, fragments)
+            elif isinstance(selection, InlineFragmentNode):
+                total += self._cost(selection.selection_set, multiplier, fragments)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.context.get_fragment(name)
+                if fragment is not None and name not in fragments:
+                    total += self._cost(fragment.selection_set, multiplier, fragments | {name})
+        return total
+
+    def _page_size(self, field):
+        for argument in field.arguments:
+            if argument.name.value != "first":
+                continue
+            if not isinstance(argument.value, IntValueNode):
+                # Variables are not known during validation; assume the largest page.
+                return max_page_size()
+            value = int(argument.value.value)
+            if not 1 <= value <= max_page_size():
+                self.report_error(GraphQLError(f"`first` must be between 1 and {max_page_size()}.", argument))
+            return value
+        return default_page_size()
@@ -0,0 +1,267 @@
+"""
+Incremental re-scoring of the resume x job score matrix.
+
+Signal handlers (``screening.signals``) and the parsing pipeline record what
+changed in the PendingRescore table and schedule ``rescore_matches``.  The
+schedule is debounced through a lock key in the default cache, which must be
+shared by the web and Celery workers (Redis): only the first change in a
+``RESCORE_DELAY`` window queues a task, and that task clears the key and
+drains every pending row at once, so a burst of edits is re-scored in one
+pass.  A task that could not drain the queue schedules the next one, and
+the ``rescore-matches`` beat entry picks up rows left behind by a lost task
+(or by a process-local cache, which only coalesces within one process).
+
+Only the affected parts of the matrix are recomputed:
+
+* a changed job is a column: every resume is scored against that job only
+  (from the term vectors cached by the last run, see
+  ``matching.resume_vectors``), its JobMatch ranking is replaced, and
+  ``ai_score`` is raised where the job is now the best match.  Resumes whose best job got worse are re-scored as
+  rows, since their new best could be any job;
+* a changed resume is a row: it is scored against every job, its
+  ``ai_score``/``best_job`` are replaced and it is merged into (or removed
+  from) the stored rankings of the jobs it affects.
+
+JobMatch lists hold the exact top ``TOP_K`` resumes of a job, or every
+matching resume when there are fewer.  When a stored resume drops out of a
+full list (its score fell, or it was deleted) the list is no longer known to
+be complete, so that job is queued for a column re-score.
+
+Idf weights come from the current jobs, as in ``score_resumes``.  Scores
+left unchanged by an incremental pass keep the idf of the run that computed
+them, so the nightly ``score-resumes`` beat entry re-scores everything.
+
+A run keeps the job side (``matching.job_space``) when no job changed, so a
+run of resume edits does not vectorize the jobs again; a job edit
+re-tokenizes that job only (``matching.job_vectors``).  A column re-score
+still reads every scorable resume from the database and scores it; only
+resumes beyond ``VECTOR_CACHE_SIZE`` are tokenized again.
+"""
+import numpy as np
+from django.core import checks
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+from .matching import (
+    RESUME_FIELDS, TopK, block_rows, documents_for, job_space, matching_settings, resume_chunks, resume_vectors,
+    save_matches, save_scores, scorable_resumes, to_percent,
+)
+from .models import Job, JobMatch, PendingRescore, Resume
+from .response_cache import invalidate_resumes
+
+RESCORE_SCHEDULED_KEY = "matching:rescore-scheduled"
+
+
+@checks.register(checks.Tags.caches)
+def check_rescore_lock(app_configs, **kwargs):
+    if isinstance(caches["default"], LocMemCache):
+        return [checks.Warning(
+            "The default cache is process-local: re-scoring runs are only coalesced within one process, and "
+            "changes made while another process holds the lock wait for the rescore-matches beat entry.",
+            hint="Point the default cache at a shared backend such as Redis.",
+            id="screening.W001",
+        )]
+    return []
+
+
+def mark_dirty(jobs=(), resumes=()):
+    """Queue jobs and resumes for re-scoring and schedule a coalesced run after commit."""
+    rows = [PendingRescore(kind=PendingRescore.JOB, object_id=pk) for pk in jobs]
+    rows += [PendingRescore(kind=PendingRescore.RESUME, object_id=pk) for pk in resumes]
+    if not rows:
+        return
+    PendingRescore.objects.bulk_create(rows, ignore_conflicts=True, batch_size=1000)
+    transaction.on_commit(schedule_rescore)
+
+
+def schedule_rescore():
+    delay = matching_settings()["RESCORE_DELAY"]
+    # Only the first change in a window queues a task; the task clears the key when it starts.
+    if cache.add(RESCORE_SCHEDULED_KEY, True, timeout=delay + 300):
+        from .tasks import rescore_matches
+        rescore_matches.apply_async(countdown=delay)
+
+
+def take_pending(limit):
+    """Remove and return up to ``limit`` queued (job ids, resume ids)."""
+    with transaction.atomic():
+        pending = list(
+            PendingRescore.objects.select_for_update(skip_locked=True).order_by("id")
+            .values_list("id", "kind", "object_id")[:limit]
+        )
+        PendingRescore.objects.filter(pk__in=[row[0] for row in pending]).delete()
+    jobs = {object_id for _, kind, object_id in pending if kind == PendingRescore.JOB}
+    resumes = {object_id for _, kind, object_id in pending if kind == PendingRescore.RESUME}
+    return jobs, resumes
+
+
+def rescore_pending(max_batches=10):
+    """
+    Re-score everything queued in PendingRescore.
+    Returns:
+        dict: Numbers of jobs and resumes re-scored and of (resume, job) pairs computed.
+    """
+    cache.delete(RESCORE_SCHEDULED_KEY)
+    limit = matching_settings()["RESCORE_BATCH"]
+    totals = {"jobs": 0, "resumes": 0, "pairs": 0}
+    for _ in range(max_batches):
+        jobs, resumes = take_pending(limit)
+        if not jobs and not resumes:
+            break
+        for key, value in rescore(jobs, resumes).items():
+            totals[key] += value
+    else:
+        if PendingRescore.objects.exists():
+            schedule_rescore()
+    return totals
+
+
+def rescore(job_ids=(), resume_ids=()):
+    """
+    Recompute the score matrix columns of ``job_ids`` and rows of ``resume_ids``.
+    Returns:
+        dict: Numbers of jobs and resumes re-scored and of (resume, job) pairs computed.
+    """
+    config = matching_settings()
+    jobs = list(Job.objects.order_by("id").values_list("id", "title", "description", "required_skills"))
+    rows = set(resume_ids)
+    if not jobs:
+        Resume.objects.filter(pk__in=rows).update(ai_score=None, best_job=None)
+        invalidate_resumes(rows)
+        return {"jobs": 0, "resumes": len(rows), "pairs": 0}
+    space = job_space(jobs, config)
+    known = set(space.job_ids)
+    columns = sorted(job_id for job_id in set(job_ids) if job_id in known)
+
+    pairs = 0
+    if columns:
+        column_rows, scored = _rescore_columns(space.select(columns), config)
+        rows |= column_rows
+        pairs += scored * len(columns)
+    if rows:
+        unsure, scored = _rescore_rows(space, sorted(rows), config)
+        pairs += scored * len(jobs)
+        unsure -= set(columns)
+        if unsure:
+            mark_dirty(jobs=unsure)
+    return {"jobs": len(columns), "resumes": len(rows), "pairs": pairs}
+
+
+def _rescore_columns(space, config):
+    """Score every resume against the jobs in ``space``. Returns (resumes needing a row re-score, count)."""
+    job_ids = space.job_ids
+    position = {job_id: i for i, job_id in enumerate(job_ids)}
+    top = TopK(len(job_ids), config["TOP_K"])
+    rows_to_rescore = set()
+    scored = 0
+    resume_vectors.start_pass()
+    for chunk in resume_chunks(block_rows(len(job_ids), config)):
+        block = space.scores(documents_for(chunk, config))
+        top.add(block, np.fromiter((row[0] for row in chunk), dtype=np.int64, count=len(chunk)))
+        scored += len(chunk)
+        best = block.argmax(axis=1)
+        raised, raised_scores, raised_jobs = [], [], []
+        for i, row in enumerate(chunk):
+            ai_score, best_job = row[4], row[5]
+            score = to_percent(block[i, best[i]])
+            if ai_score is not None and score > ai_score:
+                raised.append(row)
+                raised_scores.append(score)
+                raised_jobs.append(job_ids[best[i]])
+            elif ai_score is None or best_job is None:
+                rows_to_rescore.add(row[0])
+            elif best_job in position and to_percent(block[i, position[best_job]]) < ai_score:
+                # The best job got worse: only a full row can tell the new best.
+                rows_to_rescore.add(row[0])
+        save_scores(raised, raised_scores, raised_jobs, config["BATCH_SIZE"])
+    save_matches(job_ids, top, config["MIN_SCORE"], config["BATCH_SIZE"])
+    return rows_to_rescore, scored
+
+
+def _rescore_rows(space, resume_ids, config):
+    """Score ``resume_ids`` against every job. Returns (jobs whose ranking may be incomplete, count)."""
+    unsure = set()
+    scored = 0
+    size = block_rows(len(space.job_ids), config)
+    for start in range(0, len(resume_ids), size):
+        ids = resume_ids[start:start + size]
+        chunk = list(scorable_resumes().filter(pk__in=ids).order_by("id").values_list(*RESUME_FIELDS))
+        found = {row[0] for row in chunk}
+        # Resumes that were deleted or lost their text drop out of every ranking.
+        missing = [pk for pk in ids if pk not in found]
+        Resume.objects.filter(pk__in=missing).update(ai_score=None, best_job=None)
+        invalidate_resumes(missing)
+        if chunk:
+            block = space.scores(documents_for(chunk, config))
+            best = block.argmax(axis=1)
+            save_scores(
+                chunk,
+                [to_percent(block[i, column]) for i, column in enumerate(best)],
+                [space.job_ids[column] for column in best],
+                config["BATCH_SIZE"],
+            )
+            scored += len(chunk)
+        else:
+            block = np.zeros((0, len(space.job_ids)), dtype=np.float32)
+        unsure |= _merge_rows(space.job_ids, ids, [row[0] for row in chunk], block, config)
+    return unsure, scored
+
+
+def _merge_rows(job_ids, all_ids, scored_ids, block, config):
+    """Merge new scores of some resumes into the stored per-job rankings."""
+    k, min_score = config["TOP_K"], config["MIN_SCORE"]
+    percent = np.round(block.astype(np.float64) * 100, 2)
+
+    # A ranking is full when it holds a rank-k entry, whose score is then its lowest; only jobs
+    # some resume here scores for need it.
+    scoring = percent > min_score
+    candidates = [job_ids[column] for column in np.flatnonzero(scoring.any(axis=0))]
+    floors = dict(JobMatch.objects.filter(job_id__in=candidates, rank=k).values_list("job_id", "score"))
+    full = np.array([job_id in floors for job_id in job_ids], dtype=bool)
+    lows = np.array([floors.get(job_id, 0.0) for job_id in job_ids])
+    qualifies = scoring & (~full | (percent > lows))
+    affected = {job_ids[column] for column in np.flatnonzero(qualifies.any(axis=0))}
+    affected |= set(JobMatch.objects.filter(resume_id__in=all_ids).values_list("job_id", flat=True))
+    if not affected:
+        return set()
+
+    column_of = {job_id: i for i, job_id in enumerate(job_ids)}
+    row_of = {resume_id: i for i, resume_id in enumerate(scored_ids)}
+    moving = set(all_ids)
+    entries = {job_id: {} for job_id in affected}
+    for job_id, resume_id, score in JobMatch.objects.filter(job_id__in=affected).values_list(
+            "job_id", "resume_id", "score"):
+        entries[job_id][resume_id] = score
+
+    unsure = set()
+    matches = []
+    for job_id, ranking in entries.items():
+        full = len(ranking) >= k
+        others = [score for resume_id, score in ranking.items() if resume_id not in moving]
+        floor = min(others) if others else 0.0
+        column = column_of.get(job_id)
+        for resume_id in all_ids:
+            row = row_of.get(resume_id)
+            score = percent[row, column] if row is not None and column is not None else 0.0
+            stored = resume_id in ranking
+            if score <= min_score:
+                if stored:
+                    del ranking[resume_id]
+                    if full:
+                        unsure.add(job_id)
+            elif stored and full and score < floor:
+                # Resumes outside the stored list may now rank above this one.
+                ranking[resume_id] = float(score)
+                unsure.add(job_id)
+            else:
+                ranking[resume_id] = float(score)
+        ranked = sorted(ranking.items(), key=lambda item: (-item[1], item[0]))[:k]
+        matches.extend(
+            JobMatch(job_id=job_id, resume_id=resume_id, score=score, rank=rank)
+            for rank, (resume_id, score) in enumerate(ranked, start=1)
+        )
+    with transaction.atomic():
+        JobMatch.objects.filter(job_id__in=affected).delete()
+        JobMatch.objects.bulk_create(matches, batch_size=config["BATCH_SIZE"])
+    return unsure
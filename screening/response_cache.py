@@ -0,0 +1,221 @@
+"""
+Read-through cache of rendered API responses, invalidated by version counters.
+
+A cached handler declares the data it depends on as scopes, e.g.
+``"job:{pk}"``, formatted with the view's URL kwargs.  Each scope has a
+version counter in the cache, and the versions are part of the entry key::
+
+    response-cache:<hash of view, action, user scope, scheme, host, path, query, versions>
+
+so a write never has to find the entries it makes stale: the signal
+handlers in ``screening.signals`` (and the bulk writers that bypass them)
+bump the versions of the scopes they touch, and every later request builds
+a new key.  Old entries are left to expire after ``TTL``.  Counters are
+bumped when the change is made and again when its transaction commits, so
+a request that read the old rows in between cannot leave them cached under
+the current version.
+
+The key also gives the ETag, so ``If-None-Match`` is answered with a 304
+after one cache read of the versions, before any query or serialization.
+On a miss, the first request takes a short lock and renders the response;
+concurrent requests for the same key wait for it instead of running the
+same queries (no stampede when a popular page is invalidated).
+
+Only successful JSON GET responses are cached, with the headers in
+``CACHED_HEADERS`` (content negotiation and allowed methods), which hits and
+misses both send back.  Entries are keyed by host
+too, as the pagination links they hold are absolute URLs.  The cache must
+be shared by every web worker and the Celery workers, or a bump made in
+one process leaves the others serving stale entries: a process-local
+backend fails the ``screening.E001`` system check.
+"""
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+from .models import Job, Resume
+
+DEFAULT_RESPONSE_CACHE_SETTINGS = {
+    "ENABLED": True,
+    "CACHE": "default",
+    "TTL": 300,
+    "LOCK_TTL": 10,
+    "LOCK_WAIT": 2.0,
+}
+
+# Headers of the rendered response stored with its body.
+CACHED_HEADERS = ("Content-Type", "Content-Language", "Vary", "Allow")
+# Part of every entry key; bumped when the entry layout changes.
+ENTRY_FORMAT = 2
+
+
+def response_cache_settings():
+    return {**DEFAULT_RESPONSE_CACHE_SETTINGS, **getattr(settings, "RESPONSE_CACHE", {})}
+
+
+def _cache():
+    return caches[response_cache_settings()["CACHE"]]
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    config = response_cache_settings()
+    if config["ENABLED"] and isinstance(_cache(), LocMemCache):
+        return [checks.Error(
+            f"RESPONSE_CACHE uses the process-local cache {config['CACHE']!r}; invalidations made by one "
+            "worker would not reach the others.",
+            hint="Point the cache at a shared backend such as Redis, or set RESPONSE_CACHE['ENABLED'] to False.",
+            id="screening.E001",
+        )]
+    return []
+
+
+def _version_key(scope):
+    return f"response-cache:version:{scope}"
+
+
+def versions(scopes):
+    """Current version of each scope."""
+    cache = _cache()
+    keys = [_version_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # A new counter starts from the clock, so it never repeats the versions of an evicted one.
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def _bump(scopes):
+    cache = _cache()
+    for scope in scopes:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def invalidate(scopes):
+    """Make the cached responses depending on ``scopes`` stale, now and when the transaction commits."""
+    scopes = set(scopes)
+    if not scopes or not response_cache_settings()["ENABLED"]:
+        return
+    _bump(scopes)
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+def invalidate_jobs(job_ids):
+    invalidate(["jobs", *(f"job:{pk}" for pk in job_ids)])
+
+
+def invalidate_job_applicants(job_ids):
+    invalidate(f"job:{pk}:applicants" for pk in job_ids)
+
+
+def invalidate_applicants(applicant_ids):
+    """Applicants' own pages and the applicant lists of the jobs they applied to."""
+    applicant_ids = list(applicant_ids)
+    job_ids = Job.applicants.through.objects.filter(applicant_id__in=applicant_ids).values_list("job_id", flat=True)
+    invalidate([*(f"applicant:{pk}" for pk in applicant_ids), *(f"job:{pk}:applicants" for pk in set(job_ids))])
+
+
+def invalidate_resumes(resume_ids):
+    """The resume lists of the applicants owning ``resume_ids``."""
+    applicant_ids = Resume.objects.filter(pk__in=list(resume_ids)).values_list("applicant_id", flat=True)
+    invalidate(f"applicant:{pk}" for pk in set(applicant_ids) if pk is not None)
+
+
+def _entry_key(view, request, scopes, per_user):
+    user = request.user
+    parts = [
+        str(ENTRY_FORMAT),
+        view.__class__.__name__,
+        view.action or "",
+        str(user.pk) if per_user and user.is_authenticated else "",
+        request.scheme,
+        request.get_host(),
+        request.path,
+        "&".join(f"{name}={value}" for name, values in sorted(request.query_params.lists()) for value in values),
+        ",".join(map(str, versions(scopes))),
+    ]
+    return "response-cache:" + hashlib.sha256("\n".join(parts).encode()).hexdigest()[:40]
+
+
+def _get_or_render(key, render, config):
+    """The cached (content, headers) of ``key``, rendering it under a lock on a miss."""
+    cache = _cache()
+    entry = cache.get(key)
+    if entry is not None:
+        return entry, None
+    lock = f"{key}:lock"
+    if not cache.add(lock, 1, config["LOCK_TTL"]):
+        # Another request is rendering this entry: wait for it rather than run the same queries.
+        deadline = time.monotonic() + config["LOCK_WAIT"]
+        delay = 0.005
+        while time.monotonic() < deadline and cache.get(lock) is not None:
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry, None
+        return render()
+    try:
+        entry, response = render()
+        if entry is not None:
+            cache.set(key, entry, config["TTL"])
+        return entry, response
+    finally:
+        cache.delete(lock)
+
+
+def cache_response(*scopes, per_user=True):
+    """
+    Cache the JSON responses of a viewset handler.
+    Args:
+        scopes (str): Data the response depends on, formatted with the URL kwargs (e.g. "job:{pk}").
+        per_user (bool): Keep separate entries per authenticated user; False when the response
+            is the same for everyone.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            config = response_cache_settings()
+            if not config["ENABLED"] or request.method != "GET" or request.accepted_renderer.format != "json":
+                return handler(view, request, *args, **kwargs)
+            key = _entry_key(view, request, [scope.format(**kwargs) for scope in scopes], per_user)
+            etag = f'"{key.rsplit(":", 1)[1]}"'
+            if etag in parse_etags(request.headers.get("If-None-Match", "")):
+                response = HttpResponseNotModified()
+                response["ETag"] = etag
+                return response
+
+            def render():
+                response = handler(view, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return None, response
+                response = view.finalize_response(request, response, *args, **kwargs)
+                response.render()
+                headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+                return (response.content, headers), response
+
+            entry, response = _get_or_render(key, render, config)
+            if entry is None:
+                return response
+            content, headers = entry
+            response = HttpResponse(content)
+            for name, value in headers.items():
+                response[name] = value
+            response["ETag"] = etag
+            return response
+        return wrapper
+    return decorator
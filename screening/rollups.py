@@ -0,0 +1,131 @@
+"""
+Incremental per-minute rollups of APIRequestLog response times.
+
+``roll_up_logs`` folds the log rows not yet marked ``rolled_up`` into
+``NodePerformanceRollup`` buckets and marks them in the same transaction.
+Log ids do not commit in order (buffered flushes, bulk uploads and the
+Celery fallback each write in their own transaction), so a row that commits
+late with a lower id is still picked up by the next run, and merged into
+its minute's bucket even when that bucket was written before.  The rows are
+claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the database
+supports it, so two concurrent runs never count a row twice.
+"""
+from django.db import transaction
+
+from .models import APIRequestLog, NodePerformanceRollup
+from .sketch import LatencySketch
+
+MARK_BATCH_SIZE = 5000
+
+
+class _Bucket:
+    __slots__ = ("count", "total", "minimum", "maximum", "sketch")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.sketch = LatencySketch()
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        self.sketch.add(value)
+
+    def merge_into(self, rollup):
+        rollup.request_count += self.count
+        rollup.total_response_ms += self.total
+        rollup.min_response_ms = self.minimum if rollup.min_response_ms is None else min(rollup.min_response_ms, self.minimum)
+        rollup.max_response_ms = self.maximum if rollup.max_response_ms is None else max(rollup.max_response_ms, self.maximum)
+        sketch = LatencySketch.from_dict(rollup.latency_sketch) if rollup.latency_sketch else LatencySketch()
+        rollup.latency_sketch = sketch.merge(self.sketch).to_dict()
+
+
+def roll_up_logs(max_rows=50000):
+    """
+    Fold up to ``max_rows`` APIRequestLog rows that are not rolled up yet into per-minute rollups.
+    Returns:
+        int: Number of log rows processed.
+    """
+    with transaction.atomic():
+        rows = list(
+            APIRequestLog.objects.filter(rolled_up=False)
+            .order_by('id')
+            .select_for_update(skip_locked=True)
+            .values_list('id', 'edge_node_id', 'request_time', 'response_time_ms')[:max_rows]
+        )
+        if not rows:
+            return 0
+        buckets = {}
+        for _, node_id, request_time, response_ms in rows:
+            minute = request_time.replace(second=0, microsecond=0)
+            bucket = buckets.get((node_id, minute))
+            if bucket is None:
+                bucket = buckets[(node_id, minute)] = _Bucket()
+            bucket.add(response_ms)
+
+        existing = {
+            (rollup.edge_node_id, rollup.bucket_start): rollup
+            for rollup in NodePerformanceRollup.objects.select_for_update().filter(
+                edge_node_id__in={node_id for node_id, _ in buckets},
+                bucket_start__in={minute for _, minute in buckets},
+            )
+        }
+        to_create, to_update = [], []
+        for key, bucket in buckets.items():
+            rollup = existing.get(key)
+            if rollup is None:
+                rollup = NodePerformanceRollup(edge_node_id=key[0], bucket_start=key[1])
+                to_create.append(rollup)
+            else:
+                to_update.append(rollup)
+            bucket.merge_into(rollup)
+        NodePerformanceRollup.objects.bulk_create(to_create, batch_size=1000)
+        NodePerformanceRollup.objects.bulk_update(
+            to_update,
+            ['request_count', 'total_response_ms', 'min_response_ms', 'max_response_ms', 'latency_sketch'],
+            batch_size=1000,
+        )
+        ids = [row[0] for row in rows]
+        # The request_time bounds let PostgreSQL skip the partitions these rows are not in.
+        claimed = APIRequestLog.objects.filter(request_time__range=(min(row[2] for row in rows),
+                                                                    max(row[2] for row in rows)))
+        for start in range(0, len(ids), MARK_BATCH_SIZE):
+            claimed.filter(id__in=ids[start:start + MARK_BATCH_SIZE]).update(rolled_up=True)
+    return len(rows)
+
+
+def node_performance(node_id, since=None, until=None):
+    """
+    Combine a node's rollup buckets in ``[since, until)`` into summary statistics.
+    Returns:
+        dict: total_requests, avg/min/max response time and p50/p95/p99 estimates.
+    """
+    rollups = NodePerformanceRollup.objects.filter(edge_node_id=node_id)
+    if since is not None:
+        rollups = rollups.filter(bucket_start__gte=since)
+    if until is not None:
+        rollups = rollups.filter(bucket_start__lt=until)
+    total_requests, total_ms = 0, 0.0
+    minimum, maximum = None, None
+    sketch = LatencySketch()
+    for count, total, low, high, data in rollups.values_list(
+        'request_count', 'total_response_ms', 'min_response_ms', 'max_response_ms', 'latency_sketch'
+    ):
+        total_requests += count
+        total_ms += total
+        minimum = low if minimum is None else min(minimum, low)
+        maximum = high if maximum is None else max(maximum, high)
+        sketch.merge(LatencySketch.from_dict(data))
+    return {
+        "total_requests": total_requests,
+        "avg_response_time": total_ms / total_requests if total_requests else 0,
+        "min_response_time": minimum,
+        "max_response_time": maximum,
+        "p50_response_time": sketch.quantile(0.50),
+        "p95_response_time": sketch.quantile(0.95),
+        "p99_response_time": sketch.quantile(0.99),
+    }
@@ -0,0 +1,226 @@
+"""
+In-process spatial index used to route requests to the nearest healthy edge node.
+
+Healthy nodes are projected onto the unit sphere and bucketed into a uniform
+3D grid.  A k-nearest query searches rings of cells around the caller until no
+unvisited cell can hold a closer node; chord length on the unit sphere is
+monotonic with great-circle distance, so the ordering is exactly the
+haversine ordering.
+"""
+import heapq
+import math
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Below this many nodes a linear scan beats walking the grid.
+BRUTE_FORCE_THRESHOLD = 64
+
+# Version counter in the shared cache, bumped whenever any process changes node health or location.
+VERSION_KEY = "routing:node-index-version"
+
+NodeLocation = namedtuple("NodeLocation", ["pk", "name", "ip_address", "latitude", "longitude"])
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres between two (lat, lon) points in degrees."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _to_unit_vector(latitude, longitude):
+    phi, lmb = math.radians(latitude), math.radians(longitude)
+    cos_phi = math.cos(phi)
+    return (cos_phi * math.cos(lmb), cos_phi * math.sin(lmb), math.sin(phi))
+
+
+def _chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def _cell_size_for(count):
+    # Aim for roughly two nodes per cell cross-section of the sphere surface.
+    if count <= 0:
+        return 0.5
+    return min(0.5, max(0.005, math.sqrt(8 * math.pi / count)))
+
+
+class NodeIndex:
+    """
+    Grid index over healthy EdgeNode locations.
+
+    The index is loaded lazily from the database and fully rebuilt once it is
+    older than ``ttl`` seconds.  Changes made in this process are applied
+    incrementally through ``upsert``/``discard`` (wired to EdgeNode signals in
+    ``screening.signals``); ``publish`` bumps a version counter in the shared
+    cache, which every process checks at most every
+    ``EDGE_ROUTING_VERSION_CHECK_INTERVAL`` seconds and rebuilds on, so changes
+    made elsewhere (e.g. by the Celery health probe) are picked up without
+    waiting for the TTL.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._cell_size = _cell_size_for(0)
+        self._cells = {}
+        self._entries = {}
+        self._built_at = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _ttl(self):
+        if self.ttl is not None:
+            return self.ttl
+        return getattr(settings, "EDGE_ROUTING_INDEX_TTL", 30)
+
+    @staticmethod
+    def _check_interval():
+        return getattr(settings, "EDGE_ROUTING_VERSION_CHECK_INTERVAL", 1.0)
+
+    def _cell_of(self, vector):
+        size = self._cell_size
+        return (math.floor(vector[0] / size), math.floor(vector[1] / size), math.floor(vector[2] / size))
+
+    def _insert(self, location):
+        vector = _to_unit_vector(location.latitude, location.longitude)
+        cell = self._cell_of(vector)
+        self._cells.setdefault(cell, {})[location.pk] = (vector, location)
+        self._entries[location.pk] = cell
+
+    def _remove(self, pk):
+        cell = self._entries.pop(pk, None)
+        if cell is None:
+            return
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.pop(pk, None)
+            if not bucket:
+                del self._cells[cell]
+
+    def rebuild(self, locations=None):
+        """Replace the index contents, loading healthy nodes from the database by default."""
+        # Read before the rows, so a change published while loading triggers another rebuild.
+        version = cache.get(VERSION_KEY)
+        if locations is None:
+            from .models import EdgeNode
+            locations = [
+                NodeLocation(*row)
+                for row in EdgeNode.objects.filter(status="healthy").values_list(
+                    "pk", "name", "ip_address", "latitude", "longitude"
+                )
+            ]
+        with self._lock:
+            self._cell_size = _cell_size_for(len(locations))
+            self._cells = {}
+            self._entries = {}
+            for location in locations:
+                self._insert(location)
+            self._built_at = self._checked_at = time.monotonic()
+            self._version = version
+
+    def invalidate(self):
+        """Force a full rebuild on the next query."""
+        with self._lock:
+            self._built_at = None
+
+    def publish(self):
+        """Make every process rebuild its index on its next query (this one included)."""
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        self.invalidate()
+
+    def upsert(self, node):
+        """Apply a saved EdgeNode to the index, adding or dropping it based on its health."""
+        with self._lock:
+            if self._built_at is None:
+                return
+            self._remove(node.pk)
+            if node.status == "healthy":
+                self._insert(NodeLocation(node.pk, node.name, node.ip_address, node.latitude, node.longitude))
+
+    def discard(self, pk):
+        with self._lock:
+            self._remove(pk)
+
+    def _ensure_fresh(self):
+        built_at = self._built_at
+        now = time.monotonic()
+        if built_at is None or now - built_at > self._ttl():
+            self.rebuild()
+        elif now - self._checked_at > self._check_interval():
+            self._checked_at = now
+            if cache.get(VERSION_KEY) != self._version:
+                self.rebuild()
+
+    def nearest(self, latitude, longitude, k=1):
+        """
+        Return up to ``k`` healthy nodes closest to the given point.
+
+        Args:
+            latitude (float): Caller latitude in degrees.
+            longitude (float): Caller longitude in degrees.
+            k (int): Number of nodes to return.
+        Returns:
+            list: ``(NodeLocation, distance_km)`` pairs, nearest first.
+        """
+        self._ensure_fresh()
+        query = _to_unit_vector(latitude, longitude)
+        with self._lock:
+            if len(self._entries) <= BRUTE_FORCE_THRESHOLD:
+                candidates = [entry for bucket in self._cells.values() for entry in bucket.values()]
+                best = heapq.nsmallest(k, ((math.dist(query, vector), location) for vector, location in candidates),
+                                       key=lambda item: item[0])
+            else:
+                best = self._ring_search(query, k)
+        return [(location, _chord_to_km(chord)) for chord, location in best]
+
+    def _ring_search(self, query, k):
+        cells = self._cells
+        size = self._cell_size
+        ci, cj, ck = self._cell_of(query)
+        total = len(self._entries)
+        max_ring = int(2 / size) + 2
+        heap = []  # max-heap on chord length via negation
+        seen = 0
+        for ring in range(max_ring + 1):
+            for di in range(-ring, ring + 1):
+                edge_i = abs(di) == ring
+                for dj in range(-ring, ring + 1):
+                    if edge_i or abs(dj) == ring:
+                        dks = range(-ring, ring + 1)
+                    elif ring:
+                        dks = (-ring, ring)
+                    else:
+                        dks = (0,)
+                    for dk in dks:
+                        bucket = cells.get((ci + di, cj + dj, ck + dk))
+                        if not bucket:
+                            continue
+                        for vector, location in bucket.values():
+                            seen += 1
+                            chord = math.dist(query, vector)
+                            if len(heap) < k:
+                                heapq.heappush(heap, (-chord, location.pk, location))
+                            elif chord < -heap[0][0]:
+                                heapq.heapreplace(heap, (-chord, location.pk, location))
+            # Every unvisited node is at least `ring` full cells away along some axis.
+            if seen == total or (len(heap) == k and -heap[0][0] <= ring * size):
+                break
+        return [(-neg, location) for neg, _, location in sorted(heap, reverse=True)]
+
+
+node_index = NodeIndex()
@@ -1,46 +1,133 @@
+import base64
+import binascii
+from datetime import timedelta
+
 import graphene
 from graphene_django import DjangoObjectType
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .loaders import get_loaders
 from .models import EdgeNode, APIRequestLog
-from django.db.models import Avg
+from .partitions import in_window, time_windows
+from .query_cost import page_size
+from .rollups import node_performance
 from graphql import GraphQLError
 
+
+def encode_cursor(*values):
+    return base64.urlsafe_b64encode("|".join(str(value) for value in values).encode()).decode()
+
+def decode_cursor(cursor, *parsers):
+    """Values of ``cursor``, each converted by the matching parser; a parser returning None rejects it."""
+    try:
+        values = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        if len(values) != len(parsers):
+            raise ValueError
+        values = [parse(value) for parse, value in zip(parsers, values)]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise GraphQLError("Invalid cursor.")
+    if None in values:
+        raise GraphQLError("Invalid cursor.")
+    return values
+
 class EdgeNodeType(DjangoObjectType):
+    api_logs = graphene.List(graphene.NonNull(lambda: APIRequestLogType), first=graphene.Int())
+
     class Meta:
         model = EdgeNode
         fields = "__all__"
 
+    def resolve_api_logs(self, info, first=None):
+        return get_loaders(info.context).api_logs(page_size(first)).load(self.pk)
+
 class APIRequestLogType(DjangoObjectType):
     class Meta:
         model = APIRequestLog
         fields = "__all__"
 
+    def resolve_edge_node(self, info):
+        return get_loaders(info.context).edge_nodes.load(self.edge_node_id)
+
+class APIRequestLogConnection(graphene.relay.Connection):
+    class Meta:
+        node = APIRequestLogType
+
 class EdgeNodePerformanceType(graphene.ObjectType):
     node = graphene.Field(EdgeNodeType)
     avg_response_time = graphene.Float()
     total_requests = graphene.Int()
+    min_response_time = graphene.Float()
+    max_response_time = graphene.Float()
+    p50_response_time = graphene.Float()
+    p95_response_time = graphene.Float()
+    p99_response_time = graphene.Float()
 
 class Query(graphene.ObjectType):
-    edge_nodes = graphene.List(EdgeNodeType)
-    node_logs = graphene.List(APIRequestLogType, node_id=graphene.ID())
-    node_performance = graphene.Field(EdgeNodePerformanceType, node_id=graphene.ID(required=True))
+    edge_nodes = graphene.List(EdgeNodeType, first=graphene.Int(), after=graphene.ID())
+    node_logs = graphene.Field(
+        APIRequestLogConnection,
+        node_id=graphene.ID(),
+        first=graphene.Int(),
+        after=graphene.String()
+    )
+    node_performance = graphene.Field(
+        EdgeNodePerformanceType,
+        node_id=graphene.ID(required=True),
+        since=graphene.DateTime(),
+        until=graphene.DateTime()
+    )
 
-    def resolve_edge_nodes(self, info):
-        return EdgeNode.objects.all()
+    def resolve_edge_nodes(self, info, first=None, after=None):
+        nodes = EdgeNode.objects.order_by('id')
+        if after:
+            nodes = nodes.filter(id__gt=after)
+        nodes = list(nodes[:page_size(first)])
+        loaders = get_loaders(info.context)
+        for node in nodes:
+            loaders.edge_nodes.prime(node.pk, node)
+        loaders.note_nodes(node.pk for node in nodes)
+        return nodes
 
-    def resolve_node_logs(self, info, node_id=None):
+    def resolve_node_logs(self, info, node_id=None, first=None, after=None):
+        """Newest-first keyset pagination over (request_time, id), read a time window at a time."""
+        first = page_size(first)
+        logs = APIRequestLog.objects.order_by('-request_time', '-id')
         if node_id:
-            return APIRequestLog.objects.filter(edge_node__id=node_id)
-        return APIRequestLog.objects.all()
+            logs = logs.filter(edge_node_id=node_id)
+        until = None
+        if after:
+            request_time, log_id = decode_cursor(after, parse_datetime, int)
+            logs = logs.filter(Q(request_time__lt=request_time) | Q(request_time=request_time, id__lt=log_id))
+            until = request_time + timedelta(microseconds=1)
+        page = []
+        for lower, upper in time_windows(logs, until):
+            page += in_window(logs, lower, upper)[:first + 1 - len(page)]
+            if len(page) > first:
+                break
+        has_next = len(page) > first
+        page = page[:first]
+        get_loaders(info.context).edge_nodes.enqueue({log.edge_node_id for log in page})
+        edges = [
+            APIRequestLogConnection.Edge(node=log, cursor=encode_cursor(log.request_time.isoformat(), log.pk))
+            for log in page
+        ]
+        return APIRequestLogConnection(
+            edges=edges,
+            page_info=graphene.relay.PageInfo(
+                has_next_page=has_next,
+                has_previous_page=bool(after),
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+            ),
+        )
 
-    def resolve_node_performance(self, info, node_id):
+    def resolve_node_performance(self, info, node_id, since=None, until=None):
         try:
             node = EdgeNode.objects.get(pk=node_id)
         except EdgeNode.DoesNotExist:
             raise GraphQLError("EdgeNode not found.")
-        logs = APIRequestLog.objects.filter(edge_node=node)
-        avg_response = logs.aggregate(Avg('response_time_ms'))['response_time_ms__avg'] or 0
-        total = logs.count()
-        return EdgeNodePerformanceType(node=node, avg_response_time=avg_response, total_requests=total)
+        return EdgeNodePerformanceType(node=node, **node_performance(node.pk, since=since, until=until))
 
 
 class RegisterEdgeNode(graphene.Mutation):
@@ -77,6 +164,8 @@ class HealthCheckEdgeNode(graphene.Mutation):
         except EdgeNode.DoesNotExist:
             raise GraphQLError("EdgeNode not found.")
         node.status = status
+        node.health_streak = 0
+        node.last_health_check = timezone.now()
         node.save()
         return HealthCheckEdgeNode(edge_node=node)
 
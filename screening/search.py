@@ -0,0 +1,250 @@
+"""
+Ranked full-text and fuzzy search over applicants, resumes and jobs.
+
+Every searchable object has one SearchEntry row holding its text in three
+weighted parts:
+
+* ``title``: applicant name (for resumes, the owner's name) or job title;
+* ``keywords``: skills, and for jobs the location and recruiter;
+* ``body``: resume text or job description.
+
+Signal handlers (``screening.signals``) and the parsing pipeline upsert the
+entries of the objects they change, so the index is maintained
+incrementally; ``rebuild_search_index`` rewrites it after bulk writes.
+
+On PostgreSQL the table carries two generated columns maintained by the
+database on every write (see POSTGRES_SCHEMA): ``document``, a weighted
+tsvector with a GIN index, and ``fuzzy``, the lower-cased title and
+keywords with a trigram GIN index.  A query matches rows whose document
+matches ``websearch_to_tsquery`` (quoted phrases, ``or``, ``-term``) or
+whose fuzzy text is word-similar to the query, which catches typos in
+names, titles and skills.  Every match is ranked by ``ts_rank_cd`` plus
+the trigram word similarity and the best ``offset + limit`` are kept (a
+top-N sort, so memory stays bounded by ``MAX_OFFSET``), with the entry id
+breaking ties so that pages do not repeat or skip rows between requests.
+A very broad query therefore costs a pass over all of its matches.
+
+Other databases (SQLite in development and tests) use ``_search_python``,
+which scans the entries of the requested kinds and applies the same rules
+in Python: every query word must occur in the text, or the query must be
+word-similar (by pg_trgm's trigram definition) to the title and keywords.
+It is meant for local use, not for large tables.
+"""
+import heapq
+import re
+
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import SearchEntry
+
+DEFAULT_SEARCH_SETTINGS = {
+    "PAGE_SIZE": 20,
+    "MAX_PAGE_SIZE": 100,
+    "MAX_OFFSET": 1000,
+}
+
+# pg_trgm's default pg_trgm.word_similarity_threshold, used by the ``<%`` operator.
+WORD_SIMILARITY_THRESHOLD = 0.6
+# ts_rank_cd default weights of the A (title), B (keywords) and C (body) parts.
+WEIGHTS = {"title": 1.0, "keywords": 0.4, "body": 0.2}
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+
+POSTGRES_SCHEMA = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    ALTER TABLE search_entry ADD COLUMN document tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', title), 'A') ||
+        setweight(to_tsvector('simple', keywords), 'B') ||
+        setweight(to_tsvector('simple', left(body, 100000)), 'C')
+    ) STORED
+    """,
+    """
+    ALTER TABLE search_entry ADD COLUMN fuzzy text GENERATED ALWAYS AS (
+        lower(title || ' ' || left(keywords, 500))
+    ) STORED
+    """,
+    "CREATE INDEX search_entry_document ON search_entry USING GIN (document)",
+    "CREATE INDEX search_entry_fuzzy ON search_entry USING GIN (fuzzy gin_trgm_ops)",
+]
+POSTGRES_SCHEMA_REVERSE = [
+    "ALTER TABLE search_entry DROP COLUMN IF EXISTS fuzzy",
+    "ALTER TABLE search_entry DROP COLUMN IF EXISTS document",
+]
+
+POSTGRES_QUERY = """
+    SELECT id, kind, object_id, title, rank FROM (
+        SELECT id, kind, object_id, title,
+               ts_rank_cd(document, websearch_to_tsquery('simple', %s), 32) + word_similarity(%s, fuzzy) AS rank
+        FROM search_entry
+        WHERE kind = ANY(%s) AND (document @@ websearch_to_tsquery('simple', %s) OR %s <%% fuzzy)
+    ) ranked
+    ORDER BY rank DESC, id
+    LIMIT %s OFFSET %s
+"""
+
+# Where the text of each kind comes from: (app model, values_list fields, entry builder).
+SOURCES = {
+    SearchEntry.APPLICANT: (
+        "Applicant", ("pk", "full_name", "skills"),
+        lambda pk, name, skills: (pk, name, skills, ""),
+    ),
+    SearchEntry.RESUME: (
+        "Resume", ("pk", "applicant__full_name", "extracted_skills", "parsed_text"),
+        lambda pk, name, skills, text: (pk, name or "", skills, text),
+    ),
+    SearchEntry.JOB: (
+        "Job", ("pk", "title", "required_skills", "location", "recruiter", "description"),
+        lambda pk, title, skills, location, recruiter, description: (
+            pk, title, f"{skills}, {location}, {recruiter}", description
+        ),
+    ),
+}
+
+
+def search_settings():
+    return {**DEFAULT_SEARCH_SETTINGS, **getattr(settings, "SEARCH", {})}
+
+
+# Index maintenance
+
+
+def index_rows(kind, rows, entry_model=SearchEntry):
+    """Upsert the entries of ``kind`` for values_list rows in SOURCES[kind] field order."""
+    build = SOURCES[kind][2]
+    now = timezone.now()
+    entries = []
+    for row in rows:
+        object_id, title, keywords, body = build(*row)
+        entries.append(entry_model(kind=kind, object_id=object_id, title=(title or "")[:190],
+                                   keywords=keywords or "", body=body or "", updated_at=now))
+    entry_model.objects.bulk_create(
+        entries, batch_size=500, update_conflicts=True, unique_fields=["kind", "object_id"],
+        update_fields=["title", "keywords", "body", "updated_at"],
+    )
+    return len(entries)
+
+
+def index_objects(kind, ids):
+    """Refresh the entries of ``kind`` for ``ids``, dropping those whose object no longer exists."""
+    ids = list(ids)
+    if not ids:
+        return
+    model_name, fields, _ = SOURCES[kind]
+    rows = list(django_apps.get_model("screening", model_name).objects.filter(pk__in=ids).values_list(*fields))
+    index_rows(kind, rows)
+    found = {row[0] for row in rows}
+    remove_objects(kind, [pk for pk in ids if pk not in found])
+
+
+def remove_objects(kind, ids):
+    SearchEntry.objects.filter(kind=kind, object_id__in=list(ids)).delete()
+
+
+def rebuild_search_index(batch_size=2000, get_model=django_apps.get_model):
+    """
+    Re-index every applicant, resume and job.
+    Args:
+        get_model (callable): Model lookup, so migrations can pass their historical ``apps.get_model``.
+    Returns:
+        int: Number of entries written.
+    """
+    entry_model = get_model("screening", "SearchEntry")
+    written = 0
+    for kind, (model_name, fields, _) in SOURCES.items():
+        queryset = get_model("screening", model_name).objects.order_by("pk")
+        entry_model.objects.filter(kind=kind).exclude(object_id__in=queryset.values("pk")).delete()
+        last_pk = 0
+        while True:
+            rows = list(queryset.filter(pk__gt=last_pk).values_list(*fields)[:batch_size])
+            if not rows:
+                break
+            written += index_rows(kind, rows, entry_model)
+            last_pk = rows[-1][0]
+    return written
+
+
+# Queries
+
+
+def search(query, kinds=None, limit=20, offset=0):
+    """
+    Ranked search over the entries of ``kinds`` (all kinds by default).
+    Returns:
+        list: (kind, object id, title, rank) tuples, best first.
+    """
+    kinds = list(kinds or SOURCES)
+    if not TOKEN_RE.findall((query or "").lower()):
+        return []
+    if connection.vendor == "postgresql":
+        return _search_postgres(query, kinds, limit, offset)
+    return _search_python(query, kinds, limit, offset)
+
+
+def _search_postgres(query, kinds, limit, offset):
+    params = [query, query, kinds, query, query, limit, offset]
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRES_QUERY, params)
+        return [(kind, object_id, title, float(rank)) for _, kind, object_id, title, rank in cursor.fetchall()]
+
+
+def trigrams(word):
+    """pg_trgm trigrams of one word: padded with two spaces in front and one behind."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def word_similarity(query, text):
+    """
+    Approximation of pg_trgm word_similarity(query, text): for each query word, the
+    best share of its trigrams found in one word of ``text``, averaged over the query.
+    """
+    words = TOKEN_RE.findall(query.lower())
+    candidates = [trigrams(word) for word in set(TOKEN_RE.findall(text.lower()))]
+    if not words or not candidates:
+        return 0.0
+    total = 0.0
+    for word in words:
+        wanted = trigrams(word)
+        total += max(len(wanted & candidate) for candidate in candidates) / len(wanted)
+    return total / len(words)
+
+
+def _text_rank(words, title, keywords, body):
+    """ts_rank_cd-like rank when every word occurs in some part of the entry, else None."""
+    parts = {"title": title, "keywords": keywords, "body": body}
+    tokens = {}
+    rank = 0.0
+    for word in words:
+        weight = None
+        for name, weight_of_part in WEIGHTS.items():
+            text = parts[name]
+            # Substring test first: tokenising long resume bodies is the expensive part.
+            if word not in text:
+                continue
+            if name not in tokens:
+                tokens[name] = set(TOKEN_RE.findall(text))
+            if word in tokens[name]:
+                weight = weight_of_part
+                break
+        if weight is None:
+            return None
+        rank += weight
+    return rank / (rank + 1)
+
+
+def _search_python(query, kinds, limit, offset):
+    words = TOKEN_RE.findall(query.lower())
+    scored = []
+    entries = SearchEntry.objects.filter(kind__in=kinds).values_list("id", "kind", "object_id", "title", "keywords",
+                                                                     "body")
+    for entry_id, kind, object_id, title, keywords, body in entries.iterator():
+        text_rank = _text_rank(words, title.lower(), keywords.lower(), body.lower())
+        similarity = word_similarity(query, f"{title} {keywords[:500]}")
+        if text_rank is None and similarity < WORD_SIMILARITY_THRESHOLD:
+            continue
+        scored.append((-((text_rank or 0.0) + similarity), entry_id, kind, object_id, title))
+    best = heapq.nsmallest(offset + limit, scored)[offset:]
+    return [(kind, object_id, title, -rank) for rank, _, kind, object_id, title in best]
@@ -1,73 +1,110 @@
+from django.core.validators import EmailValidator
 from rest_framework import serializers
 from .models import (
     Applicant, Job, Resume, Interview,
     ScreeningQuestion, ScreeningAnswer, Feedback,
-    Notification, JobApplication
+    Notification, JobApplication, JobMatch
 )
 from rest_framework import serializers
-from .models import EdgeNode, APIRequestLog
+from .models import EdgeNode, APIRequestLog, select_str_related
 
-class EdgeNodeSerializer(serializers.ModelSerializer):
+
+class ScreeningModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer whose related field choices select what their __str__ reads (see models.STR_RELATED).
+    ``fields`` restricts the output to those field names (see screening.projection).
+    """
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def build_relational_field(self, field_name, relation_info):
+        field_class, field_kwargs = super().build_relational_field(field_name, relation_info)
+        if 'queryset' in field_kwargs:
+            field_kwargs['queryset'] = select_str_related(field_kwargs['queryset'])
+        return field_class, field_kwargs
+
+class EdgeNodeSerializer(ScreeningModelSerializer):
     class Meta:
         model = EdgeNode
         fields = '__all__'
 
-class APIRequestLogSerializer(serializers.ModelSerializer):
+class APIRequestLogSerializer(ScreeningModelSerializer):
     class Meta:
         model = APIRequestLog
         fields = '__all__'
 
-class ApplicantSerializer(serializers.ModelSerializer):
+class ApplicantSerializer(ScreeningModelSerializer):
     class Meta:
         model = Applicant
         fields = ['id', 'user', 'full_name', 'email', 'phone_number', 'skills', 'linkedin_profile','user_id']
         read_only_fields = ['user']
+        list_deferred_fields = ['skills']
 
-class JobSerializer(serializers.ModelSerializer):
+class ApplicantImportSerializer(ScreeningModelSerializer):
+    """One row of a bulk applicant import; existing emails are updated, not rejected."""
+    class Meta:
+        model = Applicant
+        fields = ['full_name', 'email', 'birthdate', 'phone_number', 'skills', 'linkedin_profile']
+        extra_kwargs = {'email': {'validators': [EmailValidator()]}}
+
+class JobSerializer(ScreeningModelSerializer):
     class Meta:
         model = Job
         fields = ['id', 'recruiter', 'title', 'description', 'required_skills', 'location', 'salary_range']
+        list_deferred_fields = ['description']
 
-class ResumeSerializer(serializers.ModelSerializer):
+class ResumeSerializer(ScreeningModelSerializer):
     class Meta:
         model = Resume
         fields = ['id', 'applicant', 'file', 'parsed_text', 'extracted_skills', 'ai_score']
         read_only_fields = ['applicant', 'parsed_text', 'extracted_skills', 'ai_score']
+        list_deferred_fields = ['parsed_text']
+
+class JobMatchSerializer(ScreeningModelSerializer):
+    applicant = serializers.IntegerField(source='resume.applicant_id', read_only=True)
+    applicant_name = serializers.CharField(source='resume.applicant.full_name', read_only=True)
+
+    class Meta:
+        model = JobMatch
+        fields = ['rank', 'score', 'resume', 'applicant', 'applicant_name']
 
-class InterviewSerializer(serializers.ModelSerializer):
+class InterviewSerializer(ScreeningModelSerializer):
     class Meta:
         model = Interview
         fields = ['id', 'job', 'applicant', 'date', 'time', 'mode', 'status', 'feedback']
 
-class ScreeningQuestionSerializer(serializers.ModelSerializer):
+class ScreeningQuestionSerializer(ScreeningModelSerializer):
     class Meta:
         model = ScreeningQuestion
         fields = ['id', 'job', 'question_text', 'answer_text']
 
-class ScreeningAnswerSerializer(serializers.ModelSerializer):
+class ScreeningAnswerSerializer(ScreeningModelSerializer):
     class Meta:
         model = ScreeningAnswer
         fields = ['id', 'question', 'applicant', 'answer_text']
 
-class FeedbackSerializer(serializers.ModelSerializer):
+class FeedbackSerializer(ScreeningModelSerializer):
     class Meta:
         model = Feedback
         fields = ['id', 'interview', 'reviewer', 'comments', 'rating']
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(ScreeningModelSerializer):
     class Meta:
         model = Notification
         fields = ['id', 'user', 'message', 'is_read', 'created_at']
         read_only_fields = ['user', 'created_at']
 
-class JobApplicationSerializer(serializers.ModelSerializer):
+class JobApplicationSerializer(ScreeningModelSerializer):
     class Meta:
         model = JobApplication
         fields = ['id', 'applicant', 'job', 'status']
         read_only_fields = ['applicant']
 
 
-class RecruiterSerializer(serializers.ModelSerializer):
+class RecruiterSerializer(ScreeningModelSerializer):
     class Meta:
         model = Applicant
         fields = ['id', 'user', 'full_name', 'email', 'phone_number', 'skills', 'linkedin_profile','user_id']
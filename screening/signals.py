@@ -0,0 +1,154 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .authentication import api_key_cache
+from .models import Applicant, EdgeNode, Job, JobMatch, Resume, SearchEntry
+from .rescoring import mark_dirty
+from .response_cache import invalidate, invalidate_applicants, invalidate_job_applicants, invalidate_jobs
+from .routing import node_index
+from .search import index_objects, remove_objects
+from .skills import index_applicant
+
+# Fields that feed the resume/job match scores.
+JOB_SCORING_FIELDS = {"title", "description", "required_skills"}
+RESUME_SCORING_FIELDS = {"parsed_text", "extracted_skills"}
+# Fields copied into SearchEntry rows (see screening.search.SOURCES).
+APPLICANT_SEARCH_FIELDS = {"full_name", "skills"}
+RESUME_SEARCH_FIELDS = {"applicant", "parsed_text", "extracted_skills"}
+JOB_SEARCH_FIELDS = {"title", "required_skills", "location", "recruiter", "description"}
+
+
+def _changed(created, update_fields, fields):
+    return created or update_fields is None or bool(fields & set(update_fields))
+
+
+def _after_commit(func, *args):
+    # Index writes wait for the save to commit, so a rollback leaves no entries behind.
+    transaction.on_commit(partial(func, *args))
+
+
+@receiver(pre_save, sender=EdgeNode)
+def remember_previous_api_key(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (update_fields is not None and "api_key" not in update_fields):
+        return
+    instance._previous_api_key = (
+        EdgeNode.objects.filter(pk=instance.pk).values_list("api_key", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=EdgeNode)
+def update_routing_index(sender, instance, **kwargs):
+    _after_commit(node_index.upsert, instance)
+    # Other processes rebuild their index once the change is visible to them.
+    transaction.on_commit(node_index.publish)
+    api_key_cache.invalidate(instance, getattr(instance, "_previous_api_key", None))
+
+
+@receiver(post_delete, sender=EdgeNode)
+def remove_from_routing_index(sender, instance, **kwargs):
+    _after_commit(node_index.discard, instance.pk)
+    transaction.on_commit(node_index.publish)
+    api_key_cache.invalidate(instance)
+
+
+@receiver(post_save, sender=Job)
+def rescore_job(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or JOB_SCORING_FIELDS & set(update_fields):
+        mark_dirty(jobs=[instance.pk])
+
+
+@receiver(pre_delete, sender=Job)
+def rescore_resumes_of_deleted_job(sender, instance, **kwargs):
+    mark_dirty(resumes=Resume.objects.filter(best_job=instance).values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Resume)
+def rescore_resume(sender, instance, created, update_fields=None, **kwargs):
+    if not (instance.parsed_text or instance.extracted_skills):
+        return
+    if created or update_fields is None or RESUME_SCORING_FIELDS & set(update_fields):
+        mark_dirty(resumes=[instance.pk])
+
+
+@receiver(pre_delete, sender=Resume)
+def rescore_jobs_of_deleted_resume(sender, instance, **kwargs):
+    # Rankings that lose this resume may no longer hold their full top K.
+    mark_dirty(jobs=JobMatch.objects.filter(resume=instance).values_list("job_id", flat=True))
+
+
+@receiver(post_save, sender=Applicant)
+def update_skill_index(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or "skills" in update_fields:
+        _after_commit(index_applicant, instance)
+
+
+@receiver(post_save, sender=Applicant)
+def update_applicant_search_entry(sender, instance, created, update_fields=None, **kwargs):
+    if _changed(created, update_fields, APPLICANT_SEARCH_FIELDS):
+        _after_commit(index_objects, SearchEntry.APPLICANT, [instance.pk])
+        if not created:
+            # Resume entries carry the applicant's name.
+            _after_commit(index_objects, SearchEntry.RESUME, instance.resumes.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Resume)
+def update_resume_search_entry(sender, instance, created, update_fields=None, **kwargs):
+    if _changed(created, update_fields, RESUME_SEARCH_FIELDS):
+        _after_commit(index_objects, SearchEntry.RESUME, [instance.pk])
+
+
+@receiver(post_save, sender=Job)
+def update_job_search_entry(sender, instance, created, update_fields=None, **kwargs):
+    if _changed(created, update_fields, JOB_SEARCH_FIELDS):
+        _after_commit(index_objects, SearchEntry.JOB, [instance.pk])
+
+
+@receiver(post_delete, sender=Applicant)
+@receiver(post_delete, sender=Resume)
+@receiver(post_delete, sender=Job)
+def remove_search_entry(sender, instance, **kwargs):
+    _after_commit(remove_objects, sender._meta.model_name, [instance.pk])
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_responses(sender, instance, **kwargs):
+    invalidate_jobs([instance.pk])
+
+
+@receiver(post_save, sender=Applicant)
+@receiver(pre_delete, sender=Applicant)
+def invalidate_applicant_responses(sender, instance, **kwargs):
+    # pre_delete: the job links are still there to say which lists showed the applicant.
+    invalidate_applicants([instance.pk])
+
+
+@receiver(pre_save, sender=Resume)
+def remember_previous_applicant(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (update_fields is not None and "applicant" not in update_fields):
+        return
+    instance._previous_applicant_id = (
+        Resume.objects.filter(pk=instance.pk).values_list("applicant_id", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Resume)
+@receiver(post_delete, sender=Resume)
+def invalidate_resume_responses(sender, instance, **kwargs):
+    applicant_ids = {instance.applicant_id, getattr(instance, "_previous_applicant_id", None)} - {None}
+    invalidate(f"applicant:{pk}" for pk in applicant_ids)
+
+
+@receiver(m2m_changed, sender=Job.applicants.through)
+def invalidate_job_applicant_responses(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        invalidate_job_applicants([instance.pk])
+    elif action == "pre_clear":
+        invalidate_job_applicants(instance.applied_jobs.values_list("pk", flat=True))
+    else:
+        invalidate_job_applicants(pk_set)
@@ -0,0 +1,66 @@
+"""
+Mergeable latency sketch.
+
+Values are counted in logarithmic buckets so that any quantile is returned
+within ``alpha`` relative error, whatever the distribution.  Two sketches
+with the same ``alpha`` merge by adding bucket counts, which lets per-minute
+rollups be combined into arbitrary time windows.
+"""
+import math
+
+DEFAULT_ALPHA = 0.01
+
+# Values at or below this (ms) are counted in a dedicated zero bucket.
+MIN_VALUE = 1e-3
+
+
+class LatencySketch:
+    def __init__(self, alpha=DEFAULT_ALPHA):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value, count=1):
+        if value <= MIN_VALUE:
+            self.zero_count += count
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.count += count
+
+    def merge(self, other):
+        if other.alpha != self.alpha:
+            raise ValueError("Cannot merge sketches with different relative accuracy.")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        """Return the estimated ``q`` quantile (0 <= q <= 1), or None if the sketch is empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def to_dict(self):
+        return {"alpha": self.alpha, "zero": self.zero_count, "bins": {str(k): v for k, v in self.bins.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(alpha=data.get("alpha", DEFAULT_ALPHA))
+        sketch.bins = {int(k): v for k, v in data.get("bins", {}).items()}
+        sketch.zero_count = data.get("zero", 0)
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
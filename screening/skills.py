@@ -0,0 +1,114 @@
+"""
+Inverted index over ``Applicant.skills``.
+
+``Applicant.skills`` is free text, conventionally a comma-separated list
+("Python, Django developer, AWS").  Filtering it with ``icontains`` scans
+every row; instead each applicant's skills are broken into normalised terms
+and stored in the ApplicantSkill table, whose (skill, applicant) index
+answers a skill lookup with an index range scan.
+
+The terms of a comma-separated entry are the whole phrase plus each of its
+words, so "Django developer" is found by "django developer", "django" and
+"developer".  Matching is on whole terms, case-insensitively, which is what
+the ``icontains`` filters were used for ("java" no longer matches
+"javascript").
+
+The index is kept up to date by the Applicant ``post_save`` signal (see
+``screening.signals``); ``rebuild_skill_index`` refreshes it after bulk
+writes that bypass signals.
+"""
+import re
+
+from django.db import transaction
+from django.db.models import Count, Value
+
+from .models import Applicant, ApplicantSkill
+
+# Same token rules as screening.parsing, so "c++", "node.js" and "ci/cd" survive.
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+SEPARATOR_RE = re.compile(r"[,;\n|]")
+MAX_TERM_LENGTH = 100
+
+
+def normalize_skill(skill):
+    """Lower-cased tokens of ``skill`` joined by single spaces ('' if it has none)."""
+    return " ".join(TOKEN_RE.findall((skill or "").lower()))[:MAX_TERM_LENGTH]
+
+
+def skill_terms(skills):
+    """Index terms of a free-text skills field: each listed phrase and each of its words."""
+    terms = set()
+    for entry in SEPARATOR_RE.split(skills or ""):
+        phrase = normalize_skill(entry)
+        if phrase:
+            terms.add(phrase)
+            terms.update(word[:MAX_TERM_LENGTH] for word in phrase.split(" "))
+    return terms
+
+
+def parse_skill_query(query):
+    """Normalised, de-duplicated skills of a comma-separated query string."""
+    return list(dict.fromkeys(
+        skill for skill in (normalize_skill(part) for part in SEPARATOR_RE.split(query or "")) if skill
+    ))
+
+
+def index_applicant(applicant):
+    """Replace the ApplicantSkill rows of one applicant."""
+    terms = skill_terms(applicant.skills)
+    with transaction.atomic():
+        ApplicantSkill.objects.filter(applicant_id=applicant.pk).exclude(skill__in=terms).delete()
+        ApplicantSkill.objects.bulk_create(
+            [ApplicantSkill(applicant_id=applicant.pk, skill=term) for term in terms], ignore_conflicts=True
+        )
+
+
+def rebuild_skill_index(queryset=None, batch_size=5000):
+    """
+    Rebuild the index for ``queryset`` (every applicant by default).
+    Returns:
+        int: Number of ApplicantSkill rows written.
+    """
+    queryset = (Applicant.objects.all() if queryset is None else queryset).order_by("pk")
+    written = 0
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).values_list("pk", "skills")[:batch_size])
+        if not batch:
+            return written
+        rows = [ApplicantSkill(applicant_id=pk, skill=term) for pk, skills in batch for term in skill_terms(skills)]
+        with transaction.atomic():
+            ApplicantSkill.objects.filter(applicant_id__in=[pk for pk, _ in batch]).delete()
+            ApplicantSkill.objects.bulk_create(rows, batch_size=batch_size)
+        written += len(rows)
+        last_pk = batch[-1][0]
+
+
+def applicants_with_skills(skills, match="all", queryset=None):
+    """
+    Applicants having the given skills, best matches first.
+    Args:
+        skills (list | str): Skills, or a comma-separated string of them.
+        match (str): "all" to require every skill, "any" for at least one.
+        queryset (QuerySet): Applicants to search in; defaults to all of them.
+    Returns:
+        QuerySet: Applicants annotated with ``skill_matches`` (number of skills matched),
+        ordered by it, then by the model's default ordering.
+    """
+    if isinstance(skills, str):
+        skills = parse_skill_query(skills)
+    else:
+        skills = list(dict.fromkeys(normalize_skill(skill) for skill in skills if normalize_skill(skill)))
+    if match not in ("all", "any"):
+        raise ValueError("match must be 'all' or 'any'.")
+    queryset = Applicant.objects.all() if queryset is None else queryset
+    if not skills:
+        return queryset.none()
+    if match == "all":
+        # Every hit matches every skill, so there is nothing to rank: one semi-join per skill
+        # keeps the default ordering usable for the first page without grouping all hits.
+        for skill in skills:
+            queryset = queryset.filter(pk__in=ApplicantSkill.objects.filter(skill=skill).values("applicant_id"))
+        return queryset.annotate(skill_matches=Value(len(skills))).order_by(*Applicant._meta.ordering, "pk")
+    applicants = queryset.filter(skill_index__skill__in=skills).annotate(skill_matches=Count("skill_index"))
+    return applicants.order_by("-skill_matches", *Applicant._meta.ordering, "pk")
@@ -1,10 +1,15 @@
 import os
 import requests
-import pickle
 from celery import shared_task
+from django.db import DatabaseError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 import subprocess
 import logging
 
+from .model_registry import ModelRegistry
+from .training import published_model_path, routing_features
+
 # )
 
 FLY_APP_NAME = os.environ.get("FLY_APP_NAME")
@@ -12,30 +17,152 @@ FLY_API_TOKEN = os.environ.get("FLY_API_TOKEN")
 FLY_API_URL = "https://api.fly.io/graphql"
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "model.pkl")
 
-# Load the AI model at import time (once)
-try:
-    with open(MODEL_PATH, "rb") as file:
-        ai_model = pickle.load(file)
-except Exception as e:
-    ai_model = None
-    logging.error(f"Failed to load AI model: {e}")
-
-
+# The AI model is loaded on first use and reloaded when model.pkl changes
+routing_model = ModelRegistry(MODEL_PATH)
+# The model trained from request logs (see screening.training), once one is published
+location_routing_model = ModelRegistry(published_model_path())
 
  # AI model used
 
 def predict_optimal_node(features):
     """
     Predict the optimal edge node based on input features using the AI model.
+    Concurrent callers are scored together in one batch.
     Args:
         features (list): A list of input features for prediction.
     Returns:
         str: Predicted optimal edge node.
     """
-    if ai_model is None:
+    if routing_model.get() is None:
+        raise RuntimeError("AI model not loaded")
+    return routing_model.predictor.predict(features)
+
+def predict_node_for_location(latitude, longitude, when=None):
+    """
+    Predict the fastest edge node for a client location with the model trained from request logs.
+    Args:
+        latitude (float): Client latitude.
+        longitude (float): Client longitude.
+        when (datetime): Time of the request; defaults to now.
+    Returns:
+        str: Predicted edge node name.
+    """
+    if location_routing_model.get() is None:
+        raise RuntimeError("Routing model not trained yet")
+    features = routing_features(latitude, longitude, when or timezone.now())
+    return location_routing_model.predictor.predict(features)
+
+def predict_optimal_nodes(samples):
+    """
+    Predict the optimal edge node for many feature vectors in one vectorized call.
+    Args:
+        samples (list): A list of feature lists.
+    Returns:
+        list: Predicted optimal edge node for each sample.
+    """
+    loaded = routing_model.get()
+    if loaded is None:
         raise RuntimeError("AI model not loaded")
-    prediction = ai_model.predict([features])
-    return prediction[0]
+    return list(loaded.compiled.predict(samples))
+
+@shared_task(autoretry_for=(DatabaseError,), retry_backoff=True, max_retries=10)
+def persist_api_request_logs(rows):
+    """
+    Write API request logs that the in-process buffer could not flush.
+    Args:
+        rows (list): Serialized APIRequestLog field values (see screening.logsink).
+    Returns:
+        int: Number of rows written.
+    """
+    from .logsink import write_rows
+    for row in rows:
+        row["request_time"] = parse_datetime(row["request_time"])
+    write_rows(rows)
+    return len(rows)
+
+@shared_task
+def rollup_api_request_logs(max_rows=50000, max_batches=20):
+    """
+    Fold new APIRequestLog rows into NodePerformanceRollup buckets.
+    Args:
+        max_rows (int): Log rows read per batch.
+        max_batches (int): Upper bound on batches per run, to keep runs short.
+    Returns:
+        int: Number of log rows processed.
+    """
+    from .rollups import roll_up_logs
+    processed = 0
+    for _ in range(max_batches):
+        batch = roll_up_logs(max_rows)
+        processed += batch
+        if batch < max_rows:
+            break
+    return processed
+
+@shared_task
+def manage_api_request_log_partitions():
+    """
+    Create upcoming APIRequestLog partitions and drop the expired ones once rolled up,
+    and forget expired bulk ingestion keys.
+    Returns:
+        dict: Partition summary (see screening.partitions.manage_log_partitions) and
+        the number of ingestion keys deleted.
+    """
+    from .ingest import prune_ingest_batches
+    from .partitions import manage_log_partitions
+    return {**manage_log_partitions(), "ingest_keys_deleted": prune_ingest_batches()}
+
+@shared_task
+def retrain_routing_model(chunk_size=10000, epochs=1, warm_start=True):
+    """
+    Continue training the routing model on new APIRequestLog rows and publish it.
+    Returns:
+        dict: Training summary (see screening.training.train_routing_model).
+    """
+    from .training import train_routing_model
+    return train_routing_model(chunk_size=chunk_size, epochs=epochs, warm_start=warm_start)
+
+@shared_task
+def probe_edge_nodes():
+    """
+    Actively health-check every edge node and update its status.
+    Returns:
+        dict: Probe summary (see screening.health.check_edge_nodes).
+    """
+    from .health import check_edge_nodes
+    return check_edge_nodes()
+
+@shared_task
+def parse_resumes(resume_ids=None):
+    """
+    Extract text and skills from uploaded resume files.
+    Args:
+        resume_ids (list): Resumes to parse; defaults to every resume without parsed text.
+    Returns:
+        dict: Counts of parsed and failed resumes.
+    """
+    from .parsing import parse_stored_resumes
+    return parse_stored_resumes(resume_ids)
+
+@shared_task
+def score_resumes():
+    """
+    Recompute Resume.ai_score and the best candidates of every job.
+    Returns:
+        dict: Scoring summary (see screening.matching.score_resumes).
+    """
+    from .matching import score_resumes as run_scoring
+    return run_scoring()
+
+@shared_task
+def rescore_matches():
+    """
+    Re-score the jobs and resumes queued since the last run (coalesced, see screening.rescoring).
+    Returns:
+        dict: Numbers of jobs, resumes and (resume, job) pairs re-scored.
+    """
+    from .rescoring import rescore_pending
+    return rescore_pending()
 
 @shared_task
 def deploy_to_flyio(app_name, image_tag):
@@ -72,18 +199,24 @@ def deploy_code_with_ai_routing(deployment_payload: dict, features: list):
 
     Args:
         deployment_payload (dict): Payload containing deployment details.
-        features (list): Features for AI model to predict optimal edge node.
+        features (list | dict): Features for AI model to predict optimal edge node, or the
+            client's {"latitude", "longitude"} for the model trained from request logs.
 
     Returns:
         dict: Response from Fly.io API.
     """
     if FLY_API_TOKEN is None or FLY_APP_NAME is None:
         return {"error": "Missing FLY_API_TOKEN or FLY_APP_NAME environment variable."}
-    if ai_model is None:
-        return {"error": "AI model not loaded."}
+    if isinstance(features, dict):
+        if location_routing_model.get() is None:
+            return {"error": "Routing model not trained yet."}
+        optimal_node = predict_node_for_location(features["latitude"], features["longitude"])
+    else:
+        if routing_model.get() is None:
+            return {"error": "AI model not loaded."}
 
-    # Predict the optimal edge node
-    optimal_node = predict_optimal_node(features)
+        # Predict the optimal edge node
+        optimal_node = predict_optimal_node(features)
 
     # Add the optimal node to deployment payload (adjust this to match Fly API schema)
     deployment_payload.setdefault("config", {})["optimal_node"] = optimal_node
@@ -1,6 +1,66 @@
-from django.test import TestCase, Client
-from .models import EdgeNode, APIRequestLog
-from django.core.exceptions import ValidationError
+import csv
+import datetime
+import gzip
+import hashlib
+import io
+import json
+import os
+import pickle
+import random
+import socket
+import tempfile
+import threading
+import time
+import unittest
+import zipfile
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import timedelta
+from unittest import mock
+
+import numpy as np
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from . import matching, tasks
+from .health import ProbeTarget, check_edge_nodes, probe_targets
+from .matching import JobSpace, TopK, job_document, job_space, matching_settings, score_resumes, vectorize
+from .bulk_import import import_rows, import_stream
+from .fast_serializers import RowEncoder, row_encoder
+from .urls import router
+from .search import rebuild_search_index, search, word_similarity
+from .skills import applicants_with_skills, rebuild_skill_index, skill_terms
+from .rescoring import mark_dirty, rescore_pending, RESCORE_SCHEDULED_KEY
+from .response_cache import check_shared_cache, invalidate_resumes
+from .ingest import copy_buffer, parse_records, validate_records
+from .partitions import (
+    interval_start, is_partitioned, list_partitions, manage_log_partitions, next_interval, plan_partitions,
+)
+from .parsing import (
+    ResumeParseError, extract_skills, extract_text, parse_stored_resumes, skill_vocabulary, time_limit,
+)
+from .inference import BatchPredictor, CompiledForest
+from .model_registry import ModelRegistry
+from .schema import encode_cursor
+from .training import published_model_path, routing_features, train_routing_model
+from .authentication import api_key_cache, get_edge_node_for_key
+from .logsink import APIRequestLogBuffer
+from .middleware import endpoint_timings
+from .models import (
+    EdgeNode, APIRequestLog, LogIngestBatch, NodePerformanceRollup, Applicant, ApplicantSkill, Interview, Job, JobMatch,
+    Feedback, JobApplication, Notification, PendingRescore, Resume, ResumeContent, ScreeningAnswer,
+    ScreeningQuestion, SearchEntry,
+)
+from .rollups import roll_up_logs
+from .sketch import LatencySketch
+from .routing import NodeIndex, NodeLocation, haversine_km, node_index
+from django.core.exceptions import ImproperlyConfigured, ValidationError
 
 class GraphQLTestCase(TestCase):
     def setUp(self):
@@ -87,4 +147,2021 @@ class APIRequestLogModelTest(TestCase):
         self.assertEqual(log.edge_node, edge_node)
         self.assertEqual(log.status_code, 201)
         self.assertAlmostEqual(log.response_time_ms, 123.4)
-        self.assertEqual(log.client_ip, "127.0.0.1")
\ No newline at end of file
+        self.assertEqual(log.client_ip, "127.0.0.1")
+
+class NodeIndexTest(TestCase):
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(7)
+        locations = [
+            NodeLocation(pk, f"node-{pk}", "127.0.0.1", rng.uniform(-90, 90), rng.uniform(-180, 180))
+            for pk in range(2000)
+        ]
+        index = NodeIndex(ttl=3600)
+        index.rebuild(locations)
+        for _ in range(50):
+            lat, lng = rng.uniform(-90, 90), rng.uniform(-180, 180)
+            expected = sorted(locations, key=lambda loc: haversine_km(lat, lng, loc.latitude, loc.longitude))[:5]
+            result = index.nearest(lat, lng, k=5)
+            self.assertEqual([loc.pk for loc, _ in result], [loc.pk for loc in expected])
+            self.assertAlmostEqual(
+                result[0][1], haversine_km(lat, lng, expected[0].latitude, expected[0].longitude), places=6
+            )
+
+    def test_incremental_updates(self):
+        index = NodeIndex(ttl=3600)
+        index.rebuild([])
+        node = EdgeNode(pk=1, name="Paris", ip_address="10.0.0.1", latitude=48.85, longitude=2.35, status="healthy")
+        index.upsert(node)
+        self.assertEqual(index.nearest(48.0, 2.0)[0][0].name, "Paris")
+        node.status = "unhealthy"
+        index.upsert(node)
+        self.assertEqual(index.nearest(48.0, 2.0), [])
+
+    def test_rolled_back_saves_leave_the_index_alone(self):
+        node_index.rebuild([])
+        self.addCleanup(node_index.invalidate)
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(DatabaseError), transaction.atomic():
+                EdgeNode.objects.create(name="Nice", ip_address="10.0.0.4", latitude=43.7, longitude=7.26)
+                raise DatabaseError
+        self.assertEqual(len(node_index), 0)
+        with self.captureOnCommitCallbacks() as callbacks:
+            EdgeNode.objects.create(name="Nice", ip_address="10.0.0.4", latitude=43.7, longitude=7.26)
+        self.assertEqual(len(node_index), 0)
+        callbacks[0]()
+        self.assertEqual(len(node_index), 1)
+
+    @override_settings(EDGE_ROUTING_VERSION_CHECK_INTERVAL=0)
+    def test_published_changes_reach_other_indexes(self):
+        node = EdgeNode.objects.create(name="Lyon", ip_address="10.0.0.3", latitude=45.76, longitude=4.84)
+        index = NodeIndex(ttl=3600)
+        self.assertEqual(index.nearest(45.0, 4.0)[0][0].name, "Lyon")
+        EdgeNode.objects.filter(pk=node.pk).update(status="unhealthy")
+        self.assertEqual(len(index.nearest(45.0, 4.0)), 1)
+        # Another process (here another index) publishes the change.
+        NodeIndex().publish()
+        self.assertEqual(index.nearest(45.0, 4.0), [])
+
+
+@override_settings(API_REQUEST_LOG_BUFFER={"ENABLED": False})
+class RequestRoutingViewTest(TestCase):
+    def setUp(self):
+        node_index.invalidate()
+        api_key_cache.clear()
+        self.caller = EdgeNode.objects.create(
+            name="Caller", latitude=0.0, longitude=0.0, status="unhealthy", ip_address="10.0.0.9"
+        )
+        EdgeNode.objects.create(name="Tunis", latitude=36.8, longitude=10.18, status="healthy", ip_address="10.0.0.1")
+        EdgeNode.objects.create(name="Tokyo", latitude=35.68, longitude=139.69, status="healthy", ip_address="10.0.0.2")
+
+    def route(self, payload):
+        return Client().post(
+            "/route-request/", data=payload, content_type="application/json", HTTP_X_API_KEY=self.caller.api_key
+        )
+
+    def test_routes_to_nearest_healthy_node(self):
+        response = self.route({"latitude": 34.0, "longitude": 135.0})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["routed_to"], "Tokyo")
+        log = APIRequestLog.objects.get()
+        self.assertEqual(log.edge_node.name, "Tokyo")
+        self.assertEqual((log.latitude, log.longitude), (34.0, 135.0))
+        self.assertGreater(log.response_time_ms, 0)
+        self.assertIsNotNone(log.db_time_ms)
+        self.assertNotIn("Server-Timing", response)
+
+    def test_skips_node_marked_unhealthy(self):
+        tokyo = EdgeNode.objects.get(name="Tokyo")
+        tokyo.status = "unhealthy"
+        tokyo.save()
+        response = self.route({"latitude": 34.0, "longitude": 135.0})
+        self.assertEqual(response.json()["routed_to"], "Tunis")
+
+    def test_defaults_to_caller_location(self):
+        self.caller.latitude, self.caller.longitude = 40.0, 12.0
+        self.caller.save()
+        self.assertEqual(self.route({}).json()["routed_to"], "Tunis")
+
+    def test_rejects_invalid_coordinates(self):
+        self.assertEqual(self.route({"latitude": 120, "longitude": 0}).status_code, 400)
+
+
+@override_settings(API_REQUEST_LOG_BUFFER={"ENABLED": True, "BATCH_SIZE": 3, "MAX_SIZE": 5, "FLUSH_INTERVAL": None})
+class APIRequestLogBufferTest(TestCase):
+    def setUp(self):
+        self.node = EdgeNode.objects.create(
+            name="Buffered", latitude=0.0, longitude=0.0, status="healthy", ip_address="127.0.0.1"
+        )
+        self.buffer = APIRequestLogBuffer()
+
+    def submit(self):
+        self.buffer.submit(
+            edge_node_id=self.node.pk, response_time_ms=1.0, latitude=0.0, longitude=0.0,
+            status_code=200, client_ip="127.0.0.1",
+        )
+
+    def test_flushes_on_batch_size(self):
+        self.submit()
+        self.submit()
+        self.assertEqual(APIRequestLog.objects.count(), 0)
+        self.submit()
+        self.assertEqual(APIRequestLog.objects.count(), 3)
+
+    def test_explicit_flush_writes_pending_rows(self):
+        self.submit()
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(APIRequestLog.objects.get().edge_node, self.node)
+
+    def test_database_errors_defer_to_celery(self):
+        self.submit()
+        with mock.patch("screening.logsink.write_rows", side_effect=DatabaseError), \
+                mock.patch("screening.tasks.persist_api_request_logs.delay") as delay, \
+                self.assertLogs("screening.logsink", "ERROR"):
+            self.buffer.flush()
+        rows = delay.call_args.args[0]
+        self.assertEqual(len(rows), 1)
+        self.assertIsInstance(rows[0]["request_time"], str)
+
+
+class TimingMetricsViewTest(TestCase):
+    def setUp(self):
+        endpoint_timings.reset()
+
+    def test_requires_admin(self):
+        self.assertEqual(Client().get("/metrics/timings/").status_code, 403)
+
+    def test_reports_per_endpoint_histograms(self):
+        client = Client()
+        client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+        client.get("/jobs/")
+        data = client.get("/metrics/timings/").json()
+        self.assertEqual(data["GET screening:job-list"]["wall_ms"]["count"], 1)
+        self.assertEqual(sum(data["GET screening:job-list"]["db_ms"]["buckets"].values()), 1)
+
+    def test_server_timing_is_sent_to_staff_only(self):
+        self.assertNotIn("Server-Timing", Client().get("/jobs/"))
+        client = Client()
+        client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+        self.assertRegex(client.get("/jobs/")["Server-Timing"], r"^app;dur=[\d.]+, db;dur=[\d.]+$")
+        with override_settings(DEBUG=True):
+            self.assertIn("Server-Timing", Client().get("/jobs/"))
+
+    def test_streaming_responses_are_timed_when_closed(self):
+        client = Client()
+        client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+        Applicant.objects.create(full_name="Ada", email="ada@example.com", phone_number="+33123456789")
+        endpoint_timings.reset()
+        response = client.get("/export/applicants/")
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(endpoint_timings.snapshot(), {})
+        with CaptureQueriesContext(connection) as queries:
+            b"".join(response.streaming_content)
+        response.close()
+        self.assertTrue(queries.captured_queries)
+        histograms = endpoint_timings.snapshot()["GET screening:export"]
+        self.assertEqual(histograms["wall_ms"]["count"], 1)
+        self.assertGreater(histograms["db_ms"]["sum"], 0)
+
+
+class LatencySketchTest(TestCase):
+    def test_quantiles_within_relative_error_after_merge(self):
+        values = [random.Random(3).lognormvariate(3, 1) for _ in range(5000)]
+        left, right = LatencySketch(), LatencySketch()
+        for i, value in enumerate(values):
+            (left if i % 2 else right).add(value)
+        merged = LatencySketch.from_dict(left.to_dict()).merge(right)
+        ordered = sorted(values)
+        for q in (0.5, 0.95, 0.99):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            self.assertLessEqual(abs(merged.quantile(q) - exact) / exact, 0.02)
+
+
+class NodePerformanceRollupTest(TestCase):
+    def setUp(self):
+        self.node = EdgeNode.objects.create(
+            name="Rolled", latitude=0.0, longitude=0.0, status="healthy", ip_address="127.0.0.1"
+        )
+        self.start = timezone.now().replace(second=0, microsecond=0) - timedelta(minutes=10)
+        APIRequestLog.objects.bulk_create([
+            APIRequestLog(
+                edge_node=self.node, request_time=self.start + timedelta(seconds=i * 20), response_time_ms=float(i + 1),
+                latitude=0.0, longitude=0.0, status_code=200, client_ip="127.0.0.1",
+            )
+            for i in range(9)
+        ])
+
+    def query(self, arguments=""):
+        response = Client().post(
+            "/graphql/",
+            data={"query": f"""
+                query {{
+                  nodePerformance(nodeId: {self.node.pk}{arguments}) {{
+                    totalRequests avgResponseTime minResponseTime maxResponseTime p50ResponseTime p99ResponseTime
+                  }}
+                }}
+            """},
+            content_type="application/json",
+        )
+        return response.json()["data"]["nodePerformance"]
+
+    def test_rollup_is_incremental(self):
+        self.assertEqual(roll_up_logs(), 9)
+        self.assertEqual(roll_up_logs(), 0)
+        self.assertEqual(NodePerformanceRollup.objects.count(), 3)
+        APIRequestLog.objects.create(
+            edge_node=self.node, request_time=timezone.now() - timedelta(minutes=5), response_time_ms=100.0,
+            latitude=0.0, longitude=0.0, status_code=200, client_ip="127.0.0.1",
+        )
+        self.assertEqual(roll_up_logs(), 1)
+        self.assertEqual(self.query()["totalRequests"], 10)
+
+    def test_rows_committed_late_with_lower_ids_are_rolled_up(self):
+        late_id = APIRequestLog.objects.order_by("-id").values_list("id", flat=True)[0] + 1
+        APIRequestLog.objects.create(
+            id=late_id + 1, edge_node=self.node, request_time=self.start, response_time_ms=1.0,
+            latitude=0.0, longitude=0.0, status_code=200, client_ip="127.0.0.1",
+        )
+        self.assertEqual(roll_up_logs(), 10)
+        # A buffer flush or bulk upload that took its id earlier commits after that run.
+        APIRequestLog.objects.create(
+            id=late_id, edge_node=self.node, request_time=self.start, response_time_ms=1.0,
+            latitude=0.0, longitude=0.0, status_code=200, client_ip="127.0.0.1",
+        )
+        self.assertEqual(roll_up_logs(), 1)
+        self.assertEqual(roll_up_logs(), 0)
+        self.assertEqual(self.query()["totalRequests"], 11)
+        self.assertFalse(APIRequestLog.objects.filter(rolled_up=False).exists())
+
+    def test_rollups_fold_rows_of_any_age(self):
+        APIRequestLog.objects.all().delete()
+        for offset in (timedelta(seconds=-1), timedelta(days=-2), timedelta(minutes=4)):
+            APIRequestLog.objects.create(
+                edge_node=self.node, request_time=timezone.now() + offset, response_time_ms=1.0,
+                latitude=0.0, longitude=0.0, status_code=200, client_ip="127.0.0.1",
+            )
+        self.assertEqual(roll_up_logs(max_rows=2), 2)
+        self.assertEqual(roll_up_logs(max_rows=2), 1)
+        self.assertEqual(roll_up_logs(), 0)
+        self.assertEqual(sum(NodePerformanceRollup.objects.values_list("request_count", flat=True)), 3)
+
+    def test_node_performance_reads_rollups(self):
+        roll_up_logs()
+        data = self.query()
+        self.assertEqual(data["totalRequests"], 9)
+        self.assertAlmostEqual(data["avgResponseTime"], 5.0)
+        self.assertEqual((data["minResponseTime"], data["maxResponseTime"]), (1.0, 9.0))
+        self.assertAlmostEqual(data["p50ResponseTime"], 5.0, delta=0.1)
+        since = (self.start + timedelta(minutes=2)).isoformat()
+        self.assertEqual(self.query(f', since: "{since}"')["totalRequests"], 3)
+
+
+class GraphQLPaginationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        nodes = EdgeNode.objects.bulk_create([
+            EdgeNode(name=f"node-{i}", latitude=0.0, longitude=0.0, ip_address="127.0.0.1", api_key=f"key-{i}")
+            for i in range(20)
+        ])
+        start = timezone.now() - timedelta(days=1)
+        APIRequestLog.objects.bulk_create([
+            APIRequestLog(
+                edge_node=nodes[i % 20], request_time=start + timedelta(seconds=i // 2), response_time_ms=1.0,
+                latitude=0.0, longitude=0.0, status_code=200, client_ip="127.0.0.1",
+            )
+            for i in range(1100)
+        ])
+
+    def query(self, query):
+        return Client().post("/graphql/", data={"query": query}, content_type="application/json").json()
+
+    def test_constant_query_count_per_page(self):
+        for size in (10, 100, 1000):
+            with self.assertNumQueries(3):
+                data = self.query(f"""
+                    query {{
+                      nodeLogs(first: {size}) {{
+                        edges {{ node {{ id edgeNode {{ name apiLogs(first: 2) {{ id }} }} }} }}
+                        pageInfo {{ hasNextPage }}
+                      }}
+                    }}
+                """)
+            self.assertNotIn("errors", data)
+            self.assertEqual(len(data["data"]["nodeLogs"]["edges"]), size)
+
+    def test_cursor_walks_every_log_once(self):
+        seen, after = [], ""
+        while True:
+            page = self.query(f"""
+                query {{ nodeLogs(first: 300{after}) {{ edges {{ node {{ id }} }} pageInfo {{ hasNextPage endCursor }} }} }}
+            """)["data"]["nodeLogs"]
+            seen.extend(edge["node"]["id"] for edge in page["edges"])
+            if not page["pageInfo"]["hasNextPage"]:
+                break
+            after = ', after: "%s"' % page["pageInfo"]["endCursor"]
+        self.assertEqual(len(seen), 1100)
+        self.assertEqual(len(set(seen)), 1100)
+
+    def test_edge_nodes_batch_api_logs(self):
+        with self.assertNumQueries(2):
+            data = self.query("query { edgeNodes(first: 20) { name apiLogs(first: 3) { id } } }")
+        self.assertEqual([len(node["apiLogs"]) for node in data["data"]["edgeNodes"]], [3] * 20)
+
+    def test_rejects_oversized_requests(self):
+        self.assertIn("errors", self.query("query { nodeLogs(first: 5000) { edges { node { id } } } }"))
+        data = self.query("query { edgeNodes(first: 1000) { apiLogs(first: 100) { id } } }")
+        self.assertIn("above the limit", data["errors"][0]["message"])
+
+    def test_rejects_malformed_cursors(self):
+        for values in (["2026-10-18T10:00:00+00:00", "x"], ["2026-10-18T10:00:00+00:00"], ["2026-13-01", "5"],
+                       ["yesterday", "5"]):
+            cursor = encode_cursor(*values)
+            data = self.query('query { nodeLogs(first: 5, after: "%s") { edges { node { id } } } }' % cursor)
+            self.assertEqual([error["message"] for error in data["errors"]], ["Invalid cursor."], values)
+        data = self.query('query { nodeLogs(first: 5, after: "not base64!") { edges { node { id } } } }')
+        self.assertEqual(data["errors"][0]["message"], "Invalid cursor.")
+
+
+class APIKeyCacheTest(TestCase):
+    def setUp(self):
+        api_key_cache.clear()
+        self.node = EdgeNode.objects.create(
+            name="Cached", latitude=0.0, longitude=0.0, status="healthy", ip_address="127.0.0.1"
+        )
+
+    def test_valid_key_is_served_from_cache(self):
+        self.assertEqual(get_edge_node_for_key(self.node.api_key), self.node)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_edge_node_for_key(self.node.api_key), self.node)
+
+    def test_invalid_key_is_negatively_cached(self):
+        self.assertIsNone(get_edge_node_for_key("not-a-key"))
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_edge_node_for_key("not-a-key"))
+
+    def test_cache_stores_hashes_only(self):
+        get_edge_node_for_key(self.node.api_key)
+        self.assertNotIn(self.node.api_key, api_key_cache._entries)
+        for node, _ in api_key_cache._entries.values():
+            self.assertIn("api_key", node.get_deferred_fields())
+            self.assertNotIn(self.node.api_key.encode(), pickle.dumps(node))
+
+    def test_key_rotation_and_delete_invalidate(self):
+        old_key = self.node.api_key
+        get_edge_node_for_key(old_key)
+        self.node.api_key = "rotated-key"
+        self.node.save()
+        self.assertIsNone(get_edge_node_for_key(old_key))
+        self.assertEqual(get_edge_node_for_key("rotated-key"), self.node)
+        self.node.delete()
+        self.assertIsNone(get_edge_node_for_key("rotated-key"))
+
+    def test_new_node_clears_negative_entry(self):
+        self.assertIsNone(get_edge_node_for_key("future-key"))
+        node = EdgeNode.objects.create(
+            name="Later", latitude=0.0, longitude=0.0, ip_address="127.0.0.1", api_key="future-key"
+        )
+        self.assertEqual(get_edge_node_for_key("future-key"), node)
+
+
+class RoutingModelInferenceTest(TestCase):
+    def test_compiled_forest_matches_model(self):
+        rng = random.Random(11)
+        samples = [[rng.uniform(-5, 15) for _ in range(3)] for _ in range(2000)]
+        samples += [[round(value * 2) / 2 for value in sample] for sample in samples]
+        model = tasks.routing_model.get().model
+        compiled = CompiledForest(model)
+        self.assertEqual(list(compiled.predict(samples)), list(model.predict(samples)))
+        self.assertEqual(tasks.predict_optimal_nodes(samples[:10]), list(model.predict(samples[:10])))
+        self.assertEqual(tasks.predict_optimal_node(samples[0]), model.predict(samples[:1])[0])
+
+    def test_batch_predictor_coalesces_concurrent_calls(self):
+        batches = []
+
+        def predict_batch(samples):
+            batches.append(len(samples))
+            return [sum(sample) for sample in samples]
+
+        predictor = BatchPredictor(predict_batch, max_wait_ms=50)
+        results = {}
+
+        def call(i):
+            results[i] = predictor.predict([i, 1])
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {i: i + 1 for i in range(20)})
+        self.assertEqual(sum(batches), 20)
+        self.assertLess(len(batches), 20)
+
+    def test_batch_predictor_propagates_errors(self):
+        predictor = BatchPredictor(lambda samples: 1 / 0, max_wait_ms=0)
+        with self.assertRaises(ZeroDivisionError):
+            predictor.predict([1, 2, 3])
+
+    def test_batch_predictor_fails_only_the_bad_sample(self):
+        def predict_batch(samples):
+            if (samples < 0).any():
+                raise ValueError("negative feature")
+            return samples.sum(axis=1)
+
+        predictor = BatchPredictor(predict_batch, max_wait_ms=100)
+        futures = [predictor.submit([i, 1]) for i in (1, -1, 2)]
+        self.assertEqual(futures[0].result(), 2)
+        self.assertEqual(futures[2].result(), 3)
+        with self.assertRaises(ValueError):
+            futures[1].result()
+
+
+class ModelRegistryTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "model.pkl")
+        self.write({"version": 1})
+
+    def write(self, obj, mtime=None):
+        with open(self.path, "wb") as file:
+            pickle.dump(obj, file)
+        if mtime is not None:
+            os.utime(self.path, (mtime, mtime))
+
+    def test_loads_lazily_and_reloads_on_change(self):
+        registry = ModelRegistry(self.path, check_interval=0)
+        self.assertIsNone(registry._current)
+        first = registry.get()
+        self.assertEqual(first.model, {"version": 1})
+        self.assertIs(registry.get(), first)
+        self.write({"version": 2}, mtime=os.path.getmtime(self.path) + 10)
+        self.assertEqual(registry.get().model, {"version": 2})
+
+    def test_keeps_previous_model_when_new_file_is_broken(self):
+        registry = ModelRegistry(self.path, check_interval=0)
+        registry.get()
+        with open(self.path, "wb") as file:
+            file.write(b"not a pickle")
+        os.utime(self.path, (os.path.getmtime(self.path) + 10,) * 2)
+        with self.assertLogs("screening.model_registry", "ERROR"):
+            self.assertEqual(registry.get().model, {"version": 1})
+
+    def test_missing_file_returns_none(self):
+        registry = ModelRegistry(self.path + ".missing")
+        with self.assertLogs("screening.model_registry", "ERROR"):
+            self.assertIsNone(registry.get())
+
+    def test_concurrent_first_requests_share_one_predictor(self):
+        registry = ModelRegistry(self.path)
+
+        def slow_predictor(*args, **kwargs):
+            time.sleep(0.05)
+            return object()
+
+        predictors = []
+        with mock.patch("screening.inference.BatchPredictor", side_effect=slow_predictor) as created:
+            threads = [threading.Thread(target=lambda: predictors.append(registry.predictor)) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(created.call_count, 1)
+        self.assertEqual(len({id(predictor) for predictor in predictors}), 1)
+
+
+class RoutingModelTrainingTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_override = override_settings(ROUTING_MODEL_DIR=directory.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.paris = EdgeNode.objects.create(name="paris", latitude=48.8, longitude=2.3, ip_address="10.0.0.1")
+        self.tokyo = EdgeNode.objects.create(name="tokyo", latitude=35.7, longitude=139.7, ip_address="10.0.0.2")
+        self.when = timezone.now() - timedelta(hours=1)
+        self.add_logs(100)
+
+    def add_logs(self, count):
+        rng = random.Random(count)
+        logs = []
+        for i in range(count):
+            europe = i % 2 == 0
+            lat, lng = (rng.uniform(40, 55), rng.uniform(-5, 15)) if europe else (rng.uniform(30, 40), rng.uniform(130, 140))
+            for node in (self.paris, self.tokyo):
+                fast = (node == self.paris) == europe
+                logs.append(APIRequestLog(
+                    edge_node=node, request_time=self.when, response_time_ms=10.0 if fast else 150.0,
+                    latitude=lat, longitude=lng, status_code=200, client_ip="127.0.0.1",
+                ))
+        APIRequestLog.objects.bulk_create(logs)
+
+    def test_learns_fastest_node_per_region(self):
+        result = train_routing_model(chunk_size=50, epochs=20, publish=False)
+        self.assertEqual(result["status"], "trained")
+        self.assertTrue(os.path.exists(result["path"]))
+        with open(result["path"], "rb") as file:
+            model = pickle.load(file)
+        samples = [routing_features(50.0, 5.0, self.when), routing_features(35.0, 135.0, self.when)]
+        self.assertEqual(list(model.predict(samples)), ["paris", "tokyo"])
+
+    def test_publishes_next_to_the_artifacts_for_location_routing(self):
+        with open(tasks.MODEL_PATH, "rb") as file:
+            bundled = file.read()
+        result = train_routing_model(chunk_size=50, epochs=20)
+        self.assertEqual(result["status"], "trained")
+        with open(tasks.MODEL_PATH, "rb") as file:
+            self.assertEqual(file.read(), bundled)
+        with mock.patch.object(tasks, "location_routing_model", ModelRegistry(published_model_path())):
+            self.assertEqual(tasks.predict_node_for_location(50.0, 5.0, self.when), "paris")
+            self.assertEqual(tasks.predict_node_for_location(35.0, 135.0, self.when), "tokyo")
+
+    def test_warm_start_trains_on_new_rows_only(self):
+        first = train_routing_model(chunk_size=50, publish=False)
+        self.assertEqual(train_routing_model(publish=False)["status"], "skipped")
+        self.add_logs(10)
+        second = train_routing_model(chunk_size=50, publish=False)
+        self.assertEqual(second["samples"], 20)
+        self.assertGreater(second["trained_through_log_id"], first["trained_through_log_id"])
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/slow/":
+            time.sleep(0.5)
+        self.send_response(200 if self.path in ("/health/", "/slow/") else 503)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class EdgeHealthProbeTest(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), HealthHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.port = self.server.server_address[1]
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.closed_port = sock.getsockname()[1]
+        self.up = EdgeNode.objects.create(name="up", latitude=0, longitude=0, ip_address="127.0.0.1")
+        self.down = EdgeNode.objects.create(name="down", latitude=1, longitude=1, ip_address="127.0.0.2")
+
+    def target(self, node, config):
+        port = self.port if node.pk == self.up.pk else self.closed_port
+        return ProbeTarget(node.pk, "127.0.0.1", port, "/health/")
+
+    def test_probe_targets(self):
+        results = probe_targets([
+            ProbeTarget(1, "127.0.0.1", self.port, "/health/"),
+            ProbeTarget(2, "127.0.0.1", self.port, "/missing/"),
+            ProbeTarget(3, "127.0.0.1", self.closed_port, "/health/"),
+            ProbeTarget(4, "127.0.0.1", self.port, "/slow/"),
+        ], timeout=0.2)
+        self.assertTrue(results[1].ok)
+        self.assertIsNotNone(results[1].latency_ms)
+        self.assertFalse(results[2].ok)
+        self.assertFalse(results[3].ok)
+        self.assertFalse(results[4].ok)
+
+    def test_budget_skips_unfinished_probes(self):
+        results = probe_targets([ProbeTarget(1, "127.0.0.1", self.port, "/slow/")], timeout=5, budget=0.1)
+        self.assertEqual(results, {})
+
+    @override_settings(EDGE_HEALTH_CHECK={"FAIL_THRESHOLD": 3, "RECOVER_THRESHOLD": 2})
+    def test_status_changes_with_hysteresis(self):
+        for _ in range(2):
+            check_edge_nodes(self.target, timeout=1)
+        self.down.refresh_from_db()
+        self.assertEqual(self.down.status, "healthy")
+        self.assertEqual(self.down.health_streak, -2)
+        self.assertIsNotNone(self.down.last_health_check)
+
+        summary = check_edge_nodes(self.target, timeout=1)
+        self.assertEqual(summary["changed"], 1)
+        self.down.refresh_from_db()
+        self.up.refresh_from_db()
+        self.assertEqual(self.down.status, "unhealthy")
+        self.assertEqual(self.up.status, "healthy")
+        self.assertIsNotNone(self.up.last_health_latency_ms)
+        self.assertEqual([location.pk for location, _ in node_index.nearest(1, 1, k=2)], [self.up.pk])
+
+        self.closed_port = self.port
+        check_edge_nodes(self.target, timeout=1)
+        self.down.refresh_from_db()
+        self.assertEqual(self.down.status, "unhealthy")
+        check_edge_nodes(self.target, timeout=1)
+        self.down.refresh_from_db()
+        self.assertEqual(self.down.status, "healthy")
+        self.assertEqual(self.down.health_streak, 2)
+
+    def test_status_set_by_hand_during_the_probe_wins(self):
+        def target(node, config):
+            if node.pk == self.up.pk:
+                EdgeNode.objects.filter(pk=node.pk).update(status="unhealthy")
+            return self.target(node, config)
+
+        summary = check_edge_nodes(target, timeout=1)
+        self.up.refresh_from_db()
+        self.assertEqual(self.up.status, "unhealthy")
+        self.assertEqual(self.up.health_streak, 1)
+        self.assertEqual(summary["changed"], 0)
+
+
+HELVETICA = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+
+
+def make_pdf(lines, content=None, font=HELVETICA, extra_objects=()):
+    """One-page PDF showing ``lines`` (or ``content``) in font /F1, with an image it does not draw."""
+    if content is None:
+        content = b"BT /F1 12 Tf 72 720 Td 14 TL " + b" ".join(b"(%s) Tj T*" % line.encode() for line in lines) + b" ET"
+    compressed = zlib.compress(content)
+    image = bytes(range(256)) * 40
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 4 0 R >> /XObject << /Im1 6 0 R >> >> /Contents 5 0 R >>",
+        font,
+        b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(compressed), compressed),
+        b"<< /Type /XObject /Subtype /Image /Width 64 /Height 160 /ColorSpace /DeviceGray /BitsPerComponent 8 "
+        b"/Length %d >>\nstream\n%s\nendstream" % (len(image), image),
+        *extra_objects,
+    ]
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    return data + b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+
+def make_cid_pdf(lines, to_unicode=True):
+    """PDF in a Type0 font whose glyph ids are character codes + 0x100, mapped back by a ToUnicode CMap."""
+    cmap = (b"/CIDInit /ProcSet findresource begin 12 dict begin begincmap "
+            b"/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def "
+            b"/CMapName /Adobe-Identity-UCS def /CMapType 2 def "
+            b"1 begincodespacerange <0000> <FFFF> endcodespacerange "
+            b"1 beginbfrange <0120> <017E> <0020> endbfrange "
+            b"endcmap CMapName currentdict /CMap defineresource pop end end")
+    font = (b"<< /Type /Font /Subtype /Type0 /BaseFont /Arial /Encoding /Identity-H /DescendantFonts [7 0 R]"
+            + (b" /ToUnicode 8 0 R" if to_unicode else b"") + b" >>")
+    descendant = (b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /Arial "
+                  b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> /DW 500 "
+                  b"/FontDescriptor 9 0 R >>")
+    descriptor = (b"<< /Type /FontDescriptor /FontName /Arial /Flags 32 /FontBBox [0 -200 1000 900] "
+                  b"/ItalicAngle 0 /Ascent 900 /Descent -200 /CapHeight 700 /StemV 80 >>")
+    shown = b" ".join(b"<%s> Tj T*" % "".join(f"{ord(c) + 0x100:04X}" for c in line).encode() for line in lines)
+    return make_pdf(lines, content=b"BT /F1 12 Tf 72 720 Td 14 TL " + shown + b" ET", font=font, extra_objects=[
+        descendant, b"<< /Length %d >>\nstream\n%s\nendstream" % (len(cmap), cmap), descriptor,
+    ])
+
+
+def make_docx(lines):
+    body = "".join('<w:p><w:r><w:t>%s</w:t></w:r></w:p>' % line for line in lines)
+    document = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        '<w:body>%s</w:body></w:document>' % body
+    )
+    buffer = tempfile.SpooledTemporaryFile()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", document)
+    buffer.seek(0)
+    return buffer.read()
+
+
+class ResumeParsingTest(TestCase):
+    lines = ["Jane Doe", "Senior Python developer", "Django, PostgreSQL and Machine Learning"]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.settings_override = override_settings(MEDIA_ROOT=directory.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def write(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path, "wb") as file:
+            file.write(data)
+        return path
+
+    def test_extract_text_from_each_format(self):
+        for name, data in (("cv.pdf", make_pdf(self.lines)), ("cv.docx", make_docx(self.lines))):
+            path = self.write(name, data)
+            for chunk_size in (7, 64 * 1024):
+                text = extract_text(path, chunk_size=chunk_size)
+                for line in self.lines:
+                    self.assertIn(line, text, (name, chunk_size))
+
+    def test_pdf_kerning_gaps_are_spaces(self):
+        content = b"BT /F1 12 Tf 72 720 Td [(Senior) -250 (Py) 30 (thon) -600 (developer)] TJ ET"
+        self.assertEqual(extract_text(self.write("tj.pdf", make_pdf([], content=content))), "Senior Python developer")
+
+    def test_pdf_cid_fonts_are_decoded_through_their_cmap(self):
+        text = extract_text(self.write("cid.pdf", make_cid_pdf(self.lines)))
+        for line in self.lines:
+            self.assertIn(line, text)
+
+    def test_pdf_without_unicode_mapping_fails(self):
+        with self.assertRaises(ResumeParseError):
+            extract_text(self.write("cid.pdf", make_cid_pdf(self.lines, to_unicode=False)))
+
+    def test_doc_needs_antiword(self):
+        path = self.write("cv.doc", b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + bytes(504))
+        with mock.patch("screening.parsing.shutil.which", return_value=None):
+            with self.assertRaisesRegex(ResumeParseError, "antiword"):
+                extract_text(path)
+
+    def test_slow_files_time_out(self):
+        with self.assertRaises(ResumeParseError):
+            with time_limit(0.05):
+                time.sleep(1)
+
+    def test_extract_skills(self):
+        vocabulary = skill_vocabulary(["team lead"])
+        text = "Team Lead. Python, Node.js and C++; machine learning (pytorch). Go-getter with excellent leadership."
+        self.assertEqual(
+            extract_skills(text, vocabulary),
+            ["team lead", "python", "node.js", "c++", "machine learning", "pytorch", "leadership"],
+        )
+
+    def test_parse_stored_resumes_in_batches(self):
+        Job.objects.create(recruiter="acme", title="Backend", description="-", required_skills="Django, GraphQL",
+                           location="Paris", salary_range="-")
+        applicant = Applicant.objects.create(full_name="Jane Doe", email="jane@example.com", phone_number="+33123456789",
+                                             skills="python")
+        resumes = [
+            Resume.objects.create(applicant=applicant, file=SimpleUploadedFile(name, data))
+            for name, data in (("a.pdf", make_pdf(self.lines)), ("b.docx", make_docx(self.lines + ["GraphQL"])),
+                               ("c.pdf", b"not a pdf"))
+        ]
+        with self.assertLogs("screening.parsing", "WARNING"):
+            result = parse_stored_resumes(batch_size=2, workers=1)
+        self.assertEqual(result, {"parsed": 2, "reused": 0, "failed": 1})
+        for resume in resumes:
+            resume.refresh_from_db()
+        self.assertIn("Senior Python developer", resumes[0].parsed_text)
+        self.assertEqual(resumes[0].extracted_skills, "python, django, postgresql, machine learning")
+        self.assertIn("graphql", resumes[1].extracted_skills)
+        self.assertEqual(resumes[2].parsed_text, "")
+
+    def test_upload_schedules_parsing_after_commit(self):
+        user = User.objects.create_user("jane", password="pw")
+        Applicant.objects.create(user=user, full_name="Jane Doe", email="jane@example.com",
+                                 phone_number="+33123456789", skills="python")
+        client = Client()
+        client.force_login(user)
+        with mock.patch.object(tasks.parse_resumes, "delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = client.post("/resumes/", {"file": SimpleUploadedFile("cv.pdf", make_pdf(self.lines))})
+        self.assertEqual(response.status_code, 201, response.content)
+        delay.assert_called_once_with([response.json()["id"]])
+
+
+class ResumeDedupTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_override = override_settings(MEDIA_ROOT=directory.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.user = User.objects.create_user("jane", password="pw")
+        Applicant.objects.create(user=self.user, full_name="Jane Doe", email="jane@example.com",
+                                 phone_number="+33123456789", skills="python")
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.data = make_pdf(["Jane Doe", "Python and Django"])
+
+    def upload(self, name="cv.pdf"):
+        with mock.patch.object(tasks.parse_resumes, "delay") as delay, \
+                mock.patch.object(tasks.rescore_matches, "apply_async"):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post("/resumes/", {"file": SimpleUploadedFile(name, self.data)})
+        self.assertEqual(response.status_code, 201, response.content)
+        return Resume.objects.get(pk=response.json()["id"]), delay
+
+    def test_identical_uploads_share_storage_and_parse_results(self):
+        first, first_delay = self.upload("cv.pdf")
+        second, second_delay = self.upload("copy-of-cv.pdf")
+        digest = hashlib.sha256(self.data).hexdigest()
+        self.assertEqual(first.content_hash, digest)
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertIn(digest, first.file.name)
+        first_delay.assert_called_once_with([first.pk])
+        second_delay.assert_called_once_with([second.pk])
+
+        result = parse_stored_resumes([first.pk], workers=1)
+        self.assertEqual(result, {"parsed": 1, "reused": 0, "failed": 0})
+        second.refresh_from_db()
+        self.assertIn("Python and Django", second.parsed_text)
+        self.assertEqual(second.extracted_skills, "python, django")
+
+        third, third_delay = self.upload("again.pdf")
+        third_delay.assert_not_called()
+        self.assertEqual(third.extracted_skills, "python, django")
+
+        content = ResumeContent.objects.get()
+        self.assertEqual(content.upload_count, 3)
+        admin = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(admin)
+        stats = self.client.get("/metrics/resume-dedup/").json()
+        self.assertEqual((stats["uploads"], stats["unique_contents"], stats["hits"]), (3, 1, 2))
+        self.assertAlmostEqual(stats["hit_rate"], 0.6667)
+        self.assertAlmostEqual(stats["cpu_ms_saved"], round(2 * content.parse_cpu_ms, 1))
+
+
+class ResumeMatchingTest(TestCase):
+    def setUp(self):
+        self.backend = Job.objects.create(recruiter="acme", title="Backend developer", description="Build APIs",
+                                          required_skills="Python, Django, PostgreSQL", location="Paris",
+                                          salary_range="-")
+        self.frontend = Job.objects.create(recruiter="acme", title="Frontend developer", description="Build UIs",
+                                           required_skills="JavaScript, React, CSS", location="Paris",
+                                           salary_range="-")
+        profiles = [
+            ("python", "Backend developer building APIs", "python, django, postgresql"),
+            ("mixed", "Full stack developer", "python, react"),
+            ("react", "Frontend developer", "javascript, react, css"),
+            ("empty", "", ""),
+        ]
+        self.resumes = {}
+        for i, (name, text, skills) in enumerate(profiles):
+            applicant = Applicant.objects.create(full_name=name, email=f"{name}@example.com",
+                                                 phone_number="+33123456789", skills=skills)
+            self.resumes[name] = Resume.objects.create(applicant=applicant, file=f"resumes/{name}.pdf",
+                                                       parsed_text=text, extracted_skills=skills)
+
+    def test_scores_and_top_candidates(self):
+        with override_settings(RESUME_MATCHING={"TOP_K": 2}):
+            result = score_resumes(chunk_size=2)
+        self.assertEqual(result, {"resumes": 3, "jobs": 2, "matches": 4})
+        for resume in self.resumes.values():
+            resume.refresh_from_db()
+        self.assertIsNone(self.resumes["empty"].ai_score)
+        self.assertGreater(self.resumes["python"].ai_score, 50)
+        self.assertLessEqual(self.resumes["python"].ai_score, 100)
+
+        ranked = list(JobMatch.objects.filter(job=self.backend).values_list("resume_id", flat=True))
+        self.assertEqual(ranked, [self.resumes["python"].pk, self.resumes["mixed"].pk])
+        response = Client().get(f"/jobs/{self.frontend.pk}/candidates/?k=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{
+            "rank": 1,
+            "score": self.resumes["react"].ai_score,
+            "resume": self.resumes["react"].pk,
+            "applicant": self.resumes["react"].applicant_id,
+            "applicant_name": "react",
+        }])
+        self.assertEqual(Client().get(f"/jobs/{self.frontend.pk}/candidates/?k=x").status_code, 400)
+
+    def test_job_space_matches_plain_cosine(self):
+        rng = random.Random(5)
+        words = [f"skill{i}" for i in range(40)]
+        weights = [1 / (rank + 1) for rank in range(len(words))]
+        jobs = [(i, "job", " ".join(rng.choices(words, weights, k=12)), ", ".join(rng.sample(words, 3)))
+                for i in range(30)]
+        resumes = [" ".join(rng.choices(words, weights, k=40)) + " unknownword" for _ in range(20)]
+        config = {**matching_settings(), "DENSE_DF": 0.2}
+        space = JobSpace(jobs, config)
+        self.assertGreater(space.n_dense, 0)
+        self.assertGreater(space.sparse_t.shape[0], 0)
+        expected = (
+            vectorize(resumes, config, space.idf)
+            @ vectorize([job_document(*job[1:], config) for job in jobs], config, space.idf).T
+        ).toarray()
+        np.testing.assert_allclose(space.scores(resumes), expected, atol=1e-6)
+
+    def test_vector_cache_keeps_hits_on_passes_larger_than_itself(self):
+        vectors = matching.TermVectorCache()
+        config = {**matching_settings(), "VECTOR_CACHE_SIZE": 3}
+        documents = [f"resume{i} python" for i in range(5)]
+
+        def run_pass():
+            vectors.start_pass()
+            with mock.patch("screening.matching.term_vectors", wraps=matching.term_vectors) as term_vectors:
+                blocks = [vectors.transform(documents[start:start + 2], config) for start in range(0, 5, 2)]
+            expected = matching.term_vectors(documents, config)
+            np.testing.assert_array_equal(np.vstack([block.toarray() for block in blocks]), expected.toarray())
+            return [document for call in term_vectors.call_args_list for document in call.args[0]]
+
+        self.assertEqual(len(run_pass()), 5)
+        self.assertEqual(run_pass(), documents[3:])
+        documents[0] = "resume0 rust"
+        # The old entry is evicted only once a whole pass has gone by without it.
+        self.assertEqual(run_pass(), [documents[0], *documents[3:]])
+        self.assertEqual(run_pass(), [documents[0], *documents[3:]])
+        self.assertEqual(run_pass(), documents[3:])
+
+    def test_top_k_merges_blocks(self):
+        rng = np.random.default_rng(0)
+        scores = rng.random((50, 3)).astype(np.float32)
+        ids = np.arange(100, 150)
+        top = TopK(3, 5)
+        for start in range(0, 50, 7):
+            top.add(scores[start:start + 7], ids[start:start + 7])
+        for column in range(3):
+            expected = ids[np.argsort(-scores[:, column])[:5]].tolist()
+            self.assertEqual([resume_id for resume_id, _ in top.ranked(column)], expected)
+
+
+@override_settings(RESUME_MATCHING={"TOP_K": 3})
+class IncrementalRescoringTest(TestCase):
+    words = ["python", "django", "react", "css", "sql", "aws", "docker", "kafka", "spark", "java", "go", "rust"]
+
+    def setUp(self):
+        cache.delete(RESCORE_SCHEDULED_KEY)
+        self.rng = random.Random(11)
+        self.jobs = [
+            Job.objects.create(recruiter="acme", title="Engineer", description=self.text(8),
+                               required_skills=", ".join(self.rng.sample(self.words, 3)), location="Paris",
+                               salary_range="-")
+            for i in range(4)
+        ]
+        applicant = Applicant.objects.create(full_name="Jane Doe", email="jane@example.com",
+                                             phone_number="+33123456789", skills="python")
+        self.resumes = [
+            Resume.objects.create(applicant=applicant, file=f"resumes/{i}.pdf", parsed_text=self.text(20),
+                                  extracted_skills=", ".join(self.rng.sample(self.words, 2)))
+            for i in range(12)
+        ]
+        score_resumes()
+        PendingRescore.objects.all().delete()
+
+    def text(self, count):
+        return " ".join(self.rng.choice(self.words) for _ in range(count))
+
+    def snapshot(self):
+        return (
+            sorted(Resume.objects.values_list("id", "ai_score", "best_job_id")),
+            list(JobMatch.objects.order_by("job_id", "rank").values_list("job_id", "resume_id", "score")),
+        )
+
+    def assert_matches_full_run(self):
+        # Exact only while the job corpus keeps its document frequencies: idf drift is left to the full run.
+        while PendingRescore.objects.exists():
+            rescore_pending()
+        incremental = self.snapshot()
+        score_resumes()
+        self.assertEqual(incremental, self.snapshot())
+
+    def swap_contents(self, first, second):
+        for field in ("description", "required_skills"):
+            first_value = getattr(first, field)
+            setattr(first, field, getattr(second, field))
+            setattr(second, field, first_value)
+        first.save()
+        second.save()
+
+    def test_job_edit_reuses_resume_term_vectors(self):
+        self.swap_contents(self.jobs[0], self.jobs[1])
+        with mock.patch("screening.matching.term_vectors", wraps=matching.term_vectors) as term_vectors:
+            rescore_pending()
+        # Swapped contents: both job documents and every resume document are cached already.
+        self.assertEqual(term_vectors.call_count, 0)
+        self.assert_matches_full_run()
+
+    def test_job_space_is_kept_until_a_job_changes(self):
+        config = matching_settings()
+        jobs = list(Job.objects.order_by("id").values_list("id", "title", "description", "required_skills"))
+        space = job_space(jobs, config)
+        self.assertIs(job_space(list(jobs), config), space)
+        jobs[0] = (*jobs[0][:2], "rust and go", jobs[0][3])
+        with mock.patch("screening.matching.term_vectors", wraps=matching.term_vectors) as term_vectors:
+            self.assertIsNot(job_space(jobs, config), space)
+        self.assertEqual([len(call.args[0]) for call in term_vectors.call_args_list], [1])
+        self.assertIsNot(job_space(jobs, {**config, "MAX_DF": 0.9}), space)
+
+    def test_undrained_queue_schedules_the_next_run(self):
+        self.swap_contents(self.jobs[0], self.jobs[1])
+        self.resumes[0].save()
+        with mock.patch.object(tasks.rescore_matches, "apply_async") as apply_async, \
+                override_settings(RESUME_MATCHING={"TOP_K": 3, "RESCORE_BATCH": 1}):
+            rescore_pending(max_batches=1)
+        apply_async.assert_called_once()
+        self.assertTrue(PendingRescore.objects.exists())
+        self.assert_matches_full_run()
+
+    def test_burst_of_edits_schedules_one_run(self):
+        with mock.patch.object(tasks.rescore_matches, "apply_async") as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.swap_contents(self.jobs[0], self.jobs[1])
+                self.swap_contents(self.jobs[1], self.jobs[0])
+                self.swap_contents(self.jobs[0], self.jobs[1])
+                self.resumes[0].parsed_text = "kafka"
+                self.resumes[0].save(update_fields=["parsed_text"])
+                self.jobs[2].save(update_fields=["location"])
+        apply_async.assert_called_once()
+        self.assertEqual(
+            set(PendingRescore.objects.values_list("kind", "object_id")),
+            {("job", self.jobs[0].pk), ("job", self.jobs[1].pk), ("resume", self.resumes[0].pk)},
+        )
+        self.assert_matches_full_run()
+
+    def test_job_edits_rescore_their_columns(self):
+        self.swap_contents(self.jobs[2], self.jobs[3])
+        first, second = self.jobs[:2]
+        first.description, second.description = second.description, first.description
+        first.required_skills, second.required_skills = second.required_skills, first.required_skills
+        Job.objects.bulk_update(self.jobs[:2], ["description", "required_skills"])
+        mark_dirty(jobs=[self.jobs[0].pk, self.jobs[1].pk])
+        self.assert_matches_full_run()
+
+    def test_resume_edits_rescore_rows(self):
+        best = JobMatch.objects.filter(rank=1).first().resume
+        best.parsed_text = "nothing relevant"
+        best.extracted_skills = ""
+        best.save()
+        self.resumes[3].extracted_skills = "python, django, react, css, sql"
+        self.resumes[3].save()
+        Resume.objects.create(applicant=self.resumes[0].applicant, file="resumes/new.pdf",
+                              parsed_text=self.text(30), extracted_skills="go, rust")
+        self.assert_matches_full_run()
+
+    def test_resume_deletion(self):
+        JobMatch.objects.filter(rank=1).first().resume.delete()
+        self.assert_matches_full_run()
+
+    def test_job_deletion_moves_best_job(self):
+        job = Resume.objects.exclude(best_job=None).first().best_job
+        job.delete()
+        totals = rescore_pending()
+        self.assertGreater(totals["resumes"], 0)
+        self.assertFalse(JobMatch.objects.filter(job_id=job.pk).exists())
+        self.assertFalse(Resume.objects.filter(best_job=None).exists())
+
+
+class ApplicantSkillIndexTest(TestCase):
+    def setUp(self):
+        profiles = [
+            ("ali", "+21620000000", "Python developer, Django, AWS"),
+            ("bea", "+33123456789", "python, react; C++"),
+            ("chen", "0021620000001", "Java, JavaScript developer"),
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.applicants = {
+                name: Applicant.objects.create(full_name=name, email=f"{name}@example.com", phone_number=phone,
+                                               skills=skills)
+                for name, phone, skills in profiles
+            }
+
+    def names(self, queryset):
+        return [applicant.full_name for applicant in queryset]
+
+    def test_terms(self):
+        self.assertEqual(skill_terms("Python developer,  C++ ;Node.js"),
+                         {"python developer", "python", "developer", "c++", "node.js"})
+        self.assertEqual(skill_terms(""), set())
+
+    def test_index_follows_saves(self):
+        bea = self.applicants["bea"]
+        self.assertIn("c++", set(bea.skill_index.values_list("skill", flat=True)))
+        bea.skills = "Go"
+        with self.captureOnCommitCallbacks(execute=True):
+            bea.save()
+        self.assertEqual(set(bea.skill_index.values_list("skill", flat=True)), {"go"})
+        bea.full_name = "Bea"
+        with self.captureOnCommitCallbacks(execute=True):
+            bea.save(update_fields=["full_name"])
+        self.assertEqual(bea.skill_index.count(), 1)
+
+    def test_and_or_queries_are_ranked(self):
+        self.assertEqual(self.names(applicants_with_skills("python, django")), ["ali"])
+        self.assertEqual(self.names(applicants_with_skills(["Python", "Django", "React"], match="any")),
+                         ["ali", "bea"])
+        ranked = applicants_with_skills("django, aws, react, python", match="any")
+        self.assertEqual([(a.full_name, a.skill_matches) for a in ranked], [("ali", 3), ("bea", 2)])
+        # Whole terms only: "java" does not match "JavaScript".
+        self.assertEqual(self.names(applicants_with_skills("java")), ["chen"])
+        self.assertEqual(self.names(applicants_with_skills("javascript developer")), ["chen"])
+        self.assertFalse(applicants_with_skills(" , ").exists())
+
+    def test_rebuild(self):
+        Applicant.objects.filter(full_name="chen").update(skills="Rust")
+        ApplicantSkill.objects.create(applicant=self.applicants["ali"], skill="stale")
+        self.assertEqual(rebuild_skill_index(batch_size=2), 9)
+        self.assertEqual(self.names(applicants_with_skills("rust")), ["chen"])
+        self.assertFalse(applicants_with_skills("stale").exists())
+
+    def test_views(self):
+        client = Client()
+        response = client.get("/applicants/by_skill/python/")
+        self.assertEqual([row["full_name"] for row in response.json()], ["ali", "bea"])
+        response = client.get("/applicants/by_skill/react,django/?match=any")
+        self.assertEqual([row["full_name"] for row in response.json()], ["ali", "bea"])
+        self.assertEqual(client.get("/applicants/by_skill/react,django/").status_code, 204)
+        self.assertEqual(client.get("/applicants/by_skill/python/?match=some").status_code, 400)
+        response = client.get("/applicants/get_tunisian_dev/")
+        self.assertEqual([row["full_name"] for row in response.json()], ["ali", "chen"])
+
+        job = Job.objects.create(recruiter="Acme", title="Dev", description="-", required_skills="python",
+                                 location="Tunis", salary_range="-")
+        for name, hour in (("ali", 9), ("ali", 10), ("bea", 11)):
+            Interview.objects.create(job=job, applicant=self.applicants[name], date=datetime.date(2026, 1, 5),
+                                     time=datetime.time(hour), mode="online")
+        response = client.get("/interviews/get_interview_by_recruiter/?skill=python&company=acme")
+        self.assertEqual([row["full_name"] for row in response.json()], ["ali", "bea"])
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        # Resume and job saves would otherwise schedule a re-scoring task.
+        cache.set(RESCORE_SCHEDULED_KEY, True, timeout=None)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ada = Applicant.objects.create(full_name="Ada Lovelace", email="ada@example.com",
+                                                phone_number="+33123456789", skills="Python, Mathematics")
+            self.alan = Applicant.objects.create(full_name="Alan Turing", email="alan@example.com",
+                                                 phone_number="+33123456789", skills="Cryptography")
+            self.resume = Resume.objects.create(applicant=self.alan, file="resumes/alan.pdf",
+                                                parsed_text="Broke ciphers with python and statistics",
+                                                extracted_skills="python")
+            self.job = Job.objects.create(recruiter="Acme", title="Python engineer", description="Data pipelines",
+                                          required_skills="Python, SQL", location="Tunis", salary_range="-")
+
+    def tearDown(self):
+        cache.delete(RESCORE_SCHEDULED_KEY)
+
+    def hits(self, query, **kwargs):
+        return [(kind, object_id) for kind, object_id, _, _ in search(query, **kwargs)]
+
+    def test_ranked_matches(self):
+        hits = self.hits("python")
+        # The job has the word in its title, applicants in their skills, the resume in skills and text.
+        self.assertEqual(hits[0], ("job", self.job.pk))
+        self.assertEqual(set(hits), {("job", self.job.pk), ("applicant", self.ada.pk),
+                                     ("resume", self.resume.pk)})
+        self.assertEqual(self.hits("python ciphers"), [("resume", self.resume.pk)])
+        self.assertEqual(self.hits("tunis", kinds=["job"]), [("job", self.job.pk)])
+        self.assertEqual(self.hits("python", kinds=["applicant"]), [("applicant", self.ada.pk)])
+
+    def test_typos(self):
+        self.assertGreater(word_similarity("lovelase", "Ada Lovelace"), 0.6)
+        self.assertLess(word_similarity("lovelcae", "Ada Lovelace"), 0.6)
+        self.assertEqual(self.hits("Lovelac"), [("applicant", self.ada.pk)])
+        self.assertEqual(self.hits("cryptografy"), [("applicant", self.alan.pk)])
+        self.assertEqual(self.hits("zzzz"), [])
+
+    def test_index_follows_changes(self):
+        self.alan.full_name = "Alan M. Turing"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alan.save()
+        self.assertEqual(SearchEntry.objects.get(kind="resume", object_id=self.resume.pk).title, "Alan M. Turing")
+        self.job.title = "Rust engineer"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.save(update_fields=["title"])
+        self.assertIn(("job", self.job.pk), self.hits("rust"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ada.delete()
+        self.assertFalse(SearchEntry.objects.filter(kind="applicant", object_id=self.ada.pk).exists())
+        SearchEntry.objects.all().delete()
+        self.assertEqual(rebuild_search_index(batch_size=1), 3)
+        self.assertIn(("resume", self.resume.pk), self.hits("ciphers"))
+
+    def test_pages_of_tied_matches_neither_repeat_nor_skip(self):
+        SearchEntry.objects.bulk_create([
+            SearchEntry(kind="job", object_id=1000 + i, title="Golang engineer", keywords="", body="")
+            for i in range(7)
+        ])
+        pages = [self.hits("golang", limit=3, offset=offset) for offset in (0, 3, 6)]
+        self.assertEqual([object_id for page in pages for _, object_id in page], list(range(1000, 1007)))
+
+    def test_rolled_back_saves_leave_no_entries(self):
+        ada_pk = self.ada.pk
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    grace = Applicant.objects.create(full_name="Grace Hopper", email="grace@example.com",
+                                                     phone_number="+33123456789", skills="COBOL")
+                    self.ada.delete()
+                    raise DatabaseError
+            except DatabaseError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertFalse(SearchEntry.objects.filter(kind="applicant", object_id=grace.pk).exists())
+        self.assertFalse(ApplicantSkill.objects.filter(applicant_id=grace.pk).exists())
+        self.assertEqual(self.hits("lovelace"), [("applicant", ada_pk)])
+
+    def test_endpoint(self):
+        client = Client()
+        self.assertEqual(client.get("/search/?q=python").status_code, 403)
+        client.force_login(User.objects.create_user("recruiter", password="pw"))
+        response = client.get("/search/?q=python&page_size=2")
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["results"][0], {"type": "job", "id": self.job.pk, "title": "Python engineer",
+                                              "rank": body["results"][0]["rank"]})
+        self.assertEqual(len(body["results"]), 2)
+        self.assertIn("page=2", body["next"])
+        body = client.get(body["next"]).json()
+        self.assertEqual(len(body["results"]), 1)
+        self.assertIsNone(body["next"])
+        self.assertEqual(client.get("/search/?q=python&type=user").status_code, 400)
+        self.assertEqual(client.get("/search/?q=").status_code, 400)
+        self.assertEqual(client.get("/search/?q=python&page=1000").status_code, 400)
+
+
+@override_settings(PAGINATION={"PAGE_SIZE": 2, "MAX_PAGE_SIZE": 3})
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        # Duplicate names so the primary key has to break ties.
+        for i, name in enumerate(["Cleo", "Ada", "Bob", "Ada", "Dan"]):
+            Applicant.objects.create(full_name=name, email=f"{i}@example.com", phone_number="+33123456789",
+                                     skills="python")
+
+    def walk(self, url):
+        pages = []
+        while url:
+            body = self.client.get(url).json()
+            pages.append([row["full_name"] for row in body["results"]])
+            url = body["next"]
+        return pages, body
+
+    def test_mutable_ordering_pages_by_primary_key(self):
+        # Applicant.Meta.ordering is full_name, which an edit can change.
+        pages, last = self.walk("/applicants/")
+        self.assertEqual(pages, [["Cleo", "Ada"], ["Bob", "Ada"], ["Dan"]])
+        self.assertNotIn("count", last)
+        body = self.client.get(last["previous"]).json()
+        self.assertEqual([row["full_name"] for row in body["results"]], ["Bob", "Ada"])
+        body = self.client.get(body["previous"]).json()
+        self.assertEqual([row["full_name"] for row in body["results"]], ["Cleo", "Ada"])
+        self.assertIsNone(body["previous"])
+
+    def test_cursor_survives_writes(self):
+        body = self.client.get("/applicants/").json()
+        Applicant.objects.filter(full_name="Bob").delete()
+        Applicant.objects.filter(full_name="Dan").update(full_name="Aaron")
+        Applicant.objects.create(full_name="Abe", email="abe@example.com", phone_number="+33123456789", skills="")
+        pages, _ = self.walk(body["next"])
+        self.assertEqual(pages, [["Ada", "Aaron"], ["Abe"]])
+
+    def test_page_size_count_and_bad_cursor(self):
+        body = self.client.get("/applicants/?page_size=10&count=1").json()
+        self.assertEqual(len(body["results"]), 3)
+        self.assertEqual(body["count"], 5)
+        self.assertNotIn("count=", body["next"])
+        self.assertEqual(self.client.get("/applicants/?cursor=bm9wZQ").status_code, 404)
+
+    def test_descending_datetime_ordering(self):
+        user = User.objects.create_user("reader")
+        for i in range(5):
+            Notification.objects.create(user=user, message=f"m{i}")
+        url, seen = "/notifications/", []
+        while url:
+            body = self.client.get(url).json()
+            seen += [row["message"] for row in body["results"]]
+            url = body["next"]
+        self.assertEqual(seen, ["m4", "m3", "m2", "m1", "m0"])
+
+    def test_edits_do_not_move_rows_across_the_cursor(self):
+        user = User.objects.create_user("reader")
+        for i in range(5):
+            Notification.objects.create(user=user, message=f"m{i}")
+        body = self.client.get("/notifications/?page_size=2").json()
+        for notification in Notification.objects.all():
+            notification.is_read = True
+            notification.save()
+        seen = [row["message"] for row in body["results"]]
+        url = body["next"]
+        while url:
+            body = self.client.get(url).json()
+            seen += [row["message"] for row in body["results"]]
+            url = body["next"]
+        self.assertEqual(seen, ["m4", "m3", "m2", "m1", "m0"])
+
+    def test_actions_paginate(self):
+        job = Job.objects.create(recruiter="acme", title="Dev", description="-", required_skills="python",
+                                 location="Paris", salary_range="-")
+        job.applicants.set(Applicant.objects.all())
+        body = self.client.get(f"/jobs/{job.pk}/applicants/").json()
+        self.assertEqual([row["full_name"] for row in body["results"]], ["Cleo", "Ada"])
+        self.assertIsNotNone(body["next"])
+
+
+class StreamingExportTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+        node = EdgeNode.objects.create(name="paris", ip_address="10.0.0.1", latitude=48.85, longitude=2.35)
+        start = timezone.make_aware(datetime.datetime(2026, 3, 1))
+        for day in range(4):
+            APIRequestLog.objects.create(edge_node=node, request_time=start + timedelta(days=day),
+                                         response_time_ms=10.0 + day, latitude=48.85, longitude=2.35,
+                                         status_code=200, client_ip="127.0.0.1", extra_data={"day": day})
+        Applicant.objects.create(full_name='Ada "The Countess", Lovelace', email="ada@example.com",
+                                 phone_number="+33123456789", skills="python\nmaths")
+
+    def download(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content)
+
+    @override_settings(EXPORT={"BLOCK_BYTES": 64})
+    def test_csv_round_trips(self):
+        response, body = self.download("/export/applicants/")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="applicants.csv"')
+        rows = list(csv.DictReader(io.StringIO(body.decode())))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["full_name"], 'Ada "The Countess", Lovelace')
+        self.assertEqual(rows[0]["skills"], "python\nmaths")
+
+    def test_ndjson_time_range_and_gzip(self):
+        response, body = self.download("/export/request-logs/?output=ndjson&since=2026-03-02&until=2026-03-04&gzip=1")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        rows = [json.loads(line) for line in gzip.decompress(body).decode().splitlines()]
+        self.assertEqual([row["extra_data"] for row in rows], [{"day": 1}, {"day": 2}])
+        self.assertEqual(rows[0]["request_time"], "2026-03-02T00:00:00+00:00")
+
+    def test_errors(self):
+        self.assertEqual(self.client.get("/export/users/").status_code, 404)
+        self.assertEqual(self.client.get("/export/applicants/?output=xml").status_code, 400)
+        self.assertEqual(self.client.get("/export/applicants/?since=yesterday").status_code, 400)
+        self.assertEqual(Client().get("/export/applicants/").status_code, 403)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "logs.csv.gz")
+            call_command("export_data", "request-logs", "--since", "2026-03-03", "--gzip", "-o", path,
+                         stdout=io.StringIO())
+            with gzip.open(path, "rt") as file:
+                rows = list(csv.DictReader(file))
+        self.assertEqual([row["response_time_ms"] for row in rows], ["12.0", "13.0"])
+        self.assertEqual(json.loads(rows[0]["extra_data"]), {"day": 2})
+
+
+class BulkImportTest(TestCase):
+    HEADER = "full_name,email,birthdate,phone_number,skills,linkedin_profile\n"
+
+    def import_csv(self, body, **kwargs):
+        return import_stream("applicants", io.BytesIO((self.HEADER + body).encode()), "csv", **kwargs)
+
+    def test_upsert_by_email(self):
+        Applicant.objects.create(full_name="Ada", email="ada@example.com", phone_number="+33123456789",
+                                 skills="cobol")
+        result = self.import_csv(
+            "Ada Lovelace,ada@example.com,1815-12-10,+33123456789,python,\n"
+            'Alan Turing,alan@example.com,,+44123456789,"python, cryptography",\n'
+        )
+        self.assertEqual((result["created"], result["updated"], result["failed"]), (1, 1, 0))
+        ada = Applicant.objects.get(email="ada@example.com")
+        self.assertEqual((ada.full_name, ada.skills, str(ada.birthdate)), ("Ada Lovelace", "python", "1815-12-10"))
+        self.assertEqual(Applicant.objects.count(), 2)
+        # bulk_create sends no signals; the indexes are refreshed by the importer.
+        self.assertEqual(set(applicants_with_skills(["python"]).values_list("email", flat=True)),
+                         {"ada@example.com", "alan@example.com"})
+        self.assertFalse(applicants_with_skills(["cobol"]).exists())
+        self.assertEqual(SearchEntry.objects.get(kind=SearchEntry.APPLICANT, object_id=ada.pk).title, "Ada Lovelace")
+
+    def test_row_errors_do_not_abort_the_batch(self):
+        result = self.import_csv(
+            "Ada,ada@example.com,,+33123456789,python,\n"
+            "Bad Phone,bad@example.com,,call me,python,\n"
+            ",nameless@example.com,,+33123456789,python,\n"
+            "Ada Again,ada@example.com,,+33123456789,maths,\n",
+            batch_size=10,
+        )
+        self.assertEqual((result["created"], result["updated"], result["failed"]), (1, 0, 3))
+        self.assertEqual([error["line"] for error in result["errors"]], [2, 3, 4])
+        self.assertIn("phone_number", result["errors"][1]["errors"])
+        self.assertIn("full_name", result["errors"][2]["errors"])
+        self.assertIn("line 5", result["errors"][0]["errors"]["email"][0])
+        self.assertEqual(Applicant.objects.get().full_name, "Ada Again")
+
+    def test_ndjson_and_batches(self):
+        lines = [json.dumps({"full_name": f"Applicant {i}", "email": f"a{i}@example.com",
+                             "phone_number": "+33123456789", "skills": "python"}) for i in range(5)]
+        lines.insert(2, "{not json")
+        result = import_stream("applicants", io.BytesIO("\n".join(lines).encode()), "ndjson", batch_size=2)
+        self.assertEqual((result["created"], result["failed"]), (5, 1))
+        self.assertEqual(result["errors"][0]["line"], 3)
+        self.assertEqual(Applicant.objects.count(), 5)
+
+    def test_database_error_fails_only_its_batch(self):
+        rows = [(i, {"full_name": f"A{i}", "email": f"a{i}@example.com", "phone_number": "+33123456789",
+                     "skills": "python"}) for i in range(1, 5)]
+        with mock.patch("screening.skills.rebuild_skill_index", side_effect=[0, DatabaseError("boom")]):
+            result = import_rows("applicants", rows, batch_size=2)
+        self.assertEqual((result["created"], result["failed"]), (2, 2))
+        self.assertEqual(sorted(Applicant.objects.values_list("email", flat=True)),
+                         ["a1@example.com", "a2@example.com"])
+
+    @mock.patch.object(tasks.rescore_matches, "apply_async")
+    def test_jobs_and_api(self, apply_async):
+        client = Client()
+        client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+        body = "\n".join(json.dumps({"recruiter": "Acme", "title": title, "description": "Build things",
+                                      "required_skills": "python", "location": "Tunis", "salary_range": "1-2"})
+                           for title in ("Backend developer", "Data engineer"))
+        upload = SimpleUploadedFile("jobs.ndjson", body.encode(), content_type="application/x-ndjson")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post("/import/jobs/", {"file": upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["created"], 2)
+        self.assertEqual(PendingRescore.objects.filter(kind=PendingRescore.JOB).count(), 2)
+        self.assertEqual(SearchEntry.objects.filter(kind=SearchEntry.JOB).count(), 2)
+
+        response = client.post("/import/applicants/?input=csv", self.HEADER + "Ada,ada@example.com,,+33123456789,x,",
+                                content_type="text/csv")
+        self.assertEqual(response.json()["created"], 1)
+        self.assertEqual(client.post("/import/users/", "", content_type="text/csv").status_code, 404)
+        self.assertEqual(client.post("/import/jobs/?input=xml", "", content_type="text/csv").status_code, 400)
+        self.assertEqual(Client().post("/import/jobs/", "", content_type="text/csv").status_code, 403)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "applicants.csv")
+            with open(path, "w") as file:
+                file.write(self.HEADER + "Ada,ada@example.com,,+33123456789,python,\nBad,bad,,+33123456789,x,\n")
+            stdout, stderr = io.StringIO(), io.StringIO()
+            call_command("import_data", "applicants", path, stdout=stdout, stderr=stderr)
+        self.assertIn("1 created, 0 updated, 1 failed", stdout.getvalue())
+        self.assertIn("line 3", stderr.getvalue())
+
+
+class QueryCountAssertionsMixin:
+    """
+    assertQueriesDoNotGrow: the number of queries a page runs must not depend
+    on how many rows it shows.  ``urls(size)`` lists the pages for a page
+    size; each is requested once to warm caches and counted, then counted
+    again after ``add_rows`` has added rows and the page size grown.  A
+    difference is an N+1.
+    """
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(queries)
+
+    def assertQueriesDoNotGrow(self, urls, add_rows, small=2, large=8):
+        add_rows(0, small)
+        for url in urls(small):
+            self.client.get(url)
+        before = {url: self.count_queries(url) for url in urls(small)}
+        add_rows(small, large)
+        after = dict(zip(before, map(self.count_queries, urls(large))))
+        self.assertEqual(after, before, "query count grows with the number of rows shown")
+
+
+@override_settings(RESPONSE_CACHE={"ENABLED": False})
+class QueryCountTest(QueryCountAssertionsMixin, TestCase):
+    def setUp(self):
+        # Job saves would otherwise schedule a re-scoring task.
+        cache.set(RESCORE_SCHEDULED_KEY, True, timeout=None)
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+
+    def tearDown(self):
+        cache.delete(RESCORE_SCHEDULED_KEY)
+
+    def add_rows(self, start, stop):
+        for i in range(start, stop):
+            user = User.objects.create_user(f"user{i}")
+            applicant = Applicant.objects.create(user=user, full_name=f"Applicant {i}", email=f"a{i}@example.com",
+                                                 phone_number="+33123456789", skills="python")
+            job = Job.objects.create(recruiter="Acme", title=f"Job {i}", description="Build",
+                                     required_skills="python", location="Tunis", salary_range="1-2")
+            resume = Resume.objects.create(applicant=applicant, file=f"resumes/{i}.pdf")
+            interview = Interview.objects.create(job=job, applicant=applicant, date=datetime.date(2026, 1, 1),
+                                                 time=datetime.time(9), mode="online")
+            question = ScreeningQuestion.objects.create(job=job, question_text=f"Question {i}")
+            ScreeningAnswer.objects.create(question=question, applicant=applicant, answer_text="yes")
+            Feedback.objects.create(interview=interview, reviewer=user, comments="ok", rating=4)
+            Notification.objects.create(user=user, message="hello")
+            JobApplication.objects.create(applicant=applicant, job=job)
+            JobMatch.objects.create(job=Job.objects.order_by("pk").first(), resume=resume, rank=i + 1, score=0.5)
+
+    def test_api_lists(self):
+        def urls(size):
+            first_job = Job.objects.order_by("pk").first()
+            lists = [f"/{prefix}/" for prefix, _, _ in router.registry if prefix != "edge-nodes"]
+            lists += [f"/jobs/{first_job.pk}/applicants/", f"/jobs/{first_job.pk}/candidates/?k={size}"]
+            # format=api renders the HTML forms, which list every related object by its __str__.
+            return [f"{url}{'&' if '?' in url else '?'}page_size={size}&format={fmt}"
+                    for url in lists for fmt in ("json", "api")]
+        self.assertQueriesDoNotGrow(urls, self.add_rows)
+
+    def test_admin_changelists_and_forms(self):
+        from django.contrib import admin
+
+        def urls(size):
+            return [f"/admin/screening/{model._meta.model_name}/{page}"
+                    for model in admin.site._registry if model._meta.app_label == "screening"
+                    for page in ("", "add/")]
+        self.assertQueriesDoNotGrow(urls, self.add_rows)
+
+
+class ResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Job saves would otherwise schedule a re-scoring task.
+        cache.set(RESCORE_SCHEDULED_KEY, True, timeout=None)
+        self.job = Job.objects.create(recruiter="Acme", title="Backend developer", description="Build APIs",
+                                      required_skills="python", location="Tunis", salary_range="1-2")
+        self.ada = Applicant.objects.create(full_name="Ada", email="ada@example.com", phone_number="+33123456789",
+                                            skills="python")
+        self.resume = Resume.objects.create(applicant=self.ada, file="resumes/ada.pdf")
+
+    def tearDown(self):
+        cache.clear()
+
+    def get(self, url, queries, **headers):
+        with self.assertNumQueries(queries):
+            return self.client.get(url, headers=headers)
+
+    def test_hits_and_invalidation(self):
+        url = f"/jobs/{self.job.pk}/"
+        first = self.get(url, 1)
+        self.assertEqual(first.json()["title"], "Backend developer")
+        self.assertEqual(self.get(url, 0).content, first.content)
+        self.get("/jobs/", 1)
+        self.get("/jobs/", 0)
+
+        self.job.title = "Senior backend developer"
+        self.job.save()
+        self.assertEqual(self.get(url, 1).json()["title"], "Senior backend developer")
+        self.get("/jobs/", 1)
+        # Query parameters are part of the key.
+        self.get("/jobs/?page_size=1", 1)
+
+    @override_settings(ALLOWED_HOSTS=["testserver", "api.example.com"])
+    def test_host_is_part_of_the_key(self):
+        self.get("/jobs/", 1)
+        self.get("/jobs/", 0)
+        with self.assertNumQueries(1):
+            self.client.get("/jobs/", HTTP_HOST="api.example.com")
+
+    def test_process_local_cache_fails_the_check(self):
+        self.assertEqual([error.id for error in check_shared_cache(None)], ["screening.E001"])
+        with override_settings(RESPONSE_CACHE={"ENABLED": False}):
+            self.assertEqual(check_shared_cache(None), [])
+
+    def test_hits_keep_the_response_headers(self):
+        url = f"/jobs/{self.job.pk}/"
+        with override_settings(RESPONSE_CACHE={"ENABLED": False}):
+            uncached = self.client.get(url)
+        for queries in (1, 0):
+            response = self.get(url, queries)
+            for name in ("Content-Type", "Vary", "Allow"):
+                self.assertEqual(response[name], uncached[name], name)
+
+    def test_etag(self):
+        url = f"/jobs/{self.job.pk}/"
+        etag = self.client.get(url)["ETag"]
+        response = self.get(url, 0, if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        Job.objects.filter(pk=self.job.pk).get().save()
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_job_applicants_relation(self):
+        url = f"/jobs/{self.job.pk}/applicants/"
+        self.assertEqual(self.client.get(url).json()["results"], [])
+        self.job.applicants.add(self.ada)
+        self.assertEqual([row["full_name"] for row in self.client.get(url).json()["results"]], ["Ada"])
+        self.ada.full_name = "Ada Lovelace"
+        self.ada.save()
+        self.assertEqual([row["full_name"] for row in self.client.get(url).json()["results"]], ["Ada Lovelace"])
+        self.ada.applied_jobs.clear()
+        self.assertEqual(self.client.get(url).json()["results"], [])
+
+    def test_applicant_resumes(self):
+        url = f"/applicants/{self.ada.pk}/resumes/"
+        self.assertEqual(len(self.client.get(url).json()["results"]), 1)
+        Resume.objects.filter(pk=self.resume.pk).update(ai_score=90.0)
+        self.get(url, 0)
+        # Bulk writers bypass the signals and invalidate explicitly.
+        invalidate_resumes([self.resume.pk])
+        self.assertEqual(self.client.get(url).json()["results"][0]["ai_score"], 90.0)
+        alan = Applicant.objects.create(full_name="Alan", email="alan@example.com", phone_number="+33123456789",
+                                        skills="maths")
+        self.client.post(f"/applicants/{alan.pk}/affect_or_update_resume/", {"resume_id": self.resume.pk})
+        self.assertEqual(self.client.get(url).json()["results"], [])
+        self.resume.refresh_from_db()
+        self.resume.delete()
+        self.assertEqual(self.client.get(f"/applicants/{alan.pk}/resumes/").json()["results"], [])
+
+    def test_html_and_errors_are_not_cached(self):
+        self.get(f"/jobs/{self.job.pk}/?format=api", 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/jobs/999999/").status_code, 404)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/jobs/999999/").status_code, 404)
+
+    def test_stampede_waits_for_the_first_request(self):
+        from .response_cache import _get_or_render
+
+        config = {"TTL": 60, "LOCK_TTL": 10, "LOCK_WAIT": 2.0}
+        started, release = threading.Event(), threading.Event()
+        renders = []
+
+        def render():
+            renders.append(1)
+            started.set()
+            release.wait(5)
+            return (b"{}", "application/json"), None
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(_get_or_render("response-cache:test", render, config)))
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=lambda: results.append(_get_or_render("response-cache:test", render, config)))
+        follower.start()
+        time.sleep(0.05)
+        release.set()
+        leader.join()
+        follower.join()
+        self.assertEqual(len(renders), 1)
+        self.assertEqual([entry for entry, _ in results], [(b"{}", "application/json")] * 2)
+
+
+class FastSerializationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        cache.set(RESCORE_SCHEDULED_KEY, True, timeout=None)
+        user = User.objects.create_user("ada")
+        self.applicants = [
+            Applicant.objects.create(user=user if i == 0 else None, full_name=f"Applicant {i}",
+                                     email=f"a{i}@example.com", phone_number="+21612345678",
+                                     skills="python, developer" if i % 2 else "react",
+                                     linkedin_profile="https://linkedin.com/in/a" if i == 0 else "")
+            for i in range(5)
+        ]
+        self.job = Job.objects.create(recruiter="Acme", title="Backend", description="Build", required_skills="python",
+                                      location="Tunis", salary_range="1-2")
+        node = EdgeNode.objects.create(name="paris", ip_address="10.0.0.1", latitude=48.85, longitude=2.35)
+        APIRequestLog.objects.create(edge_node=node, response_time_ms=12.5, latitude=48.85, longitude=2.35,
+                                     status_code=200, client_ip="::1", extra_data={"path": "/jobs/", "ids": [1, 2]})
+        APIRequestLog.objects.create(edge_node=node, request_time=timezone.make_aware(datetime.datetime(2026, 3, 1, 8)),
+                                     response_time_ms=3.0, db_time_ms=1.25, latitude=0, longitude=0, status_code=500,
+                                     client_ip="127.0.0.1", extra_data=None)
+        resume = Resume.objects.create(applicant=self.applicants[1], file="resumes/a.pdf")
+        JobMatch.objects.create(job=self.job, resume=resume, rank=1, score=87.5)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_same_output_as_the_serializers(self):
+        from .serializers import APIRequestLogSerializer, ApplicantSerializer, JobMatchSerializer, JobSerializer
+
+        for serializer_class, queryset in (
+            (ApplicantSerializer, Applicant.objects.all()),
+            (JobSerializer, Job.objects.all()),
+            (APIRequestLogSerializer, APIRequestLog.objects.order_by("id")),
+            (JobMatchSerializer, JobMatch.objects.all()),
+        ):
+            expected = json.loads(json.dumps(serializer_class(queryset, many=True).data))
+            self.assertEqual(row_encoder(serializer_class).encode_queryset(queryset), expected)
+
+    def test_unsupported_fields(self):
+        from .serializers import ResumeSerializer
+
+        with self.assertRaises(ImproperlyConfigured):
+            RowEncoder(ResumeSerializer)
+
+    def test_endpoints_match_the_model_path(self):
+        self.job.applicants.set(self.applicants)
+        urls = ["/applicants/?page_size=2", "/jobs/", f"/jobs/{self.job.pk}/applicants/?page_size=3",
+                "/applicants/by_skill/python,react/?match=any", "/applicants/get_tunisian_dev/"]
+        fast = [self.client.get(url).content for url in urls]
+        cursor = self.client.get(urls[0]).json()["next"]
+        fast.append(self.client.get(cursor).content)
+        cache.clear()
+        with override_settings(FAST_SERIALIZATION={"ENABLED": False}):
+            slow = [self.client.get(url).content for url in urls]
+            slow.append(self.client.get(cursor).content)
+        self.assertEqual(fast, slow)
+
+
+class SparseFieldsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        cache.set(RESCORE_SCHEDULED_KEY, True, timeout=None)
+        self.applicants = [
+            Applicant.objects.create(full_name=f"Applicant {i}", email=f"a{i}@example.com",
+                                     phone_number="+33123456789", skills="python " * 50)
+            for i in range(3)
+        ]
+        self.resume = Resume.objects.create(applicant=self.applicants[0], file="resumes/ada.pdf",
+                                            parsed_text="long text " * 1000, extracted_skills="python")
+
+    def tearDown(self):
+        cache.clear()
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return response.json(), " ".join(query["sql"] for query in queries.captured_queries)
+
+    def test_large_text_is_deferred_on_lists(self):
+        body, sql = self.get("/resumes/")
+        self.assertNotIn("parsed_text", body["results"][0])
+        self.assertNotIn("parsed_text", sql)
+        self.assertIn("extracted_skills", body["results"][0])
+        body, _ = self.get(f"/resumes/{self.resume.pk}/")
+        self.assertEqual(body["parsed_text"], self.resume.parsed_text)
+        body, sql = self.get("/resumes/?fields=id,parsed_text")
+        self.assertEqual(body["results"], [{"id": self.resume.pk, "parsed_text": self.resume.parsed_text}])
+        body, _ = self.get(f"/applicants/{self.applicants[0].pk}/resumes/")
+        self.assertNotIn("parsed_text", body["results"][0])
+        body, sql = self.get("/applicants/")
+        self.assertNotIn("skills", body["results"][0])
+        self.assertNotIn("skills", sql)
+        self.assertIn("email", body["results"][0])
+        body, _ = self.get(f"/applicants/{self.applicants[0].pk}/")
+        self.assertEqual(body["skills"], self.applicants[0].skills)
+
+    def test_projection_narrows_output_and_sql(self):
+        body, sql = self.get("/applicants/?fields=id,email")
+        self.assertEqual({tuple(row) for row in body["results"]}, {("id", "email")})
+        self.assertNotIn("skills", sql)
+        body, sql = self.get(f"/applicants/{self.applicants[1].pk}/?fields=full_name")
+        self.assertEqual(body, {"full_name": "Applicant 1"})
+        self.assertNotIn("skills", sql)
+        body, sql = self.get("/resumes/?fields=ai_score")
+        self.assertEqual(body["results"], [{"ai_score": None}])
+        self.assertNotIn("extracted_skills", sql)
+
+    def test_cursor_pages_keep_the_projection(self):
+        emails, url = [], "/applicants/?fields=email&page_size=1"
+        while url:
+            body, _ = self.get(url)
+            emails += [row["email"] for row in body["results"]]
+            url = body["next"]
+        self.assertEqual(emails, ["a0@example.com", "a1@example.com", "a2@example.com"])
+        with override_settings(FAST_SERIALIZATION={"ENABLED": False}):
+            body, sql = self.get("/applicants/?fields=email&page_size=2")
+        self.assertEqual(body["results"], [{"email": "a0@example.com"}, {"email": "a1@example.com"}])
+        self.assertNotIn("skills", sql)
+
+    def test_unknown_fields_and_writes(self):
+        response = self.client.get("/applicants/?fields=id,password")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("password", response.json()["fields"][0])
+        response = self.client.post("/jobs/?fields=id", {
+            "recruiter": "Acme", "title": "Backend", "description": "Build", "required_skills": "python",
+            "location": "Tunis", "salary_range": "1-2",
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["description"], "Build")
+
+
+class LogPartitionTest(TestCase):
+    def setUp(self):
+        self.node = EdgeNode.objects.create(name="Partitioned", latitude=0.0, longitude=0.0, ip_address="127.0.0.1")
+        self.now = timezone.now()
+
+    def log(self, age, **fields):
+        return APIRequestLog.objects.create(
+            edge_node=self.node, request_time=self.now - age, response_time_ms=10.0, latitude=0.0, longitude=0.0,
+            status_code=200, client_ip="127.0.0.1", **fields,
+        )
+
+    def test_intervals(self):
+        moment = datetime.datetime(2026, 12, 31, 18, 30, tzinfo=datetime.timezone.utc)
+        self.assertEqual(interval_start(moment, "day"), moment.replace(hour=0, minute=0))
+        self.assertEqual(interval_start(moment, "week"), datetime.datetime(2026, 12, 28, tzinfo=datetime.timezone.utc))
+        self.assertEqual(next_interval(interval_start(moment, "month"), "month"),
+                         datetime.datetime(2027, 1, 1, tzinfo=datetime.timezone.utc))
+
+    def test_plan_creates_ahead_and_drops_expired(self):
+        utc = datetime.timezone.utc
+        day = lambda n: datetime.datetime(2026, 10, n, tzinfo=utc)
+        existing = [
+            ("screening_apirequestlog_legacy", None, day(10)),
+            ("screening_apirequestlog_p20261010", day(10), day(11)),
+            ("screening_apirequestlog_p20261018", day(18), day(19)),
+        ]
+        config = {"INTERVAL": "day", "PREMAKE": 2, "RETENTION_DAYS": 7}
+        create, drop = plan_partitions(existing, day(18).replace(hour=6), config)
+        self.assertEqual(create, [("screening_apirequestlog_p20261019", day(19), day(20)),
+                                  ("screening_apirequestlog_p20261020", day(20), day(21))])
+        self.assertEqual(drop, [("screening_apirequestlog_legacy", day(10)),
+                                ("screening_apirequestlog_p20261010", day(11))])
+
+    def test_expired_logs_are_rolled_up_then_deleted(self):
+        for days in (45, 40, 2):
+            self.log(timedelta(days=days))
+        with override_settings(API_REQUEST_LOG_PARTITIONS={"RETENTION_DAYS": 30, "DELETE_BATCH": 1}):
+            self.assertEqual(manage_log_partitions(now=self.now)["deleted"], 2)
+        self.assertEqual(APIRequestLog.objects.count(), 1)
+        self.assertEqual(sum(NodePerformanceRollup.objects.values_list("request_count", flat=True)), 3)
+
+    def test_rows_a_rollup_has_not_counted_are_kept(self):
+        counted = self.log(timedelta(days=45))
+        roll_up_logs()
+        late = self.log(timedelta(days=40))
+        with override_settings(API_REQUEST_LOG_PARTITIONS={"RETENTION_DAYS": 30}):
+            with mock.patch("screening.rollups.roll_up_logs", return_value=0):
+                # A concurrent run holds the late row, so this one cannot roll it up.
+                self.assertEqual(manage_log_partitions(now=self.now)["deleted"], 1)
+            self.assertEqual(list(APIRequestLog.objects.values_list("pk", flat=True)), [late.pk])
+            self.assertEqual(manage_log_partitions(now=self.now)["deleted"], 1)
+        self.assertFalse(APIRequestLog.objects.filter(pk=counted.pk).exists())
+        self.assertEqual(sum(NodePerformanceRollup.objects.values_list("request_count", flat=True)), 2)
+
+    def test_reads_walk_back_one_window_at_a_time(self):
+        recent = [self.log(timedelta(hours=hours)).pk for hours in (1, 2)]
+        old = [self.log(timedelta(days=days)).pk for days in (20, 21)]
+        query = "query { nodeLogs(first: %s) { edges { node { id } } pageInfo { hasNextPage endCursor } } }"
+        with CaptureQueriesContext(connection) as queries:
+            page = self.client.post("/graphql/", {"query": query % 1}, content_type="application/json").json()
+        self.assertEqual([int(edge["node"]["id"]) for edge in page["data"]["nodeLogs"]["edges"]], recent[:1])
+        reads = [query["sql"] for query in queries if 'FROM "screening_apirequestlog"' in query["sql"]]
+        self.assertEqual(len(reads), 1)
+        self.assertIn('"request_time" >=', reads[0])
+        after = '3, after: "%s"' % page["data"]["nodeLogs"]["pageInfo"]["endCursor"]
+        page = self.client.post("/graphql/", {"query": query % after}, content_type="application/json").json()
+        self.assertEqual([int(edge["node"]["id"]) for edge in page["data"]["nodeLogs"]["edges"]], [recent[1], *old])
+        self.assertFalse(page["data"]["nodeLogs"]["pageInfo"]["hasNextPage"])
+        data = self.client.post("/graphql/", {"query": "query { edgeNodes { apiLogs(first: 3) { id } } }"},
+                                content_type="application/json").json()
+        self.assertEqual([int(log["id"]) for log in data["data"]["edgeNodes"][0]["apiLogs"]], [*recent, old[0]])
+
+    def test_admin_shows_recent_logs_by_default(self):
+        recent, old = self.log(timedelta(hours=1)), self.log(timedelta(days=3))
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "pw"))
+        url = "/admin/screening/apirequestlog/"
+        shown = self.client.get(url).context["cl"].result_list
+        self.assertEqual([log.pk for log in shown], [recent.pk])
+        shown = self.client.get(url + "?window=all").context["cl"].result_list
+        self.assertEqual([log.pk for log in shown], [recent.pk, old.pk])
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "Partitioning only runs on PostgreSQL.")
+class LogPartitionPostgresTest(TestCase):
+    """Checks the table migration 0017 partitioned; skipped on the SQLite test database."""
+
+    def test_table_is_partitioned_and_managed(self):
+        self.assertTrue(is_partitioned())
+        node = EdgeNode.objects.create(name="Partitioned", latitude=0.0, longitude=0.0, ip_address="127.0.0.1")
+        now = timezone.now()
+        logs = [
+            APIRequestLog.objects.create(edge_node=node, request_time=now - timedelta(days=days), response_time_ms=1.0,
+                                         latitude=0.0, longitude=0.0, status_code=200, client_ip="127.0.0.1")
+            for days in (0, 40)
+        ]
+        self.assertLess(logs[0].pk, logs[1].pk)
+        result = manage_log_partitions(now=now)
+        names = [name for name, _, _ in list_partitions()]
+        self.assertTrue(all(name in names for name in result["created"]))
+        self.assertTrue(APIRequestLog.objects.get(pk=logs[0].pk).rolled_up)
+        self.assertFalse(APIRequestLog.objects.filter(pk=logs[1].pk).exists())
+
+
+class LogIngestTest(TestCase):
+    def setUp(self):
+        api_key_cache.clear()
+        self.node = EdgeNode.objects.create(name="Ingesting", latitude=0.0, longitude=0.0, ip_address="127.0.0.1",
+                                            api_key="ingest-key")
+        self.request_time = timezone.now().replace(microsecond=0) - timedelta(hours=1)
+
+    def record(self, **fields):
+        return {"request_time": self.request_time.isoformat(), "response_time_ms": 12.5, "latitude": 36.8,
+                "longitude": 10.2, "status_code": 200, "client_ip": "10.1.2.3", **fields}
+
+    def post(self, body, key="batch-1", api_key="ingest-key", **headers):
+        if api_key:
+            headers["HTTP_X_API_KEY"] = api_key
+        if key:
+            headers["HTTP_IDEMPOTENCY_KEY"] = key
+        return self.client.post("/ingest/logs/", body, content_type="application/x-ndjson", **headers)
+
+    def test_validation_is_per_field(self):
+        records = [
+            self.record(db_time_ms=3.0, extra_data={"path": "/"}),
+            self.record(latitude=91, status_code=700),
+            self.record(client_ip="not-an-ip", request_time="yesterday"),
+            self.record(response_time_ms=None),
+            "not an object",
+            self.record(request_time=self.request_time.timestamp(), status_code="201"),
+        ]
+        columns, errors = validate_records(records)
+        self.assertEqual(sorted(errors), [1, 2, 3, 4])
+        self.assertEqual(sorted(errors[1]), ["latitude", "status_code"])
+        self.assertEqual(sorted(errors[2]), ["client_ip", "request_time"])
+        self.assertEqual(list(errors[3]), ["response_time_ms"])
+        self.assertEqual(columns["status_code"], [200, 201])
+        self.assertEqual(columns["db_time_ms"], [3.0, None])
+        self.assertEqual(columns["request_time"][1], self.request_time)
+        self.assertEqual(columns["extra_data"], [{"path": "/"}, None])
+
+    def test_request_time_formats(self):
+        utc = datetime.timezone.utc
+        records = [self.record(request_time=value) for value in
+                   ("2026-01-15T10:00:00Z", "2026-01-15 10:00:00.250", "2026-01-15T11:00:00+01:00", "2026-13-01")]
+        columns, errors = validate_records(records, now=datetime.datetime(2026, 1, 16, tzinfo=utc))
+        self.assertEqual(list(errors), [3])
+        self.assertEqual(columns["request_time"], [
+            datetime.datetime(2026, 1, 15, 10, tzinfo=utc), datetime.datetime(2026, 1, 15, 10, 0, 0, 250000, tzinfo=utc),
+            datetime.datetime(2026, 1, 15, 10, tzinfo=utc),
+        ])
+
+    def test_extra_data_is_checked(self):
+        records = [
+            self.record(extra_data={"path": "/"}),
+            self.record(extra_data=[1, 2]),
+            self.record(extra_data={"ratio": float("nan")}),
+            self.record(extra_data={"blob": "x" * 20000}),
+            self.record(extra_data={"note": "nul\x00"}),
+        ]
+        columns, errors = validate_records(records)
+        self.assertEqual(sorted(errors), [1, 2, 3, 4])
+        self.assertTrue(all(list(errors[index]) == ["extra_data"] for index in errors))
+        self.assertEqual(columns["extra_data"], [{"path": "/"}])
+        body = "\n".join([json.dumps(self.record()), '{"request_time": "2026-01-15T10:00:00Z", "extra_data": {"x": NaN}}'])
+        response = self.post(body)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()["accepted"], response.json()["rejected"]), (1, 1))
+
+    def test_future_request_times_are_rejected(self):
+        now = timezone.now()
+        records = [self.record(request_time=(now + timedelta(seconds=offset)).isoformat()) for offset in (60, 3600)]
+        columns, errors = validate_records(records, now=now)
+        self.assertEqual(list(errors), [1])
+        self.assertEqual(list(errors[1]), ["request_time"])
+        self.assertEqual(len(columns["request_time"]), 1)
+
+    def test_old_request_times_are_rejected(self):
+        now = timezone.now()
+        records = [self.record(request_time=(now - timedelta(days=days)).isoformat()) for days in (6, 8, 40)]
+        columns, errors = validate_records(records, now=now)
+        self.assertEqual(list(errors), [1, 2])
+        self.assertEqual(errors[1]["request_time"], ["Must not be more than 7 days old."])
+        with override_settings(LOG_INGEST={"MAX_AGE_DAYS": 60}, API_REQUEST_LOG_PARTITIONS={"RETENTION_DAYS": 30}):
+            self.assertEqual(list(validate_records(records, now=now)[1]), [2])
+
+    def test_booleans_are_never_numbers(self):
+        # All-number columns take the array fast path, mixed ones the per-value path: both reject booleans.
+        for other in (12.5, "12.5"):
+            columns, errors = validate_records([self.record(response_time_ms=other), self.record(response_time_ms=True)])
+            self.assertEqual(list(errors), [1])
+            self.assertEqual(list(errors[1]), ["response_time_ms"])
+            self.assertEqual(columns["response_time_ms"], [12.5])
+        _, errors = validate_records([self.record(status_code=True), self.record(latitude=False)])
+        self.assertEqual((list(errors[0]), list(errors[1])), (["status_code"], ["latitude"]))
+        _, errors = validate_records([self.record(response_time_ms=10 ** 400), self.record(response_time_ms=1)])
+        self.assertEqual(list(errors), [0])
+
+    def test_scoped_ipv6_addresses_are_rejected(self):
+        records = [self.record(client_ip=address) for address in ("fe80::1", "fe80::1%eth0", "::ffff:10.1.2.3")]
+        columns, errors = validate_records(records)
+        self.assertEqual(list(errors), [1])
+        self.assertEqual(columns["client_ip"], ["fe80::1", "::ffff:10.1.2.3"])
+
+    def test_copy_format(self):
+        columns, _ = validate_records([self.record(extra_data={"note": "tab\there\\"}), self.record(db_time_ms=1.5)])
+        lines = copy_buffer({**columns, "edge_node_id": [7, 7]}).read().splitlines()
+        self.assertEqual(lines[0].split("\t"), [
+            "7", self.request_time.isoformat(), "12.5", "\\N", "36.8", "10.2", "200", "10.1.2.3",
+            '{"note": "tab\\\\there\\\\\\\\"}',
+        ])
+        self.assertEqual(lines[1].split("\t")[3::5], ["1.5", "\\N"])
+
+    def test_gzip_ndjson_upload_is_idempotent(self):
+        lines = [json.dumps(self.record(response_time_ms=float(i))) for i in range(3)]
+        lines.insert(1, "{broken")
+        lines.append(json.dumps(self.record(longitude=200)))
+        body = gzip.compress("\n".join(lines).encode())
+        response = self.post(body, HTTP_CONTENT_ENCODING="gzip")
+        self.assertEqual(response.status_code, 201)
+        result = response.json()
+        self.assertEqual((result["accepted"], result["rejected"], result["duplicate"]), (3, 2, False))
+        self.assertEqual([error["index"] for error in result["errors"]], [1, 4])
+        self.assertEqual(sorted(self.node.api_logs.values_list("response_time_ms", flat=True)), [0.0, 1.0, 2.0])
+
+        retry = self.post(body, HTTP_CONTENT_ENCODING="gzip")
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry.json(), {**result, "duplicate": True})
+        self.assertEqual(APIRequestLog.objects.count(), 3)
+        self.assertEqual(LogIngestBatch.objects.get().accepted, 3)
+
+    def test_ndjson_indexes_follow_lines(self):
+        records, errors = parse_records(b'{"a": 1}\n{"b": 2}, {"c": 3}\n\n{"d": 4}\n')
+        self.assertEqual(records[0], {"a": 1})
+        self.assertIsNone(records[1])
+        self.assertEqual(list(errors), [1])
+        self.assertEqual(records[2], {"d": 4})
+
+    def test_json_array_and_rejections(self):
+        body = json.dumps([self.record(), self.record()])
+        self.assertEqual(self.post(body).json()["accepted"], 2)
+        self.assertEqual(self.post(body, key="batch-2").status_code, 201)
+        self.assertEqual(APIRequestLog.objects.filter(edge_node=self.node).count(), 4)
+        self.assertEqual(self.post(body, key=None).status_code, 400)
+        self.assertIn(self.post(body, api_key=None).status_code, (401, 403))
+        self.assertEqual(self.post(b"{}", key="batch-3", HTTP_CONTENT_ENCODING="br").status_code, 415)
+        self.assertEqual(self.post(b"\x1f\x8b-not-gzip", key="batch-3", HTTP_CONTENT_ENCODING="gzip").status_code, 400)
+        with override_settings(LOG_INGEST={"MAX_RECORDS": 1}):
+            self.assertEqual(self.post(body, key="batch-3").status_code, 413)
+        self.assertFalse(LogIngestBatch.objects.filter(key="batch-3").exists())
@@ -0,0 +1,217 @@
+"""
+Incremental training of the routing model from APIRequestLog history.
+
+Training streams the log table twice with ``.iterator()``:
+
+1. Aggregate the mean response time of every node per (1-degree cell, hour of
+   day) and label each cell/hour with its fastest node.  Memory is bounded by
+   cells x hours x nodes, not by the number of log rows.
+2. Stream the rows again, build feature vectors chunk by chunk and feed them
+   to ``SGDClassifier.partial_fit``.
+
+Features (see ``routing_features``) put the caller on the unit sphere, so a
+linear model can express "closest node" exactly, and add time of day and
+the serving node's load in that minute (from NodePerformanceRollup).  The
+response time is left out: the label is derived from it.  With
+``warm_start`` the latest artifact keeps learning from rows newer than the
+ones it has already seen.
+
+Every run writes a versioned artifact to ``settings.ROUTING_MODEL_DIR`` and,
+when publishing, atomically replaces the published model
+(``settings.ROUTING_MODEL_PATH``, ``current.pkl`` in that directory by
+default), which ``tasks.predict_node_for_location`` reloads without a
+restart.  The bundled ``screening/model.pkl`` used by
+``tasks.predict_optimal_node`` takes different features and is never
+touched.
+"""
+import glob
+import math
+import os
+import pickle
+import tempfile
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import APIRequestLog, EdgeNode, NodePerformanceRollup
+
+FEATURE_NAMES = ["x", "y", "z", "hour_sin", "hour_cos", "log_node_load"]
+CELL_DEGREES = 1.0
+
+
+def routing_features(latitude, longitude, when, node_load=0):
+    """Feature vector used both for training and by tasks.predict_node_for_location."""
+    phi, lmb = math.radians(latitude), math.radians(longitude)
+    hour = when.hour + when.minute / 60
+    angle = 2 * math.pi * hour / 24
+    return [
+        math.cos(phi) * math.cos(lmb),
+        math.cos(phi) * math.sin(lmb),
+        math.sin(phi),
+        math.sin(angle),
+        math.cos(angle),
+        math.log1p(node_load),
+    ]
+
+
+def model_dir():
+    return getattr(settings, "ROUTING_MODEL_DIR", os.path.join(os.path.dirname(__file__), "model_versions"))
+
+
+def published_model_path():
+    return getattr(settings, "ROUTING_MODEL_PATH", os.path.join(model_dir(), "current.pkl"))
+
+
+def _cell(latitude, longitude, when):
+    return (math.floor(latitude / CELL_DEGREES), math.floor(longitude / CELL_DEGREES), when.hour)
+
+
+def _log_rows(after_id, chunk_size):
+    return (
+        APIRequestLog.objects.filter(id__gt=after_id)
+        .order_by('id')
+        .values_list('id', 'edge_node_id', 'request_time', 'latitude', 'longitude', 'response_time_ms')
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def fastest_node_labels(after_id=0, chunk_size=10000):
+    """
+    First pass: label every (cell, hour) with the node that answered fastest there.
+    Returns:
+        tuple: ({(lat_cell, lng_cell, hour): node_id}, highest log id seen)
+    """
+    totals = defaultdict(lambda: [0.0, 0])
+    last_id = after_id
+    for log_id, node_id, request_time, latitude, longitude, response_ms in _log_rows(after_id, chunk_size):
+        entry = totals[(_cell(latitude, longitude, request_time), node_id)]
+        entry[0] += response_ms
+        entry[1] += 1
+        last_id = log_id
+    best = {}
+    for (cell, node_id), (total, count) in totals.items():
+        mean = total / count
+        if cell not in best or mean < best[cell][1]:
+            best[cell] = (node_id, mean)
+    return {cell: node_id for cell, (node_id, _) in best.items()}, last_id
+
+
+def _node_loads(keys):
+    """Requests per minute for the given (node_id, minute) pairs, from the rollup table."""
+    if not keys:
+        return {}
+    rollups = NodePerformanceRollup.objects.filter(
+        edge_node_id__in={node_id for node_id, _ in keys},
+        bucket_start__in={minute for _, minute in keys},
+    ).values_list('edge_node_id', 'bucket_start', 'request_count')
+    return {(node_id, minute): count for node_id, minute, count in rollups}
+
+
+def _training_chunks(labels, node_names, after_id, last_id, chunk_size):
+    import numpy as np
+
+    rows = []
+
+    def build(rows):
+        loads = _node_loads({(row[1], row[2].replace(second=0, microsecond=0)) for row in rows})
+        features, targets = [], []
+        for _, node_id, request_time, latitude, longitude, _ in rows:
+            label = labels.get(_cell(latitude, longitude, request_time))
+            if label is None:
+                continue
+            load = loads.get((node_id, request_time.replace(second=0, microsecond=0)), 0)
+            features.append(routing_features(latitude, longitude, request_time, load))
+            targets.append(node_names[label])
+        return np.asarray(features, dtype=np.float64), np.asarray(targets)
+
+    for row in _log_rows(after_id, chunk_size):
+        if row[0] > last_id:
+            break
+        rows.append(row)
+        if len(rows) >= chunk_size:
+            yield build(rows)
+            rows = []
+    if rows:
+        yield build(rows)
+
+
+def latest_artifact():
+    paths = sorted(glob.glob(os.path.join(model_dir(), "routing-*.pkl")))
+    if not paths:
+        return None
+    with open(paths[-1], "rb") as file:
+        return pickle.load(file)
+
+
+def _atomic_dump(obj, path):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile("wb", dir=directory, delete=False) as file:
+        pickle.dump(obj, file)
+        temp_path = file.name
+    os.replace(temp_path, path)
+
+
+def train_routing_model(chunk_size=10000, epochs=1, warm_start=True, publish=True):
+    """
+    Train (or continue training) the routing model and write a versioned artifact.
+    Args:
+        chunk_size (int): Log rows per partial_fit call.
+        epochs (int): Passes over the new rows.
+        warm_start (bool): Continue from the latest artifact, training on newer rows only.
+        publish (bool): Also replace the published model so the running routing code reloads it.
+    Returns:
+        dict: Summary with the artifact path, version and number of samples used.
+    """
+    from sklearn.linear_model import SGDClassifier
+
+    previous = latest_artifact() if warm_start else None
+    if previous is not None and getattr(previous, "routing_features", None) != FEATURE_NAMES:
+        previous = None
+    after_id = getattr(previous, "trained_through_log_id", 0) if previous is not None else 0
+
+    labels, last_id = fastest_node_labels(after_id, chunk_size)
+    if not labels:
+        return {"status": "skipped", "reason": "no new request logs", "trained_through_log_id": after_id}
+
+    node_names = dict(EdgeNode.objects.filter(pk__in=set(labels.values())).values_list('pk', 'name'))
+    labels = {cell: node_id for cell, node_id in labels.items() if node_id in node_names}
+    if previous is not None:
+        model = previous
+        # partial_fit only accepts the classes it was created with.
+        known = set(model.classes_)
+        labels = {cell: node_id for cell, node_id in labels.items() if node_names[node_id] in known}
+        classes = model.classes_
+    else:
+        model = SGDClassifier(loss="log_loss", random_state=0)
+        classes = sorted(set(node_names[node_id] for node_id in labels.values()))
+
+    if len(classes) < 2:
+        return {"status": "skipped", "reason": "need at least two candidate nodes", "trained_through_log_id": after_id}
+
+    samples = 0
+    for _ in range(epochs):
+        for features, targets in _training_chunks(labels, node_names, after_id, last_id, chunk_size):
+            if len(targets):
+                model.partial_fit(features, targets, classes=classes)
+                samples += len(targets)
+    if not samples:
+        return {"status": "skipped", "reason": "no labelled samples", "trained_through_log_id": after_id}
+
+    version = timezone.now().strftime("%Y%m%d%H%M%S%f")
+    model.routing_features = FEATURE_NAMES
+    model.trained_through_log_id = last_id
+    model.version = version
+    path = os.path.join(model_dir(), f"routing-{version}.pkl")
+    _atomic_dump(model, path)
+    if publish:
+        _atomic_dump(model, published_model_path())
+    return {
+        "status": "trained",
+        "version": version,
+        "path": path,
+        "samples": samples,
+        "classes": [str(name) for name in classes],
+        "trained_through_log_id": last_id,
+    }
@@ -6,7 +6,8 @@ from .views import (
     InterviewViewSet, ScreeningQuestionViewSet,
     ScreeningAnswerViewSet, FeedbackViewSet,
     NotificationViewSet, JobApplicationViewSet,
-    EdgeNodeViewSet, RequestRoutingView
+    EdgeNodeViewSet, RequestRoutingView, TimingMetricsView, ResumeDedupMetricsView, SearchView,
+    ExportView, ImportView, LogIngestView
 )
 
 router = DefaultRouter()
@@ -26,4 +27,10 @@ app_name = 'screening'
 urlpatterns = [
     path('', include(router.urls)),
     path('route-request/', RequestRoutingView.as_view(), name='route-request'),
+    path('metrics/timings/', TimingMetricsView.as_view(), name='timing-metrics'),
+    path('metrics/resume-dedup/', ResumeDedupMetricsView.as_view(), name='resume-dedup-metrics'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('export/<str:name>/', ExportView.as_view(), name='export'),
+    path('import/<str:name>/', ImportView.as_view(), name='import'),
+    path('ingest/logs/', LogIngestView.as_view(), name='ingest-logs'),
 ]
\ No newline at end of file
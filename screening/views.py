@@ -3,24 +3,40 @@ from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.exceptions import PermissionDenied
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.db.models import Q
+from django.http import StreamingHttpResponse
 import secrets
 
 from .models import (
     Applicant, Job, Resume, Interview,
     ScreeningQuestion, ScreeningAnswer, Feedback,
-    Notification, JobApplication, Recruiter, EdgeNode, APIRequestLog
+    Notification, JobApplication, Recruiter, EdgeNode, APIRequestLog,
+    validate_latitude, validate_longitude
 )
 from .serializers import (
     ApplicantSerializer, JobSerializer, ResumeSerializer,
     InterviewSerializer, ScreeningQuestionSerializer,
     ScreeningAnswerSerializer, FeedbackSerializer,
     NotificationSerializer, JobApplicationSerializer, RecruiterSerializer,
-    EdgeNodeSerializer, APIRequestLogSerializer
+    EdgeNodeSerializer, APIRequestLogSerializer, JobMatchSerializer
 )
 from .authentication import EdgeNodeAPIKeyAuthentication
 from .permissions import IsEdgeNodeAuthenticated  # Ajoutez ce fichier permissions.py ci-dessous
-from .tasks import deploy_to_flyio
+from .dedup import dedup_stats, store_resume_upload, uploaded_file_hash
+from .bulk_import import FORMATS as IMPORT_FORMATS, IMPORTERS, import_stream
+from .export import EXPORTS, FORMATS, export_stream, parse_bound
+from .fast_serializers import FastListMixin, serialize_queryset
+from .ingest import IngestError, ingest_logs, log_ingest_settings
+from .logsink import log_api_request
+from .middleware import endpoint_timings
+from .projection import SparseFieldsMixin
+from .response_cache import cache_response
+from .routing import node_index
+from .search import SOURCES, search, search_settings
+from .skills import applicants_with_skills
+from .tasks import deploy_to_flyio, parse_resumes
 
 @api_view(['POST'])
 def trigger_flyio_deploy(request):
@@ -29,6 +45,18 @@ def trigger_flyio_deploy(request):
     task = deploy_to_flyio.delay(app_name, image_tag)
     return Response({"task_id": task.id, "status": "Deployment triggered"})
 
+def _caller_location(request, edge_node):
+    """Read the caller's coordinates from the payload, defaulting to the calling edge node's location."""
+    data = request.data if hasattr(request.data, "get") else {}
+    latitude = data.get("latitude", data.get("lat"))
+    longitude = data.get("longitude", data.get("lng"))
+    if latitude is None or longitude is None:
+        return edge_node.latitude, edge_node.longitude
+    latitude, longitude = float(latitude), float(longitude)
+    validate_latitude(latitude)
+    validate_longitude(longitude)
+    return latitude, longitude
+
 class RequestRoutingView(APIView):
     authentication_classes = [EdgeNodeAPIKeyAuthentication]
     permission_classes = [IsEdgeNodeAuthenticated]
@@ -37,14 +65,19 @@ class RequestRoutingView(APIView):
         edge_node = getattr(request, "edge_node", None)
         if not edge_node:
             return Response({"error": "No valid API key or edge node."}, status=401)
-        node = EdgeNode.objects.filter(status="healthy").first()
-        if not node:
+        try:
+            latitude, longitude = _caller_location(request, edge_node)
+        except (TypeError, ValueError, ValidationError):
+            return Response({"error": "Invalid caller coordinates."}, status=status.HTTP_400_BAD_REQUEST)
+        nearest = node_index.nearest(latitude, longitude, k=1)
+        if not nearest:
             return Response({"error": "No healthy edge node available."}, status=503)
-        APIRequestLog.objects.create(
-            edge_node=node,
-            response_time_ms=0,
-            latitude=node.latitude,
-            longitude=node.longitude,
+        node, distance_km = nearest[0]
+        log_api_request(
+            request,
+            edge_node_id=node.pk,
+            latitude=latitude,
+            longitude=longitude,
             status_code=200,
             client_ip=request.META.get('REMOTE_ADDR'),
             extra_data=request.data
@@ -52,20 +85,136 @@ class RequestRoutingView(APIView):
         return Response({
             "routed_to": node.name,
             "ip_address": node.ip_address,
-            "location": {"lat": node.latitude, "lng": node.longitude}
+            "location": {"lat": node.latitude, "lng": node.longitude},
+            "distance_km": round(distance_km, 3)
         })
 
-class EdgeNodeViewSet(viewsets.ModelViewSet):
+class TimingMetricsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(endpoint_timings.snapshot())
+
+class ResumeDedupMetricsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(dedup_stats())
+
+class ExportView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, name):
+        if name not in EXPORTS:
+            return Response({'error': f"Unknown export; choose among {', '.join(EXPORTS)}."},
+                            status=status.HTTP_404_NOT_FOUND)
+        # ?format= est réservé par DRF à la négociation du rendu
+        fmt = request.query_params.get('output', 'csv')
+        if fmt not in FORMATS:
+            return Response({'error': 'output must be csv or ndjson.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            since, until = (
+                parse_bound(request.query_params[key]) if request.query_params.get(key) else None
+                for key in ('since', 'until')
+            )
+        except ValueError as error:
+            return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        compress = request.query_params.get('gzip') in ('1', 'true')
+        # Les lignes sont lues et écrites au fil de l'envoi : la mémoire ne dépend pas du volume
+        response = StreamingHttpResponse(
+            export_stream(name, fmt, since, until, compress),
+            content_type='application/gzip' if compress else FORMATS[fmt],
+        )
+        filename = f"{name}.{fmt}" + ('.gz' if compress else '')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+class ImportView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request, name):
+        if name not in IMPORTERS:
+            return Response({'error': f"Unknown import; choose among {', '.join(IMPORTERS)}."},
+                            status=status.HTTP_404_NOT_FOUND)
+        # Fichier multipart « file », ou corps brut (text/csv, application/x-ndjson)
+        uploaded = request.FILES.get('file') if request.content_type.startswith('multipart/') else None
+        fmt = request.query_params.get('input')
+        if fmt is None:
+            source = uploaded.name if uploaded else request.content_type
+            fmt = 'ndjson' if 'ndjson' in source or 'json' in source else 'csv'
+        if fmt not in IMPORT_FORMATS:
+            return Response({'error': 'input must be csv or ndjson.'}, status=status.HTTP_400_BAD_REQUEST)
+        result = import_stream(name, uploaded.file if uploaded else request._request, fmt)
+        return Response(result, status=status.HTTP_200_OK)
+
+class LogIngestView(APIView):
+    authentication_classes = [EdgeNodeAPIKeyAuthentication]
+    permission_classes = [IsEdgeNodeAuthenticated]
+
+    def post(self, request):
+        key = request.headers.get('Idempotency-Key', '').strip()
+        if not key or len(key) > 100:
+            return Response({'error': 'An Idempotency-Key header of at most 100 characters is required.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        # Corps brut lu directement : request.body plafonne à DATA_UPLOAD_MAX_MEMORY_SIZE
+        max_bytes = log_ingest_settings()['MAX_BYTES']
+        body = request._request.read(max_bytes + 1)
+        if len(body) > max_bytes:
+            return Response({'error': f'Body larger than {max_bytes} bytes.'},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        try:
+            result = ingest_logs(request.edge_node, key, body, request.headers.get('Content-Encoding'))
+        except IngestError as error:
+            return Response({'error': str(error)}, status=error.status)
+        return Response(result, status=status.HTTP_200_OK if result['duplicate'] else status.HTTP_201_CREATED)
+
+class SearchView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        config = search_settings()
+        query = request.query_params.get('q', '').strip()
+        kinds = [kind for kind in request.query_params.get('type', '').split(',') if kind]
+        if not query:
+            return Response({'error': 'q is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        if any(kind not in SOURCES for kind in kinds):
+            return Response({'error': f"type must be among {', '.join(SOURCES)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            page = int(request.query_params.get('page', 1))
+            page_size = int(request.query_params.get('page_size', config['PAGE_SIZE']))
+        except ValueError:
+            return Response({'error': 'page and page_size must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        page_size = min(max(page_size, 1), config['MAX_PAGE_SIZE'])
+        offset = (max(page, 1) - 1) * page_size
+        if offset > config['MAX_OFFSET']:
+            return Response({'error': 'Page out of range; refine the query.'}, status=status.HTTP_400_BAD_REQUEST)
+        # Une ligne de plus que la page pour savoir s'il y a une suite, sans COUNT(*)
+        hits = search(query, kinds, limit=page_size + 1, offset=offset)
+        next_url = None
+        if len(hits) > page_size:
+            params = request.query_params.copy()
+            params['page'] = max(page, 1) + 1
+            next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+        return Response({
+            'results': [
+                {'type': kind, 'id': object_id, 'title': title, 'rank': round(rank, 4)}
+                for kind, object_id, title, rank in hits[:page_size]
+            ],
+            'next': next_url,
+        })
+
+class EdgeNodeViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = EdgeNode.objects.all()
     serializer_class = EdgeNodeSerializer
     authentication_classes = [EdgeNodeAPIKeyAuthentication]
     permission_classes = [IsEdgeNodeAuthenticated]
 
     def get_queryset(self):
-        # On récupère l'API key depuis le header
-        api_key = self.request.headers.get("x-api-key") or self.request.headers.get("api_key")
-        if api_key:
-            return EdgeNode.objects.filter(api_key=api_key)
+        # Le noeud a déjà été résolu par EdgeNodeAPIKeyAuthentication
+        edge_node = getattr(self.request, "edge_node", None)
+        if edge_node:
+            return EdgeNode.objects.filter(pk=edge_node.pk)
         return EdgeNode.objects.none()  # Pas d'API key, pas d'accès
 
     @action(detail=False, methods=['post'], url_path='register', permission_classes=[permissions.AllowAny])
@@ -81,26 +230,28 @@ class EdgeNodeViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_201_CREATED)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-class ApplicantViewSet(viewsets.ModelViewSet):
+class ApplicantViewSet(FastListMixin, viewsets.ModelViewSet):
     queryset = Applicant.objects.all()
     serializer_class = ApplicantSerializer
     permission_classes = [permissions.AllowAny]
 
     @action(detail=True, methods=['get'])
+    @cache_response("applicant:{pk}", per_user=False)
     def resumes(self, request, pk=None):
         applicant = self.get_object()
-        resumes = applicant.resumes.all()
-        serializer = ResumeSerializer(resumes, many=True)
-        return Response(serializer.data)
+        return self.fast_list_response(applicant.resumes.all(), ResumeSerializer)
 
     @action(detail=False, methods=['get'], url_path=r'by_skill/(?P<skill>[^/.]+)')
     def get_developer_by_skill(self, request, skill=None):
         skill = skill or request.query_params.get('skill')
-        applicants = Applicant.objects.filter(skills__icontains=skill)
+        # Plusieurs compétences séparées par des virgules : ?match=all (toutes, par défaut) ou ?match=any
+        match = request.query_params.get('match', 'all')
+        if match not in ('all', 'any'):
+            return Response({'error': "match must be 'all' or 'any'."}, status=status.HTTP_400_BAD_REQUEST)
+        applicants = applicants_with_skills(skill, match=match)
         if not applicants.exists():
             return Response({'message': 'No applicants found with the given skill.'}, status=status.HTTP_204_NO_CONTENT)
-        serializer = ApplicantSerializer(applicants, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serialize_queryset(ApplicantSerializer, applicants), status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['put'])
     def update_applicant(self, request, pk=None):
@@ -113,14 +264,12 @@ class ApplicantViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def get_tunisian_dev(self, request):
-        result = ApplicantSerializer(
-            Applicant.objects.filter(
-                Q(skills__icontains='developer') & (
-                    Q(phone_number__startswith='+216') | Q(phone_number__startswith='00216')
-                )
-            ),
-            many=True
-        ).data
+        result = serialize_queryset(
+            ApplicantSerializer,
+            applicants_with_skills(['developer'], queryset=Applicant.objects.filter(
+                Q(phone_number__startswith='+216') | Q(phone_number__startswith='00216')
+            )),
+        )
         if not result:
             return Response({'message': 'No applicants found with the given skill.'}, status=status.HTTP_204_NO_CONTENT)
         return Response(result, status=status.HTTP_200_OK)
@@ -140,37 +289,73 @@ class ApplicantViewSet(viewsets.ModelViewSet):
         if resume_id:
             try:
                 resume = Resume.objects.get(id=resume_id)
-                applicant.resumes.add(resume)
+                # bulk=False : resume.save() déclenche les signaux (index de recherche, cache des réponses)
+                applicant.resumes.add(resume, bulk=False)
                 return Response({'status': 'resume added to applicant'})
             except Resume.DoesNotExist:
                 return Response({'error': 'Resume not found'}, status=status.HTTP_404_NOT_FOUND)
         else:
             return Response({'error': 'resume_id not provided'}, status=status.HTTP_400_BAD_REQUEST)
 
-class JobViewSet(viewsets.ModelViewSet):
+class JobViewSet(FastListMixin, viewsets.ModelViewSet):
     queryset = Job.objects.all()
     serializer_class = JobSerializer
     permission_classes = [permissions.AllowAny]
 
+    # Réponses identiques pour tous les utilisateurs, invalidées par screening.signals
+    @cache_response("jobs", per_user=False)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response("job:{pk}", per_user=False)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(detail=True, methods=['get'])
+    @cache_response("job:{pk}", "job:{pk}:applicants", per_user=False)
     def applicants(self, request, pk=None):
         job = self.get_object()
-        applicants = job.applicants.all()
-        serializer = ApplicantSerializer(applicants, many=True)
+        return self.fast_list_response(job.applicants.all(), ApplicantSerializer)
+
+    @action(detail=True, methods=['get'])
+    def candidates(self, request, pk=None):
+        job = self.get_object()
+        try:
+            k = int(request.query_params.get('k', 10))
+        except ValueError:
+            return Response({'error': 'k must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        if k < 1:
+            return Response({'error': 'k must be at least 1.'}, status=status.HTTP_400_BAD_REQUEST)
+        # Les meilleurs CV sont pré-calculés par screening.matching (au plus TOP_K par offre)
+        matches = job.matches.select_related('resume__applicant').order_by('rank')[:k]
+        serializer = JobMatchSerializer(matches, many=True)
         return Response(serializer.data)
 
-class ResumeViewSet(viewsets.ModelViewSet):
+class ResumeViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Resume.objects.all()
     serializer_class = ResumeSerializer
     permission_classes = [permissions.AllowAny]
 
     def perform_create(self, serializer):
         if self.request.user and self.request.user.is_authenticated:
-            serializer.save(applicant=self.request.user.applicant_profile)
+            uploaded = serializer.validated_data['file']
+            # Un fichier déjà connu (même SHA-256) réutilise le stockage et l'analyse existants
+            content, _ = store_resume_upload(uploaded, uploaded_file_hash(uploaded, self.request))
+            resume = serializer.save(
+                applicant=self.request.user.applicant_profile,
+                file=content.file.name,
+                content_hash=content.content_hash,
+                parsed_text=content.parsed_text,
+                extracted_skills=content.extracted_skills,
+                ai_score=content.ai_score,
+            )
+            if content.parsed_at is None:
+                # Analyse du fichier en arrière-plan, une fois l'enregistrement validé
+                transaction.on_commit(lambda: parse_resumes.delay([resume.pk]))
         else:
             raise PermissionDenied("Authentication required to upload a resume.")
 
-class InterviewViewSet(viewsets.ModelViewSet):
+class InterviewViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Interview.objects.all()
     serializer_class = InterviewSerializer
     permission_classes = [permissions.AllowAny]
@@ -181,31 +366,31 @@ class InterviewViewSet(viewsets.ModelViewSet):
         company = request.query_params.get('company', None)
         if not skill or not company:
             return Response({'message': 'Please provide both skill and company.'}, status=status.HTTP_400_BAD_REQUEST)
-        applicants = Interview.objects.filter(
-            Q(applicant__skills__icontains=skill) & Q(job__recruiter__company_name__iexact=company)
-        )
-        serializer = ApplicantSerializer(applicants, many=True)
-        if serializer.data:
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        # Job.recruiter est le nom de l'entreprise (champ texte)
+        interviewed = Interview.objects.filter(job__recruiter__iexact=company).values('applicant_id')
+        applicants = applicants_with_skills(skill, queryset=Applicant.objects.filter(pk__in=interviewed))
+        data = serialize_queryset(ApplicantSerializer, applicants)
+        if data:
+            return Response(data, status=status.HTTP_200_OK)
         else:
             return Response({'message': 'No applicants found with the given skill and company.'}, status=status.HTTP_204_NO_CONTENT)
 
-class ScreeningQuestionViewSet(viewsets.ModelViewSet):
+class ScreeningQuestionViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = ScreeningQuestion.objects.all()
     serializer_class = ScreeningQuestionSerializer
     permission_classes = [permissions.AllowAny]
 
-class ScreeningAnswerViewSet(viewsets.ModelViewSet):
+class ScreeningAnswerViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = ScreeningAnswer.objects.all()
     serializer_class = ScreeningAnswerSerializer
     permission_classes = [permissions.AllowAny]
 
-class FeedbackViewSet(viewsets.ModelViewSet):
+class FeedbackViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
     permission_classes = [permissions.AllowAny]
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
     permission_classes = [permissions.AllowAny]
@@ -227,7 +412,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
         notification.save()
         return Response({'status': 'notification marked as read'})
 
-class JobApplicationViewSet(viewsets.ModelViewSet):
+class JobApplicationViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = JobApplication.objects.all()
     serializer_class = JobApplicationSerializer
     permission_classes = [permissions.AllowAny]